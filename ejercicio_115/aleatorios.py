@@ -0,0 +1,226 @@
+# aleatorios.py
+"""
+Generación de variables aleatorias por bloques.
+
+Cada Flujo tiene su propio numpy.random.Generator: sortea de a bloques de
+uniformes, los transforma de una vez (vectorizado) en la variable que
+corresponde y después los entrega de a uno desde un buffer que se
+rellena solo. Junto con cada valor se devuelve el RND usado, que es lo
+que muestra la traza.
+
+Un Flujo se puede copiar con pickle: se guarda el estado del generador al
+empezar el bloque en curso y la posición dentro del bloque, y al
+restaurarlo se vuelve a sortear ese bloque. La copia sigue con los mismos
+valores que el original.
+
+FuentesAleatorias agrupa un flujo independiente por propósito (llegadas,
+tipo de petición, atención, reparación y el tiempo de reparación que la
+traza muestra al llegar un pedido): cambiar un parámetro sólo
+cambia los valores de su flujo, no corre los sorteos de los demás. Por
+eso dos escenarios con la misma semilla usan números aleatorios comunes,
+sincronizados por propósito.
+
+Con antitetico=True cada flujo entrega 1 - rnd en lugar de rnd: la misma
+semilla con y sin antitético da un par de corridas con correlación
+negativa (ver replicaciones.replicar).
+"""
+import math
+import random
+
+import numpy as np
+
+TAM_BLOQUE = 512
+# Mayor double menor que 1: 1 - u con u = 0 no puede dar 1 (log(0) en la exponencial)
+_MAXIMO_RND = np.nextafter(1.0, 0.0)
+
+# Orden fijo de los flujos: el índice es la spawn_key de su SeedSequence
+FLUJOS = ("llegadas", "peticion", "atencion", "reparacion", "reparacion_mostrada")
+
+
+# ------------------------------------------------------------
+# 1) Un flujo con buffer
+# ------------------------------------------------------------
+class Flujo:
+    """
+    Flujo de variables de una distribución, con buffer.
+
+    distribucion: "rnd" (uniforme en [0, 1)), "exponencial" (params =
+    (media,)) o "uniforme" (params = (a, b)). Con antitetico=True los RND
+    son 1 - u (en (0, 1), sin llegar a 1).
+    """
+    __slots__ = ("_gen", "distribucion", "params", "tam_bloque", "antitetico", "_buffer",
+                 "_indice", "_estado_bloque")
+
+    DISTRIBUCIONES = ("rnd", "exponencial", "uniforme")
+
+    def __init__(self, semilla, distribucion: str = "rnd", params: tuple = (),
+                 tam_bloque: int = TAM_BLOQUE, antitetico: bool = False):
+        if distribucion not in self.DISTRIBUCIONES:
+            raise ValueError(f"Distribución no soportada: {distribucion}")
+        if not isinstance(semilla, np.random.SeedSequence):
+            semilla = np.random.SeedSequence(semilla)
+        self._gen = np.random.Generator(np.random.PCG64(semilla))
+        self.distribucion = distribucion
+        self.params = tuple(params)
+        self.tam_bloque = tam_bloque
+        self.antitetico = antitetico
+        self._buffer = []           # tuplas (rnd, valor) del bloque actual
+        self._indice = tam_bloque  # cuántos ya se entregaron (agotado: el próximo rellena)
+        self._estado_bloque = None  # estado del generador antes del bloque actual
+
+    def _transformar(self, rnds: np.ndarray) -> np.ndarray:
+        if self.distribucion == "exponencial":
+            (media,) = self.params
+            return -media * np.log1p(-rnds)
+        a, b = self.params
+        return a + rnds * (b - a)
+
+    def _rellenar(self):
+        self._estado_bloque = self._gen.bit_generator.state
+        rnds = self._gen.random(self.tam_bloque)
+        if self.antitetico:
+            rnds = np.minimum(1.0 - rnds, _MAXIMO_RND)
+        valores = rnds if self.distribucion == "rnd" else self._transformar(rnds)
+        # Tuplas de float de Python armadas de una vez: entregar de a una es
+        # mucho más barato que indexar los arrays de numpy
+        self._buffer = list(zip(rnds.tolist(), valores.tolist()))
+        self._indice = 0
+
+    def sortear(self) -> tuple[float, float]:
+        """Devuelve (rnd, valor)."""
+        i = self._indice
+        if i < self.tam_bloque:
+            self._indice = i + 1
+            return self._buffer[i]
+        self._rellenar()
+        self._indice = 1
+        return self._buffer[0]
+
+    def rnd(self) -> float:
+        """Devuelve sólo el RND (uniforme en [0, 1))."""
+        return self.sortear()[0]
+
+    # ---------------- copia y cambio de parámetros ----------------
+    def _rehacer_bloque(self, posicion: int):
+        """Vuelve a sortear el bloque actual y se para en posicion."""
+        self._gen.bit_generator.state = self._estado_bloque
+        self._rellenar()
+        self._indice = posicion
+
+    def cambiar_parametros(self, params: tuple):
+        """
+        Cambia los parámetros de la distribución sin mover el generador:
+        los próximos valores usan los mismos RND que habría usado el flujo
+        original (números aleatorios comunes entre variantes).
+        """
+        self.params = tuple(params)
+        if self._estado_bloque is not None and self.distribucion != "rnd":
+            self._rehacer_bloque(self._indice)
+
+    def __getstate__(self):
+        return {
+            "distribucion": self.distribucion,
+            "params": self.params,
+            "tam_bloque": self.tam_bloque,
+            "antitetico": self.antitetico,
+            # Sin bloque sorteado alcanza con el estado actual del generador
+            "estado": self._estado_bloque or self._gen.bit_generator.state,
+            "posicion": None if self._estado_bloque is None else self._indice,
+        }
+
+    def __setstate__(self, estado: dict):
+        self.distribucion = estado["distribucion"]
+        self.params = estado["params"]
+        self.tam_bloque = estado["tam_bloque"]
+        self.antitetico = estado["antitetico"]
+        self._gen = np.random.Generator(np.random.PCG64())
+        self._gen.bit_generator.state = estado["estado"]
+        self._buffer = []
+        self._indice = self.tam_bloque
+        self._estado_bloque = None
+        if estado["posicion"] is not None:
+            self._estado_bloque = estado["estado"]
+            self._rehacer_bloque(estado["posicion"])
+
+    # ---------------- constructores ----------------
+    @classmethod
+    def exponencial(cls, semilla, media: float, tam_bloque: int = TAM_BLOQUE,
+                    antitetico: bool = False) -> "Flujo":
+        return cls(semilla, "exponencial", (media,), tam_bloque, antitetico)
+
+    @classmethod
+    def uniforme(cls, semilla, a: float, b: float, tam_bloque: int = TAM_BLOQUE,
+                 antitetico: bool = False) -> "Flujo":
+        return cls(semilla, "uniforme", (a, b), tam_bloque, antitetico)
+
+
+def crear_flujo(tipo: str, params, semilla=None, tam_bloque: int = TAM_BLOQUE) -> Flujo:
+    """
+    Crea un flujo a partir del nombre de la distribución (el string se
+    resuelve una sola vez, acá).
+
+    • tipo = "Uniforme": params = (a, b)
+    • tipo = "Exponencial": params = (lambda_,)   [media = 1/lambda_]
+    """
+    tipo = tipo.lower()
+    if tipo == "uniforme":
+        a, b = params
+        return Flujo.uniforme(semilla, a, b, tam_bloque)
+    elif tipo == "exponencial":
+        (lam,) = params if isinstance(params, tuple) else (params,)
+        return Flujo.exponencial(semilla, 1 / lam, tam_bloque)
+    else:
+        raise ValueError(f"Distribución no soportada: {tipo}")
+
+
+# ------------------------------------------------------------
+# 2) Un flujo por propósito
+# ------------------------------------------------------------
+class FuentesAleatorias:
+    """Flujos independientes de la simulación, derivados de una sola semilla."""
+    __slots__ = ("semilla", "antitetico") + FLUJOS
+
+    def __init__(self, semilla: int | None, mu: float, a1: float, b1: float,
+                 a2: float, b2: float, tam_bloque: int = TAM_BLOQUE,
+                 antitetico: bool = False):
+        if semilla is None:
+            semilla = int(np.random.SeedSequence().entropy % 2**63)
+        self.semilla = semilla
+        self.antitetico = antitetico
+        ss = {nombre: np.random.SeedSequence(semilla, spawn_key=(i,))
+              for i, nombre in enumerate(FLUJOS)}
+        self.llegadas = Flujo.exponencial(ss["llegadas"], mu, tam_bloque, antitetico)
+        self.peticion = Flujo(ss["peticion"], "rnd", (), tam_bloque, antitetico)
+        self.atencion = Flujo.uniforme(ss["atencion"], a1, b1, tam_bloque, antitetico)
+        self.reparacion = Flujo.uniforme(ss["reparacion"], a2, b2, tam_bloque, antitetico)
+        self.reparacion_mostrada = Flujo.uniforme(ss["reparacion_mostrada"], a2, b2,
+                                                  tam_bloque, antitetico)
+
+    def cambiar_parametros(self, mu: float, a1: float, b1: float, a2: float, b2: float):
+        """Nuevos parámetros para los flujos, sin mover sus generadores."""
+        self.llegadas.cambiar_parametros((mu,))
+        self.atencion.cambiar_parametros((a1, b1))
+        self.reparacion.cambiar_parametros((a2, b2))
+        self.reparacion_mostrada.cambiar_parametros((a2, b2))
+
+    @classmethod
+    def para(cls, parametros, tam_bloque: int = TAM_BLOQUE,
+             antitetico: bool = False) -> "FuentesAleatorias":
+        """Fuentes para un ParametrosSimulacion (usa su semilla)."""
+        p = parametros
+        return cls(p.semilla, p.mu, p.a1, p.b1, p.a2, p.b2, tam_bloque, antitetico)
+
+
+# ------------------------------------------------------------
+# 3) Generación de a un valor (referencia para comparar)
+# ------------------------------------------------------------
+def gen_exponencial(media: float, rng=random) -> tuple[float, float]:
+    rnd = rng.random()
+    valor = -media * math.log(1 - rnd)
+    return rnd, valor
+
+
+def gen_uniforme(a: float, b: float, rng=random) -> tuple[float, float]:
+    rnd = rng.random()
+    valor = a + rnd * (b - a)
+    return rnd, valor
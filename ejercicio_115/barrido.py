@@ -0,0 +1,285 @@
+# barrido.py
+"""
+Barrido de parámetros: replicaciones de simular() en cada punto de una
+grilla o de un hipercubo latino, en un pool de procesos.
+
+Los resultados se guardan en un SQLite con clave = hash del punto (los
+parámetros, la semilla base, la cantidad de replicaciones, el nivel de
+confianza y motor.VERSION_MOTOR): al volver a correr un barrido sólo se
+calculan los puntos que faltan. Todos los puntos usan la misma semilla
+base, así que comparten los números aleatorios (la diferencia entre dos
+puntos tiene menos ruido que dos corridas independientes).
+
+    python barrido.py --valores mu 10 15 20 --valores p_retiro 0.3 0.5 0.7 --replicas 30
+    python barrido.py --lhs 20 --rango a2 5 15 --rango b2 15 30 --almacen barrido.sqlite
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, fields, replace
+
+import numpy as np
+
+from cache import clave_parametros
+from motor import ParametrosSimulacion, agregar_argumentos_modelo, parametros_desde_args
+from replicaciones import METRICAS, replicar
+
+# Parámetros que se pueden barrer (todos menos la semilla)
+PARAMETROS_BARRIBLES = tuple(f.name for f in fields(ParametrosSimulacion) if f.name != "semilla")
+_ENTEROS = {f.name for f in fields(ParametrosSimulacion) if f.type is int}
+
+
+# ------------------------------------------------------------
+# 1) Diseños
+# ------------------------------------------------------------
+def _validar_nombres(nombres):
+    for nombre in nombres:
+        if nombre not in PARAMETROS_BARRIBLES:
+            raise ValueError(f"Parámetro no barrible: {nombre}")
+
+
+def grilla(**valores) -> list[dict]:
+    """Producto cartesiano: grilla(mu=[10, 20], p_retiro=[0.3, 0.5]) da 4 puntos."""
+    _validar_nombres(valores)
+    nombres = list(valores)
+    return [dict(zip(nombres, combinacion))
+            for combinacion in itertools.product(*valores.values())]
+
+
+def hipercubo_latino(rangos: dict[str, tuple[float, float]], cant_puntos: int,
+                     semilla: int | None = None) -> list[dict]:
+    """
+    cant_puntos puntos de un hipercubo latino sobre los rangos [min, max]:
+    cada rango se parte en cant_puntos estratos y cada estrato se usa una
+    sola vez por parámetro. Los parámetros enteros se redondean.
+    """
+    _validar_nombres(rangos)
+    if cant_puntos < 1:
+        raise ValueError(f"Cantidad de puntos inválida: {cant_puntos}")
+    rng = np.random.default_rng(semilla)
+    puntos = [{} for _ in range(cant_puntos)]
+    for nombre, (minimo, maximo) in rangos.items():
+        u = (rng.permutation(cant_puntos) + rng.random(cant_puntos)) / cant_puntos
+        valores = minimo + u * (maximo - minimo)
+        for punto, valor in zip(puntos, valores.tolist()):
+            punto[nombre] = round(valor) if nombre in _ENTEROS else valor
+    return puntos
+
+
+# ------------------------------------------------------------
+# 2) Almacén de resultados
+# ------------------------------------------------------------
+def clave_punto(parametros: ParametrosSimulacion, cant_replicas: int, semilla: int,
+                nivel_confianza: float) -> str:
+    base = clave_parametros(replace(parametros, semilla=semilla))
+    texto = f"{base}|{cant_replicas}|{nivel_confianza!r}"
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+class AlmacenBarrido:
+    """Resultados por punto en SQLite: una fila por (punto, métrica)."""
+
+    def __init__(self, ruta: str = ":memory:"):
+        self.ruta = ruta
+        self._conexion = sqlite3.connect(ruta)
+        self._conexion.executescript("""
+            CREATE TABLE IF NOT EXISTS puntos (
+                clave TEXT PRIMARY KEY,
+                parametros TEXT NOT NULL,
+                cant_replicas INTEGER NOT NULL,
+                semilla INTEGER NOT NULL,
+                nivel_confianza REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS estimaciones (
+                clave TEXT NOT NULL REFERENCES puntos(clave),
+                metrica TEXT NOT NULL,
+                media REAL, desvio REAL, semiancho REAL, n INTEGER,
+                PRIMARY KEY (clave, metrica)
+            );
+        """)
+
+    def __contains__(self, clave: str) -> bool:
+        fila = self._conexion.execute("SELECT 1 FROM puntos WHERE clave = ?", (clave,)).fetchone()
+        return fila is not None
+
+    def __len__(self) -> int:
+        return self._conexion.execute("SELECT COUNT(*) FROM puntos").fetchone()[0]
+
+    def guardar(self, clave: str, parametros: ParametrosSimulacion, cant_replicas: int,
+                semilla: int, nivel_confianza: float, estimaciones: dict[str, tuple]):
+        """estimaciones: {metrica: (media, desvio, semiancho, n)}."""
+        datos = {f.name: getattr(parametros, f.name) for f in fields(parametros)
+                 if f.name != "semilla"}
+        with self._conexion:
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO puntos VALUES (?, ?, ?, ?, ?)",
+                (clave, json.dumps(datos, sort_keys=True), cant_replicas, semilla, nivel_confianza),
+            )
+            self._conexion.executemany(
+                "INSERT OR REPLACE INTO estimaciones VALUES (?, ?, ?, ?, ?, ?)",
+                [(clave, m, *valores) for m, valores in estimaciones.items()],
+            )
+
+    def leer(self, claves: list[str]) -> list[dict]:
+        """Filas ordenadas (parámetros + métrica + estimación) de las claves pedidas."""
+        filas = []
+        for clave in claves:
+            cursor = self._conexion.execute(
+                "SELECT p.parametros, e.metrica, e.media, e.desvio, e.semiancho, e.n "
+                "FROM puntos p JOIN estimaciones e USING (clave) WHERE clave = ?", (clave,)
+            )
+            for parametros, metrica, media, desvio, semi, n in cursor:
+                datos = json.loads(parametros)
+                fila = {nombre: datos[nombre] for nombre in PARAMETROS_BARRIBLES}
+                fila.update(metrica=metrica, media=media, desvio=desvio, semiancho=semi,
+                            inferior=media - semi, superior=media + semi, n=n)
+                filas.append(fila)
+        return filas
+
+    def cerrar(self):
+        self._conexion.close()
+
+
+# ------------------------------------------------------------
+# 3) Ejecución
+# ------------------------------------------------------------
+@dataclass
+class ResumenBarrido:
+    tabla: object                 # pd.DataFrame ordenado: una fila por (punto, métrica)
+    variables: list[str]          # parámetros que varían en el diseño
+    calculados: int
+    reutilizados: int
+
+
+def _correr_punto(parametros: ParametrosSimulacion, cant_replicas: int, semilla: int,
+                  nivel_confianza: float) -> dict[str, tuple]:
+    """Replicaciones de un punto en el proceso actual. Se ejecuta en los workers."""
+    resumen = replicar(parametros, cant_replicas, semilla=semilla, procesos=1,
+                       nivel_confianza=nivel_confianza)
+    return {m: (e.media, e.desvio, e.semiancho, e.n) for m, e in resumen.estimaciones.items()}
+
+
+def barrer(puntos: list[dict],
+           base: ParametrosSimulacion | None = None,
+           cant_replicas: int = 30,
+           semilla: int = 1,
+           procesos: int | None = None,
+           almacen: AlmacenBarrido | str | None = None,
+           nivel_confianza: float = 0.95,
+           al_avanzar=None) -> ResumenBarrido:
+    """
+    Corre cant_replicas replicaciones en cada punto (dicts de parámetros
+    que pisan a `base`) y devuelve la tabla ordenada con los intervalos.
+
+    • Los puntos que ya están en el almacén no se vuelven a correr.
+    • Cada punto se corre entero en un worker; procesos=1 corre todo en
+      el proceso actual.
+    • al_avanzar(hechos, total) se llama al terminar cada punto.
+    """
+    import pandas as pd
+
+    base = base or ParametrosSimulacion()
+    propio = not isinstance(almacen, AlmacenBarrido)
+    if propio:
+        almacen = AlmacenBarrido(almacen or ":memory:")
+    procesos = procesos or os.cpu_count() or 1
+
+    parametros = [replace(base, **punto) for punto in puntos]
+    claves = [clave_punto(p, cant_replicas, semilla, nivel_confianza) for p in parametros]
+    pendientes = {}
+    for clave, p in zip(claves, parametros):
+        if clave not in almacen and clave not in pendientes:
+            pendientes[clave] = p
+
+    try:
+        hechos, total = 0, len(pendientes)
+
+        def guardar(clave, estimaciones):
+            nonlocal hechos
+            almacen.guardar(clave, pendientes[clave], cant_replicas, semilla,
+                            nivel_confianza, estimaciones)
+            hechos += 1
+            if al_avanzar is not None:
+                al_avanzar(hechos, total)
+
+        if procesos == 1 or total <= 1:
+            for clave, p in pendientes.items():
+                guardar(clave, _correr_punto(p, cant_replicas, semilla, nivel_confianza))
+        else:
+            with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+                futuros = {ejecutor.submit(_correr_punto, p, cant_replicas, semilla,
+                                           nivel_confianza): clave
+                           for clave, p in pendientes.items()}
+                for futuro in as_completed(futuros):
+                    guardar(futuros[futuro], futuro.result())
+
+        tabla = pd.DataFrame(almacen.leer(list(dict.fromkeys(claves))))
+    finally:
+        if propio:
+            almacen.cerrar()
+
+    variables = [n for n in PARAMETROS_BARRIBLES if any(n in punto for punto in puntos)]
+    return ResumenBarrido(
+        tabla=tabla,
+        variables=variables,
+        calculados=total,
+        reutilizados=len(set(claves)) - total,
+    )
+
+
+# ------------------------------------------------------------
+# 4) Línea de comandos
+# ------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Barrido de parámetros con replicaciones.")
+    agregar_argumentos_modelo(parser)
+    parser.add_argument("--valores", nargs="+", action="append", default=[],
+                        metavar=("PARAMETRO", "VALOR"),
+                        help="Valores de un parámetro para la grilla (repetible)")
+    parser.add_argument("--rango", nargs=3, action="append", default=[],
+                        metavar=("PARAMETRO", "MIN", "MAX"),
+                        help="Rango de un parámetro para el hipercubo latino (repetible)")
+    parser.add_argument("--lhs", type=int, default=None,
+                        help="Cantidad de puntos del hipercubo latino (usa --rango)")
+    parser.add_argument("--replicas", type=int, default=30)
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--confianza", type=float, default=0.95)
+    parser.add_argument("--almacen", default="barrido.sqlite", help="Archivo SQLite")
+    parser.add_argument("--salida", default=None, help="CSV con la tabla resumen")
+    args = parser.parse_args(argv)
+
+    def convertir(nombre, valor):
+        return int(valor) if nombre in _ENTEROS else float(valor)
+
+    if args.lhs is not None:
+        rangos = {n: (float(a), float(b)) for n, a, b in args.rango}
+        puntos = hipercubo_latino(rangos, args.lhs, args.semilla)
+    else:
+        puntos = grilla(**{n: [convertir(n, v) for v in vs] for n, *vs in args.valores})
+
+    inicio = time.perf_counter()
+    resumen = barrer(
+        puntos, parametros_desde_args(args), args.replicas,
+        semilla=args.semilla if args.semilla is not None else 1,
+        procesos=args.procesos, almacen=args.almacen, nivel_confianza=args.confianza,
+        al_avanzar=lambda hechos, total: print(f"\r{hechos}/{total} puntos", end="", flush=True),
+    )
+    print(f"\nCalculados: {resumen.calculados}  reutilizados: {resumen.reutilizados}  "
+          f"({time.perf_counter() - inicio:.1f} s)")
+    tabla = resumen.tabla
+    if resumen.variables:
+        ancha = tabla.pivot_table(index=resumen.variables, columns="metrica", values="media")
+        print(ancha[list(METRICAS)].round(3).to_string())
+    else:
+        print(tabla[["metrica", "media", "semiancho"]].round(3).to_string(index=False))
+    if args.salida:
+        tabla.to_csv(args.salida, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,652 @@
+# bench.py
+"""
+Mediciones de rendimiento del motor.
+
+    python bench.py traza --hora-cierre 20000
+    python bench.py calendario
+    python bench.py replicas --procesos 1 2 4
+    python bench.py vectorizado --replicas 100000
+    python bench.py aleatorios
+    python bench.py registro --hora-cierre 50000
+    python bench.py zapatos --hora-cierre 2000
+    python bench.py exportar --horas-cierre 50000 200000 800000
+    python bench.py vivo --horas-cierre 480 5000 50000
+    python bench.py cola --tamanos 100 1000 10000 100000
+
+Suite con semillas y escenarios fijos, salida JSON y comparación:
+
+    python bench.py suite --salida base.json
+    python bench.py suite --salida nuevo.json
+    python bench.py comparar base.json nuevo.json --umbral 0.25
+"""
+import argparse
+import datetime
+import gc
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import replace
+
+from aleatorios import Flujo, gen_exponencial, gen_uniforme
+from calendario import CalendarioEventos
+from motor import VERSION_MOTOR, ParametrosSimulacion, Simulacion, simular
+from replicaciones import replicar
+from traza import COLUMNAS_FLOAT, COLUMNAS_INT, HistorialZapatos, RegistroTraza
+from utils import construir_dataframe, generar_nueva_fila_multiindex
+from vectorizado import simular_lote
+
+
+def _cronometrar(funcion, repeticiones: int = 3):
+    """Devuelve (mejor tiempo en segundos, último valor devuelto)."""
+    mejor, valor = float("inf"), None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        valor = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, valor
+
+
+# ------------------------------------------------------------
+# 1) Traza completa vs. modo sólo estadísticas
+# ------------------------------------------------------------
+def bench_traza(hora_cierre: float = 20000.0, semilla: int = 1) -> dict:
+    parametros = ParametrosSimulacion(semilla=semilla, hora_cierre=hora_cierre)
+    t_traza, r_traza = _cronometrar(lambda: simular(parametros))
+    t_rapido, r_rapido = _cronometrar(lambda: simular(parametros, registrar_traza=False))
+    assert r_traza.resumen() == r_rapido.resumen()
+    eventos = r_traza.cant_eventos
+    return {
+        "eventos": eventos,
+        "eventos_por_seg_traza": eventos / t_traza,
+        "eventos_por_seg_sin_traza": eventos / t_rapido,
+        "aceleracion": t_traza / t_rapido,
+    }
+
+
+# ------------------------------------------------------------
+# 2) Costo por evento del calendario según cantidad de servidores
+# ------------------------------------------------------------
+def bench_calendario_hold(pendientes: int, operaciones: int = 200_000, semilla: int = 1) -> float:
+    """
+    Modelo 'hold' clásico: con n eventos pendientes, se saca el próximo y
+    se programa uno nuevo. Devuelve microsegundos por operación.
+    """
+    rng = random.Random(semilla)
+    calendario = CalendarioEventos()
+    for i in range(pendientes):
+        calendario.programar(rng.expovariate(1.0), "Fin_reparacion", i)
+    inicio = time.perf_counter()
+    for _ in range(operaciones):
+        evento = calendario.proximo()
+        calendario.programar(evento.tiempo + rng.expovariate(1.0), evento.tipo, evento.servidor)
+    return (time.perf_counter() - inicio) / operaciones * 1e6
+
+
+def bench_servidores(cant_zapateros: int, eventos_objetivo: int = 100_000, semilla: int = 1) -> dict:
+    """
+    Corre el motor (sin traza) con la carga por zapatero constante: la
+    media entre llegadas se divide por la cantidad de zapateros.
+    """
+    # Un zapatero con mu=20 genera ~0.12 eventos por minuto
+    hora_cierre = eventos_objetivo / (0.12 * cant_zapateros)
+    parametros = ParametrosSimulacion(
+        mu=20.0 / cant_zapateros, cant_zapateros=cant_zapateros,
+        hora_cierre=hora_cierre, semilla=semilla,
+    )
+    segundos, resultado = _cronometrar(lambda: simular(parametros, registrar_traza=False), 1)
+    return {
+        "zapateros": cant_zapateros,
+        "eventos": resultado.cant_eventos,
+        "us_por_evento": segundos / resultado.cant_eventos * 1e6,
+    }
+
+
+# ------------------------------------------------------------
+# 3) Escalamiento de las replicaciones con la cantidad de procesos
+# ------------------------------------------------------------
+def bench_replicas(procesos: int, cant_replicas: int = 2000, semilla: int = 1) -> dict:
+    parametros = ParametrosSimulacion()
+    segundos, _ = _cronometrar(
+        lambda: replicar(parametros, cant_replicas, semilla=semilla, procesos=procesos), 1
+    )
+    return {"procesos": procesos, "replicas_por_seg": cant_replicas / segundos}
+
+
+# ------------------------------------------------------------
+# 4) Motor escalar vs. vectorizado
+# ------------------------------------------------------------
+def bench_vectorizado(cant_replicas: int = 100_000, semilla: int = 1) -> dict:
+    parametros = ParametrosSimulacion()
+    cant_escalar = max(1, cant_replicas // 50)
+    t_escalar, _ = _cronometrar(
+        lambda: replicar(parametros, cant_escalar, semilla=semilla, procesos=1), 1
+    )
+    t_vector, _ = _cronometrar(lambda: simular_lote(parametros, cant_replicas, semilla), 1)
+    escalar = cant_escalar / t_escalar
+    vector = cant_replicas / t_vector
+    return {
+        "replicas_por_seg_escalar": escalar,
+        "replicas_por_seg_vectorizado": vector,
+        "aceleracion": vector / escalar,
+    }
+
+
+# ------------------------------------------------------------
+# 5) Generación de variables: por bloques vs. de a una
+# ------------------------------------------------------------
+def bench_aleatorios(cant: int = 1_000_000, semilla: int = 1) -> dict:
+    """Sorteos por segundo (exponencial y uniforme) con y sin buffer."""
+    rng = random.Random(semilla)
+    t_exp_uno, _ = _cronometrar(lambda: [gen_exponencial(20.0, rng) for _ in range(cant)], 1)
+    t_uni_uno, _ = _cronometrar(lambda: [gen_uniforme(10.0, 20.0, rng) for _ in range(cant)], 1)
+    exp = Flujo.exponencial(semilla, 20.0)
+    uni = Flujo.uniforme(semilla, 10.0, 20.0)
+    t_exp_bloq, _ = _cronometrar(lambda: [exp.sortear() for _ in range(cant)], 1)
+    t_uni_bloq, _ = _cronometrar(lambda: [uni.sortear() for _ in range(cant)], 1)
+    return {
+        "exponencial_por_llamada": cant / t_exp_uno,
+        "exponencial_por_bloques": cant / t_exp_bloq,
+        "uniforme_por_llamada": cant / t_uni_uno,
+        "uniforme_por_bloques": cant / t_uni_bloq,
+    }
+
+
+# ------------------------------------------------------------
+# 6) Registro de la traza: lista de dicts vs. columnar
+# ------------------------------------------------------------
+def _medir_memoria(funcion):
+    """Devuelve (bytes retenidos por lo que devuelve funcion, valor)."""
+    tracemalloc.start()
+    try:
+        valor = funcion()
+        actual, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return actual, valor
+
+
+def _medir_pico(funcion):
+    """Devuelve (pico de bytes asignados por Python/numpy durante funcion, valor)."""
+    tracemalloc.start()
+    try:
+        valor = funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico, valor
+
+
+def bench_registro(hora_cierre: float = 50000.0, semilla: int = 1) -> dict:
+    """
+    Reproduce los mismos eventos (columnas fijas, sin zapatos) con el
+    registro de antes (una fila dict con multi-índice por evento + pandas
+    infiriendo las columnas) y con RegistroTraza.
+    """
+    parametros = ParametrosSimulacion(semilla=semilla, hora_cierre=hora_cierre)
+    estados = list(simular(parametros).traza.estados())
+    n = len(estados)
+
+    def registrar_dicts():
+        return [generar_nueva_fila_multiindex(e, con_objetos_temporales=False) for e in estados]
+
+    def registrar_columnar():
+        registro = RegistroTraza(con_zapatos=False)
+        for e in estados:
+            registro.agregar(e["evento"], e["tipo_peticion"], e["estado_zapatero"],
+                             tuple(e[c] for c in COLUMNAS_FLOAT),
+                             tuple(e[c] for c in COLUMNAS_INT))
+        return registro
+
+    mem_dicts, filas = _medir_memoria(registrar_dicts)
+    mem_col, registro = _medir_memoria(registrar_columnar)
+    t_df_dicts, _ = _cronometrar(lambda: construir_dataframe(filas))
+    t_df_col, _ = _cronometrar(registro.a_dataframe)
+    return {
+        "eventos": n,
+        "bytes_por_evento_dicts": mem_dicts / n,
+        "bytes_por_evento_columnar": mem_col / n,
+        "ms_dataframe_dicts": t_df_dicts * 1000,
+        "ms_dataframe_columnar": t_df_col * 1000,
+    }
+
+
+def bench_zapatos(hora_cierre: float = 2000.0, mu: float = 3.0, semilla: int = 1,
+                  ventana: int = 50) -> dict:
+    """
+    Día con muchos zapatos: memoria de guardar el estado de todos los
+    zapatos en cada evento (como antes) vs. el historial de cambios, y
+    tiempo de la vista ancha completa vs. una ventana de filas.
+    """
+    parametros = ParametrosSimulacion(semilla=semilla, mu=mu, hora_cierre=hora_cierre)
+    traza = simular(parametros).traza
+    n = len(traza)
+
+    def por_evento():
+        return [tuple((z, e, horas[z]) for z, e in estados.items())
+                for estados, horas in traza.zapatos.instantaneas(0, n)]
+
+    largo = traza.zapatos.a_dataframe()
+    cambios = list(zip(largo["nro_evento"].tolist(), largo["reloj"].tolist(),
+                       largo["zapato"].tolist(), largo["estado"].cat.codes.tolist()))
+
+    def historial():
+        registro = HistorialZapatos()
+        for cambio in cambios:
+            registro.agregar(*cambio)
+        return registro
+
+    mem_por_evento, _ = _medir_memoria(por_evento)
+    mem_historial, _ = _medir_memoria(historial)
+    t_completa, df = _cronometrar(traza.a_multiindex, repeticiones=1)
+    desde = n // 2
+    t_ventana, _ = _cronometrar(lambda: traza.a_multiindex(desde=desde, hasta=desde + ventana))
+    return {
+        "eventos": n,
+        "cambios": len(traza.zapatos),
+        "columnas_vista_completa": df.shape[1],
+        "kb_por_evento": mem_por_evento / 1024,
+        "kb_historial": mem_historial / 1024,
+        "ms_vista_completa": t_completa * 1000,
+        "ms_vista_ventana": t_ventana * 1000,
+    }
+
+
+def bench_exportar(hora_cierre: float, semilla: int = 1, formato: str = "parquet") -> dict:
+    """Pico de memoria de la traza en memoria vs. escrita a disco por lotes."""
+    from exportar import exportar
+
+    parametros = ParametrosSimulacion(semilla=semilla, hora_cierre=hora_cierre)
+    pico_memoria, resultado = _medir_pico(lambda: simular(parametros))
+    with tempfile.TemporaryDirectory() as directorio:
+        # Una corrida corta antes, para no medir la carga de pyarrow
+        exportar(replace(parametros, hora_cierre=100.0), directorio, formato)
+        inicio = time.perf_counter()
+        pico_disco, _ = _medir_pico(lambda: exportar(parametros, directorio, formato))
+        segundos = time.perf_counter() - inicio
+        tam = sum(os.path.getsize(os.path.join(directorio, a)) for a in os.listdir(directorio))
+    return {
+        "eventos": resultado.cant_eventos,
+        "mb_pico_en_memoria": pico_memoria / 2**20,
+        "mb_pico_exportando": pico_disco / 2**20,
+        "mb_archivos": tam / 2**20,
+        "eventos_por_seg_exportando": resultado.cant_eventos / segundos,
+    }
+
+
+def bench_primer_dibujo(hora_cierre: float, semilla: int = 1, filas: int = 10,
+                        repeticiones: int = 3) -> dict:
+    """
+    Lo que tarda la interfaz en tener algo para mostrar: corriendo en vivo
+    (primer Avance y las últimas filas de la traza) vs. esperando a que
+    termine la corrida.
+    """
+    parametros = ParametrosSimulacion(semilla=semilla, hora_cierre=hora_cierre)
+
+    def en_vivo():
+        avance = next(Simulacion(parametros).por_lotes())
+        return avance.traza.a_multiindex(desde=max(0, len(avance.traza) - filas))
+
+    def al_final():
+        resultado = simular(parametros)
+        return resultado.traza.a_multiindex(hasta=filas)
+
+    en_vivo()   # carga de pandas fuera de la medición
+    t_vivo, _ = _cronometrar(en_vivo, repeticiones)
+    t_final, _ = _cronometrar(al_final, repeticiones)
+    return {
+        "hora_cierre": hora_cierre,
+        "eventos": simular(parametros, registrar_traza=False).cant_eventos,
+        "ms_primer_dibujo_en_vivo": t_vivo * 1000,
+        "ms_primer_dibujo_al_final": t_final * 1000,
+    }
+
+
+def bench_cola(tamano: int, eventos: int = 20000, semilla: int = 1,
+               repeticiones: int = 5) -> dict:
+    """
+    Costo por evento con `tamano` zapatos esperando: se carga el taller
+    (mu bajo, stock inicial = tamano) hasta que la cola de pedidos llega a
+    ese tamaño y se miden los `eventos` siguientes, sin traza, en
+    `repeticiones` tramos (se toma el mejor).
+    """
+    parametros = ParametrosSimulacion(semilla=semilla, mu=2.0, p_retiro=0.3,
+                                      stock_inicial=tamano, hora_cierre=math.inf)
+    sim = Simulacion(parametros, registrar_traza=False)
+    paso = sim.paso
+    while len(sim.cola_pedidos) < tamano:
+        paso()
+    en_taller = len(sim.zapatos_estado)
+    por_tramo = max(eventos // repeticiones, 1)
+    mejor = float("inf")
+    gc.disable()
+    try:
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            for _ in range(por_tramo):
+                paso()
+            mejor = min(mejor, time.perf_counter() - inicio)
+    finally:
+        gc.enable()
+    return {
+        "tamano": tamano,
+        "zapatos_en_taller": en_taller,
+        "us_por_evento": mejor / por_tramo * 1e6,
+    }
+
+
+# ------------------------------------------------------------
+# 7) Suite: escenarios fijos, JSON y comparación
+# ------------------------------------------------------------
+# Del día por defecto hasta carga alta (mu bajo y mucho stock inicial)
+ESCENARIOS = {
+    "dia": ParametrosSimulacion(semilla=1),
+    "semana": ParametrosSimulacion(semilla=1, hora_cierre=2400.0),
+    "cargado": ParametrosSimulacion(semilla=1, mu=5.0, stock_inicial=100, hora_cierre=2000.0),
+    "pesado": ParametrosSimulacion(semilla=1, mu=2.5, stock_inicial=1000, hora_cierre=3000.0),
+}
+ESCENARIOS_RAPIDOS = ("dia", "cargado")
+FILAS_VENTANA = 500   # filas de la vista multi-índice (como la muestra la app)
+UMBRAL_REGRESION = 0.25
+MINIMO_MS = 2.0       # por debajo de esto los tiempos son puro ruido
+
+
+def medir_importacion(modulo: str = "motor", repeticiones: int = 5) -> float:
+    """Mejor tiempo (ms) de importar el módulo en un intérprete nuevo."""
+    codigo = (f"import time; t = time.perf_counter(); import {modulo}; "
+              "print((time.perf_counter() - t) * 1000)")
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    return min(
+        float(subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True,
+                             check=True, cwd=directorio).stdout)
+        for _ in range(repeticiones)
+    )
+
+
+def _tasa(funcion, repeticiones: int, minimo_seg: float = 0.1) -> float:
+    """
+    Mejor tasa (llamadas/s) entre `repeticiones` tandas; cada tanda repite
+    la función hasta durar minimo_seg, para que los escenarios chicos no
+    queden a merced del ruido.
+    """
+    mejor = 0.0
+    for _ in range(repeticiones):
+        llamadas, inicio = 0, time.perf_counter()
+        while True:
+            funcion()
+            llamadas += 1
+            transcurrido = time.perf_counter() - inicio
+            if transcurrido >= minimo_seg:
+                break
+        mejor = max(mejor, llamadas / transcurrido)
+    return mejor
+
+
+def bench_escenario(parametros: ParametrosSimulacion, repeticiones: int = 5) -> dict:
+    """Métricas de un escenario: velocidad, memoria y tiempo de cada etapa de la traza."""
+    resultado = simular(parametros)
+    eventos = resultado.cant_eventos
+    por_seg_traza = _tasa(lambda: simular(parametros), repeticiones) * eventos
+    por_seg_rapido = _tasa(lambda: simular(parametros, registrar_traza=False),
+                           repeticiones) * eventos
+    pico, _ = _medir_pico(lambda: simular(parametros))
+
+    # Tiempo dentro de _registrar (incluye armar la fila de la traza)
+    def tiempo_registrar():
+        sim = Simulacion(parametros)
+        original, acumulado = sim._registrar, [0.0]
+
+        def registrar(*args):
+            inicio = time.perf_counter()
+            original(*args)
+            acumulado[0] += time.perf_counter() - inicio
+
+        sim._registrar = registrar
+        sim.ejecutar()
+        return acumulado[0]
+
+    t_registrar = min(tiempo_registrar() for _ in range(repeticiones))
+
+    traza = resultado.traza
+    desde = max(0, eventos // 2 - FILAS_VENTANA // 2)
+    hasta = desde + FILAS_VENTANA
+    t_estados, estados = _cronometrar(lambda: list(traza.estados(desde, hasta)), repeticiones)
+    t_filas, filas = _cronometrar(
+        lambda: [generar_nueva_fila_multiindex(e) for e in estados], repeticiones
+    )
+    t_df_multi, _ = _cronometrar(lambda: construir_dataframe(filas), repeticiones)
+    t_df_plano, _ = _cronometrar(traza.a_dataframe, repeticiones)
+    return {
+        "eventos": eventos,
+        "eventos_por_seg_traza": por_seg_traza,
+        "eventos_por_seg_sin_traza": por_seg_rapido,
+        "mb_pico_traza": pico / 2**20,
+        "ms_registrar": t_registrar * 1000,
+        "ms_estados_ventana": t_estados * 1000,
+        "ms_filas_multiindex_ventana": t_filas * 1000,
+        "ms_dataframe_multiindex_ventana": t_df_multi * 1000,
+        "ms_dataframe_plano": t_df_plano * 1000,
+    }
+
+
+def correr_suite(escenarios=None, repeticiones: int = 5) -> dict:
+    escenarios = escenarios or list(ESCENARIOS)
+    # Calentamiento: que las importaciones diferidas (pandas) no caigan en la medición
+    bench_escenario(ESCENARIOS["dia"], repeticiones=1)
+    # Sin el recolector de ciclos las mediciones varían bastante menos
+    gc.disable()
+    try:
+        medidos = {nombre: bench_escenario(ESCENARIOS[nombre], repeticiones)
+                   for nombre in escenarios}
+    finally:
+        gc.enable()
+    return {
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "version_motor": VERSION_MOTOR,
+        "repeticiones": repeticiones,
+        "ms_importacion_motor": medir_importacion("motor"),
+        "escenarios": medidos,
+    }
+
+
+def _sentido(metrica: str) -> int:
+    """+1 si más es mejor, -1 si menos es mejor, 0 si no se compara."""
+    if "_por_seg" in metrica:
+        return 1
+    if metrica.startswith(("ms_", "mb_")):
+        return -1
+    return 0
+
+
+def comparar(base: dict, nuevo: dict, umbral: float = UMBRAL_REGRESION) -> list[dict]:
+    """
+    Una fila por métrica presente en las dos corridas. `cambio` es la
+    variación relativa hacia peor (positiva = empeoró) y `regresion`
+    indica si supera el umbral.
+    """
+    pares = [("", "ms_importacion_motor", base.get("ms_importacion_motor"),
+              nuevo.get("ms_importacion_motor"))]
+    for escenario, metricas in base.get("escenarios", {}).items():
+        otras = nuevo.get("escenarios", {}).get(escenario, {})
+        pares += [(escenario, m, v, otras.get(m)) for m, v in metricas.items()]
+
+    filas = []
+    for escenario, metrica, antes, ahora in pares:
+        sentido = _sentido(metrica)
+        if antes is None or ahora is None or not sentido or antes <= 0:
+            continue
+        if metrica.startswith("ms_") and max(antes, ahora) < MINIMO_MS:
+            continue
+        cambio = (antes - ahora) / antes if sentido > 0 else (ahora - antes) / antes
+        filas.append({"escenario": escenario, "metrica": metrica, "antes": antes,
+                      "ahora": ahora, "cambio": cambio, "regresion": cambio > umbral})
+    return filas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del motor de simulación.")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p_traza = sub.add_parser("traza", help="Traza completa vs. sólo estadísticas")
+    p_traza.add_argument("--hora-cierre", type=float, default=20000.0)
+    p_traza.add_argument("--semilla", type=int, default=1)
+
+    p_cal = sub.add_parser("calendario", help="Costo por evento vs. cantidad de servidores")
+    p_cal.add_argument("--servidores", type=int, nargs="+", default=[1, 10, 100, 1000])
+
+    p_rep = sub.add_parser("replicas", help="Replicaciones por segundo vs. procesos")
+    p_rep.add_argument("--procesos", type=int, nargs="+",
+                       default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    p_rep.add_argument("--replicas", type=int, default=2000)
+
+    p_vec = sub.add_parser("vectorizado", help="Replicaciones/s escalar vs. vectorizado")
+    p_vec.add_argument("--replicas", type=int, default=100_000)
+
+    p_ale = sub.add_parser("aleatorios", help="Sorteos/s por bloques vs. de a uno")
+    p_ale.add_argument("--cantidad", type=int, default=1_000_000)
+
+    p_reg = sub.add_parser("registro", help="Memoria y armado del DataFrame: dicts vs. columnar")
+    p_reg.add_argument("--hora-cierre", type=float, default=50000.0)
+
+    p_zap = sub.add_parser("zapatos", help="Estados de zapatos: por evento vs. historial")
+    p_zap.add_argument("--hora-cierre", type=float, default=2000.0)
+    p_zap.add_argument("--mu", type=float, default=3.0)
+
+    p_exp = sub.add_parser("exportar", help="Pico de memoria: traza en memoria vs. a disco")
+    p_exp.add_argument("--horas-cierre", type=float, nargs="+", default=[50000.0, 200000.0, 800000.0])
+    p_exp.add_argument("--formato", choices=("parquet", "ipc"), default="parquet")
+
+    p_vivo = sub.add_parser("vivo", help="Primer dibujo: corrida en vivo vs. al terminar")
+    p_vivo.add_argument("--horas-cierre", type=float, nargs="+", default=[480.0, 5000.0, 50000.0])
+
+    p_cola = sub.add_parser("cola", help="Costo por evento vs. zapatos esperando")
+    p_cola.add_argument("--tamanos", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    p_cola.add_argument("--eventos", type=int, default=20000)
+
+    p_suite = sub.add_parser("suite", help="Escenarios fijos; escribe los resultados en JSON")
+    p_suite.add_argument("--salida", default=None, help="Archivo JSON (si no, se imprime)")
+    p_suite.add_argument("--escenarios", nargs="+", choices=list(ESCENARIOS), default=None)
+    p_suite.add_argument("--rapida", action="store_true",
+                         help=f"Sólo {', '.join(ESCENARIOS_RAPIDOS)}")
+    p_suite.add_argument("--repeticiones", type=int, default=5,
+                         help="Se toma el mejor tiempo de estas repeticiones")
+
+    p_comp = sub.add_parser("comparar", help="Compara dos JSON de la suite")
+    p_comp.add_argument("base")
+    p_comp.add_argument("nuevo")
+    p_comp.add_argument("--umbral", type=float, default=UMBRAL_REGRESION,
+                        help="Empeoramiento relativo tolerado (0.25 = 25%%)")
+
+    args = parser.parse_args(argv)
+    if args.bench == "traza":
+        datos = bench_traza(args.hora_cierre, args.semilla)
+        print(f"Eventos:               {datos['eventos']}")
+        print(f"Eventos/s con traza:   {datos['eventos_por_seg_traza']:,.0f}")
+        print(f"Eventos/s sin traza:   {datos['eventos_por_seg_sin_traza']:,.0f}")
+        print(f"Aceleración:           {datos['aceleracion']:.1f}x")
+    elif args.bench == "calendario":
+        print(f"{'n':>6} {'hold us/op':>11} {'motor us/evento':>16} {'log2(n)':>8}")
+        for n in args.servidores:
+            hold = bench_calendario_hold(n)
+            motor = bench_servidores(n)
+            print(f"{n:>6} {hold:>11.2f} {motor['us_por_evento']:>16.2f} {math.log2(max(n, 1)):>8.1f}")
+    elif args.bench == "replicas":
+        base = None
+        print(f"{'procesos':>8} {'replicas/s':>11} {'aceleración':>12}")
+        for n in args.procesos:
+            datos = bench_replicas(n, args.replicas)
+            base = base or datos["replicas_por_seg"]
+            print(f"{n:>8} {datos['replicas_por_seg']:>11.0f} {datos['replicas_por_seg'] / base:>11.2f}x")
+
+    elif args.bench == "vectorizado":
+        datos = bench_vectorizado(args.replicas)
+        print(f"Replicaciones/s escalar (1 proceso): {datos['replicas_por_seg_escalar']:,.0f}")
+        print(f"Replicaciones/s vectorizado:         {datos['replicas_por_seg_vectorizado']:,.0f}")
+        print(f"Aceleración:                         {datos['aceleracion']:.1f}x")
+
+    elif args.bench == "aleatorios":
+        datos = bench_aleatorios(args.cantidad)
+        for dist in ("exponencial", "uniforme"):
+            uno, bloq = datos[f"{dist}_por_llamada"], datos[f"{dist}_por_bloques"]
+            print(f"{dist:<12} por llamada {uno:>12,.0f}/s   por bloques {bloq:>12,.0f}/s   ({bloq / uno:.2f}x)")
+
+    elif args.bench == "registro":
+        datos = bench_registro(args.hora_cierre)
+        print(f"Eventos: {datos['eventos']}")
+        print(f"{'':<10} {'bytes/evento':>13} {'DataFrame (ms)':>15}")
+        print(f"{'dicts':<10} {datos['bytes_por_evento_dicts']:>13.0f} {datos['ms_dataframe_dicts']:>15.2f}")
+        print(f"{'columnar':<10} {datos['bytes_por_evento_columnar']:>13.0f} {datos['ms_dataframe_columnar']:>15.2f}")
+
+    elif args.bench == "zapatos":
+        datos = bench_zapatos(args.hora_cierre, args.mu)
+        print(f"Eventos: {datos['eventos']}   cambios de estado: {datos['cambios']}")
+        print(f"Memoria estado por evento: {datos['kb_por_evento']:>10,.0f} KB")
+        print(f"Memoria historial:         {datos['kb_historial']:>10,.0f} KB")
+        print(f"Vista completa ({datos['columnas_vista_completa']} columnas): {datos['ms_vista_completa']:,.0f} ms")
+        print(f"Vista de una ventana:      {datos['ms_vista_ventana']:,.1f} ms")
+
+    elif args.bench == "exportar":
+        print(f"{'eventos':>8} {'pico memoria MB':>16} {'pico exportando MB':>19} {'archivos MB':>12}")
+        for hora_cierre in args.horas_cierre:
+            datos = bench_exportar(hora_cierre, formato=args.formato)
+            print(f"{datos['eventos']:>8} {datos['mb_pico_en_memoria']:>16.1f} "
+                  f"{datos['mb_pico_exportando']:>19.1f} {datos['mb_archivos']:>12.1f}")
+
+    elif args.bench == "vivo":
+        print(f"{'eventos':>8} {'en vivo (ms)':>13} {'al terminar (ms)':>17}")
+        for hora_cierre in args.horas_cierre:
+            datos = bench_primer_dibujo(hora_cierre)
+            print(f"{datos['eventos']:>8} {datos['ms_primer_dibujo_en_vivo']:>13.1f} "
+                  f"{datos['ms_primer_dibujo_al_final']:>17.1f}")
+
+    elif args.bench == "cola":
+        base = None
+        print(f"{'cola':>8} {'en taller':>10} {'us/evento':>10} {'vs. la menor':>13}")
+        for tamano in args.tamanos:
+            datos = bench_cola(tamano, args.eventos)
+            base = base or datos["us_por_evento"]
+            print(f"{tamano:>8} {datos['zapatos_en_taller']:>10} {datos['us_por_evento']:>10.2f} "
+                  f"{datos['us_por_evento'] / base:>12.2f}x")
+
+    elif args.bench == "suite":
+        escenarios = args.escenarios or (list(ESCENARIOS_RAPIDOS) if args.rapida else None)
+        datos = correr_suite(escenarios, args.repeticiones)
+        texto = json.dumps(datos, indent=2)
+        if args.salida:
+            with open(args.salida, "w") as f:
+                f.write(texto + "\n")
+            for nombre, metricas in datos["escenarios"].items():
+                print(f"{nombre:<10} {metricas['eventos']:>7} eventos  "
+                      f"{metricas['eventos_por_seg_traza']:>10,.0f} eventos/s  "
+                      f"{metricas['mb_pico_traza']:>7.1f} MB")
+            print(f"Importación de motor: {datos['ms_importacion_motor']:.1f} ms -> {args.salida}")
+        else:
+            print(texto)
+
+    elif args.bench == "comparar":
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.nuevo) as f:
+            nuevo = json.load(f)
+        filas = comparar(base, nuevo, args.umbral)
+        for fila in filas:
+            marca = "  REGRESIÓN" if fila["regresion"] else ""
+            print(f"{fila['escenario']:<10} {fila['metrica']:<34} {fila['antes']:>12.2f} "
+                  f"{fila['ahora']:>12.2f} {fila['cambio']:>+8.1%}{marca}")
+        regresiones = sum(f["regresion"] for f in filas)
+        if regresiones:
+            print(f"{regresiones} regresiones por encima del {args.umbral:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
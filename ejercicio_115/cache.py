@@ -0,0 +1,154 @@
+# cache.py
+"""
+Caché de resultados de simular(), para no repetir corridas idénticas.
+
+La clave es un hash canónico de los parámetros (incluida la semilla) y de
+motor.VERSION_MOTOR. Los resultados se guardan en un LRU en memoria de
+tamaño acotado y, opcionalmente, en un directorio en disco (un pickle por
+clave) para que sobrevivan a un reinicio de la aplicación.
+
+Las corridas sin semilla no se guardan: cada una da un resultado distinto.
+
+Una misma instancia se puede usar desde varios hilos (la aplicación
+comparte una entre todas las sesiones): el LRU y los contadores se tocan
+con un lock. Las corridas y la lectura y escritura en disco quedan fuera
+del lock, así que dos hilos pueden simular la misma clave a la vez; el
+segundo en guardar pisa al primero con un resultado igual.
+"""
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import fields
+
+from motor import VERSION_MOTOR, ParametrosSimulacion, ResultadoSimulacion, simular
+
+CAPACIDAD_POR_DEFECTO = 16
+
+
+def clave_parametros(parametros: ParametrosSimulacion, version: int = VERSION_MOTOR) -> str:
+    """
+    Hash canónico de (parámetros, semilla, versión del motor).
+
+    Los campos float se normalizan (mu=20 y mu=20.0 dan la misma clave) y
+    el JSON se arma con las claves ordenadas.
+    """
+    datos = {}
+    for f in fields(parametros):
+        valor = getattr(parametros, f.name)
+        if f.type is float and valor is not None:
+            valor = float(valor)
+        datos[f.name] = valor
+    texto = json.dumps({"version": version, "parametros": datos},
+                       sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+class CacheResultados:
+    """
+    LRU de ResultadoSimulacion con respaldo opcional en disco.
+
+    aciertos cuenta los resultados servidos desde memoria o disco
+    (aciertos_disco, los de disco) y fallos las corridas que hubo que
+    simular.
+    """
+
+    def __init__(self, capacidad: int = CAPACIDAD_POR_DEFECTO, directorio: str | None = None):
+        if capacidad < 1:
+            raise ValueError(f"Capacidad inválida: {capacidad}")
+        self.capacidad = capacidad
+        self.directorio = directorio
+        if directorio is not None:
+            os.makedirs(directorio, exist_ok=True)
+        self._memoria: OrderedDict[str, ResultadoSimulacion] = OrderedDict()
+        self._lock = threading.Lock()   # protege _memoria y los contadores
+        self.aciertos = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._memoria)
+
+    def __contains__(self, clave: str) -> bool:
+        with self._lock:
+            en_memoria = clave in self._memoria
+        return en_memoria or (
+            self.directorio is not None and os.path.exists(self._ruta(clave))
+        )
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, f"{clave}.pkl")
+
+    def _recordar(self, clave: str, resultado: ResultadoSimulacion):
+        with self._lock:
+            self._memoria[clave] = resultado
+            self._memoria.move_to_end(clave)
+            while len(self._memoria) > self.capacidad:
+                self._memoria.popitem(last=False)
+
+    def _buscar(self, clave: str) -> tuple[ResultadoSimulacion | None, bool]:
+        """(resultado, si vino de disco); (None, False) si no está."""
+        with self._lock:
+            resultado = self._memoria.get(clave)
+            if resultado is not None:
+                self._memoria.move_to_end(clave)
+                return resultado, False
+        if self.directorio is None:
+            return None, False
+        try:
+            with open(self._ruta(clave), "rb") as f:
+                resultado = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None, False
+        self._recordar(clave, resultado)
+        return resultado, True
+
+    # ---------------- consulta ----------------
+    def obtener(self, clave: str) -> ResultadoSimulacion | None:
+        """El resultado guardado para la clave, o None (no cuenta aciertos ni fallos)."""
+        return self._buscar(clave)[0]
+
+    def guardar(self, clave: str, resultado: ResultadoSimulacion):
+        self._recordar(clave, resultado)
+        if self.directorio is None:
+            return
+        # Escritura atómica: nunca queda un pickle a medio escribir
+        fd, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(resultado, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporal, self._ruta(clave))
+        except BaseException:
+            os.unlink(temporal)
+            raise
+
+    def simular(self, parametros: ParametrosSimulacion, al_avanzar=None) -> ResultadoSimulacion:
+        """
+        simular() con caché. Sin semilla siempre simula (y no guarda).
+        al_avanzar sólo se llama si hay que simular (ver motor.simular).
+        """
+        if parametros.semilla is None:
+            with self._lock:
+                self.fallos += 1
+            return simular(parametros, al_avanzar=al_avanzar)
+        clave = clave_parametros(parametros)
+        resultado, de_disco = self._buscar(clave)
+        with self._lock:
+            if resultado is not None:
+                self.aciertos += 1
+                self.aciertos_disco += de_disco
+                return resultado
+            self.fallos += 1
+        resultado = simular(parametros, al_avanzar=al_avanzar)
+        self.guardar(clave, resultado)
+        return resultado
+
+    def limpiar(self):
+        """Vacía la memoria (el disco queda como está) y reinicia los contadores."""
+        with self._lock:
+            self._memoria.clear()
+            self.aciertos = self.aciertos_disco = self.fallos = 0
@@ -0,0 +1,83 @@
+# calendario.py
+"""
+Lista de eventos futuros (calendario) sobre un heap binario.
+
+• programar() y proximo() cuestan O(log n).
+• Los empates se resuelven siempre igual: por tiempo, después por la
+  prioridad del tipo de evento, después por el número de servidor y por
+  último por orden de programación.
+• cancelar() es O(1): el evento se marca y se descarta cuando llega al tope.
+"""
+import heapq
+
+# Orden de desempate entre tipos de evento que ocurren en el mismo instante.
+# Es el mismo orden en que el loop original comparaba los eventos con min().
+PRIORIDADES = {
+    "Llegada": 0,
+    "Fin_atencion": 1,
+    "Fin_reparacion": 2,
+}
+PRIORIDAD_POR_DEFECTO = 10
+
+
+class EventoFuturo:
+    """Evento programado. Se usa también como 'handle' para cancelarlo."""
+    __slots__ = ("tiempo", "tipo", "servidor", "dato", "vigente")
+
+    def __init__(self, tiempo: float, tipo: str, servidor: int = 0, dato=None):
+        self.tiempo = tiempo
+        self.tipo = tipo
+        self.servidor = servidor
+        self.dato = dato
+        self.vigente = True   # pasa a False al dispararse o cancelarse
+
+    def __repr__(self):
+        estado = "" if self.vigente else " (no vigente)"
+        return f"EventoFuturo({self.tipo}, t={self.tiempo:.2f}, servidor={self.servidor}{estado})"
+
+
+class CalendarioEventos:
+    """Calendario de eventos futuros con desempate determinístico y cancelación."""
+
+    def __init__(self):
+        self._heap: list[tuple] = []
+        self._secuencia = 0
+        self._vigentes = 0
+
+    def __len__(self) -> int:
+        """Cantidad de eventos pendientes (sin contar los cancelados)."""
+        return self._vigentes
+
+    def programar(self, tiempo: float, tipo: str, servidor: int = 0,
+                  dato=None, prioridad: int | None = None) -> EventoFuturo:
+        if prioridad is None:
+            prioridad = PRIORIDADES.get(tipo, PRIORIDAD_POR_DEFECTO)
+        evento = EventoFuturo(tiempo, tipo, servidor, dato)
+        heapq.heappush(self._heap, (tiempo, prioridad, servidor, self._secuencia, evento))
+        self._secuencia += 1
+        self._vigentes += 1
+        return evento
+
+    def cancelar(self, evento: EventoFuturo | None):
+        """Cancela un evento pendiente. Con None o un evento ya disparado no hace nada."""
+        if evento is not None and evento.vigente:
+            evento.vigente = False
+            self._vigentes -= 1
+
+    def proximo(self) -> EventoFuturo | None:
+        """Saca y devuelve el próximo evento vigente, o None si no hay."""
+        heap = self._heap
+        while heap:
+            evento = heapq.heappop(heap)[4]
+            if evento.vigente:
+                evento.vigente = False
+                self._vigentes -= 1
+                return evento
+        return None
+
+    def ver_proximo(self) -> EventoFuturo | None:
+        """Devuelve el próximo evento vigente sin sacarlo."""
+        heap = self._heap
+        while heap and not heap[0][4].vigente:
+            heapq.heappop(heap)
+        return heap[0][4] if heap else None
@@ -0,0 +1,300 @@
+# estadisticas.py
+"""
+Herramientas estadísticas del motor (sin numpy ni pandas).
+"""
+import math
+from functools import lru_cache
+
+
+# ------------------------------------------------------------
+# 1) Media y varianza en línea (Welford)
+# ------------------------------------------------------------
+class AcumuladorWelford:
+    """Media y varianza muestral en O(1) memoria, un valor por vez."""
+    __slots__ = ("n", "media", "_m2")
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self._m2 = 0.0
+
+    def agregar(self, x: float):
+        self.n += 1
+        delta = x - self.media
+        self.media += delta / self.n
+        self._m2 += delta * (x - self.media)
+
+    @property
+    def varianza(self) -> float:
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def desvio(self) -> float:
+        return math.sqrt(self.varianza)
+
+
+class AcumuladorTiempo:
+    """
+    Promedio ponderado por tiempo de una magnitud escalonada (largo de
+    cola, zapateros ocupados, ...): se llama a actualizar() cada vez que
+    cambia el valor y se acumula el área bajo la curva.
+    """
+    __slots__ = ("inicio", "_t", "valor", "_area", "maximo")
+
+    def __init__(self, valor: float = 0.0, t: float = 0.0):
+        self.inicio = t
+        self._t = t
+        self.valor = valor
+        self._area = 0.0
+        self.maximo = valor
+
+    def actualizar(self, t: float, valor: float):
+        self._area += self.valor * (t - self._t)
+        self._t = t
+        self.valor = valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def area(self, t: float) -> float:
+        """Área acumulada hasta t (t >= último cambio)."""
+        return self._area + self.valor * (t - self._t)
+
+    def media(self, t: float) -> float:
+        duracion = t - self.inicio
+        return self.area(t) / duracion if duracion > 0 else self.valor
+
+
+# ------------------------------------------------------------
+# 2) Indicadores de un día, en línea
+# ------------------------------------------------------------
+# Códigos de estado de los zapatos: los mismos de traza.ESTADOS_ZAPATO
+# (no se importa traza para no cargar numpy)
+_EN_COLA, _REPARANDO, _INTERRUMPIDO, _LISTO_PARA_RETIRO, _RETIRADO = range(5)
+
+
+class IndicadoresDia:
+    """
+    Indicadores del día que el motor actualiza en cada cambio de estado,
+    sin recorrer la traza después:
+
+    • largo de la cola (el mismo que usa cant_max_cola), ponderado por tiempo
+    • utilización de los zapateros (atendiendo, reparando y total)
+    • interrupciones de reparaciones, atenciones reemplazadas, pedidos
+      rechazados después del cierre y retiros sin zapato listo
+    • tiempos de los zapatos que llegan en el día: espera hasta empezar la
+      reparación, permanencia hasta quedar listos y espera hasta el retiro
+
+    La memoria no depende de la cantidad de eventos: sólo se guarda la
+    hora de llegada / de listo de los zapatos que todavía están en el taller.
+    """
+    __slots__ = ("cant_zapateros", "capacidad", "cola", "atendiendo", "reparando",
+                 "interrupciones", "atenciones_reemplazadas", "pedidos",
+                 "pedidos_rechazados", "retiros_sin_zapato",
+                 "espera_reparacion", "tiempo_en_taller", "espera_retiro",
+                 "_llegada", "_esperando", "_listo")
+
+    def __init__(self, cant_zapateros: int = 1):
+        self.cant_zapateros = cant_zapateros
+        self.capacidad = AcumuladorTiempo(cant_zapateros)   # zapateros disponibles
+        self.cola = AcumuladorTiempo()
+        self.atendiendo = AcumuladorTiempo()
+        self.reparando = AcumuladorTiempo()
+        self.interrupciones = 0
+        self.atenciones_reemplazadas = 0
+        self.pedidos = 0                # incluye los rechazados
+        self.pedidos_rechazados = 0
+        self.retiros_sin_zapato = 0
+        self.espera_reparacion = AcumuladorWelford()
+        self.tiempo_en_taller = AcumuladorWelford()
+        self.espera_retiro = AcumuladorWelford()
+        self._llegada: dict[int, float] = {}
+        self._esperando: dict[int, float] = {}
+        self._listo: dict[int, float] = {}
+
+    def cambiar_zapateros(self, t: float, cant_zapateros: int):
+        """Cambio en la cantidad de zapateros a mitad de la corrida."""
+        self.capacidad.actualizar(t, cant_zapateros)
+        self.cant_zapateros = cant_zapateros
+
+    def ocupacion(self, t: float, atendiendo: int, reparando: int):
+        # Inline de AcumuladorTiempo.actualizar: se llama en cada cambio de
+        # estado de un zapatero
+        a, r = self.atendiendo, self.reparando
+        if atendiendo != a.valor:
+            a._area += a.valor * (t - a._t)
+            a._t, a.valor = t, atendiendo
+            if atendiendo > a.maximo:
+                a.maximo = atendiendo
+        if reparando != r.valor:
+            r._area += r.valor * (t - r._t)
+            r._t, r.valor = t, reparando
+            if reparando > r.maximo:
+                r.maximo = reparando
+
+    def zapato(self, t: float, zapato_id: int, estado: int):
+        """Cambio de estado de un zapato (código de traza.ESTADOS_ZAPATO)."""
+        if estado == _EN_COLA:
+            self._llegada[zapato_id] = self._esperando[zapato_id] = t
+        elif estado == _REPARANDO:
+            llegada = self._esperando.pop(zapato_id, None)
+            if llegada is not None:
+                self.espera_reparacion.agregar(t - llegada)
+        elif estado == _LISTO_PARA_RETIRO:
+            llegada = self._llegada.pop(zapato_id, None)
+            if llegada is not None:
+                self.tiempo_en_taller.agregar(t - llegada)
+                self._listo[zapato_id] = t
+        elif estado == _RETIRADO:
+            listo = self._listo.pop(zapato_id, None)
+            if listo is not None:
+                self.espera_retiro.agregar(t - listo)
+
+    def resumen(self, t: float) -> dict:
+        """Indicadores al instante t (normalmente la hora final)."""
+        capacidad = self.capacidad.area(t)
+        if capacidad > 0:
+            atendiendo = self.atendiendo.area(t) / capacidad
+            reparando = self.reparando.area(t) / capacidad
+        else:
+            atendiendo = self.atendiendo.valor / self.cant_zapateros
+            reparando = self.reparando.valor / self.cant_zapateros
+        return {
+            "largo_medio_cola": self.cola.media(t),
+            "utilizacion": atendiendo + reparando,
+            "utilizacion_atencion": atendiendo,
+            "utilizacion_reparacion": reparando,
+            "interrupciones": self.interrupciones,
+            "atenciones_reemplazadas": self.atenciones_reemplazadas,
+            "pedidos": self.pedidos,
+            "pedidos_rechazados": self.pedidos_rechazados,
+            "fraccion_rechazados": self.pedidos_rechazados / self.pedidos if self.pedidos else 0.0,
+            "retiros_sin_zapato": self.retiros_sin_zapato,
+            "espera_reparacion_media": self.espera_reparacion.media,
+            "espera_reparacion_desvio": self.espera_reparacion.desvio,
+            "tiempo_en_taller_media": self.tiempo_en_taller.media,
+            "tiempo_en_taller_desvio": self.tiempo_en_taller.desvio,
+            "espera_retiro_media": self.espera_retiro.media,
+            "espera_retiro_desvio": self.espera_retiro.desvio,
+            "zapatos_retirados": self.espera_retiro.n,
+        }
+
+
+# ------------------------------------------------------------
+# 3) Intervalos de confianza
+# ------------------------------------------------------------
+def _beta_incompleta(x: float, a: float, b: float) -> float:
+    """Beta incompleta regularizada I_x(a, b) (fracción continua, Lentz)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    if x > (a + 1) / (a + b + 2):
+        # La fracción converge rápido sólo de este lado: I_x(a,b) = 1 - I_{1-x}(b,a)
+        return 1.0 - _beta_incompleta(1.0 - x, b, a)
+    log_frente = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                  + a * math.log(x) + b * math.log1p(-x))
+    minimo = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > minimo else minimo)
+    f = d
+    for m in range(1, 300):
+        for numerador in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + numerador * d
+            d = 1.0 / (d if abs(d) > minimo else minimo)
+            c = 1.0 + numerador / c
+            c = c if abs(c) > minimo else minimo
+            f *= c * d
+        if abs(c * d - 1.0) < 1e-15:
+            break
+    return math.exp(log_frente) * f / a
+
+
+def distribucion_t(t: float, gl: float) -> float:
+    """P(T <= t) para la t de Student con gl grados de libertad."""
+    cola = 0.5 * _beta_incompleta(gl / (gl + t * t), gl / 2, 0.5)
+    return 1.0 - cola if t > 0 else cola
+
+
+@lru_cache(maxsize=512)
+def cuantil_t(p: float, gl: int) -> float:
+    """
+    Cuantil p de la t de Student con gl grados de libertad.
+
+    Exacto para gl = 1 y 2; para gl >= 3 invierte la distribución (beta
+    incompleta) por bisección, a precisión de máquina también en las colas
+    que piden los niveles de Bonferroni.
+    """
+    if gl < 1:
+        raise ValueError(f"Grados de libertad inválidos: {gl}")
+    if not 0.0 < p < 1.0:
+        raise ValueError(f"Probabilidad inválida: {p}")
+    if gl == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if gl == 2:
+        return (2 * p - 1) * math.sqrt(2 / (4 * p * (1 - p)))
+    if p < 0.5:
+        return -cuantil_t(1.0 - p, gl)
+    bajo, alto = 0.0, 1.0
+    while distribucion_t(alto, gl) < p:
+        bajo, alto = alto, 2 * alto
+    while alto - bajo > 1e-12 * alto:
+        medio = (bajo + alto) / 2
+        if distribucion_t(medio, gl) < p:
+            bajo = medio
+        else:
+            alto = medio
+    return (bajo + alto) / 2
+
+
+def semiancho(desvio: float, n: int, nivel_confianza: float = 0.95) -> float:
+    """Semiancho del intervalo t para la media de n observaciones."""
+    if n < 2:
+        return math.inf
+    return cuantil_t(0.5 + nivel_confianza / 2, n - 1) * desvio / math.sqrt(n)
+
+
+# ------------------------------------------------------------
+# 4) Estado estacionario
+# ------------------------------------------------------------
+def truncamiento_mser(serie, tam_lote: int = 5) -> int:
+    """
+    Cantidad de observaciones iniciales a descartar (calentamiento) según
+    MSER-m: se agrupa la serie en lotes de tam_lote y se elige el corte d
+    que minimiza la varianza de la media de lo que queda,
+    sum((y_i - media_d)^2) / (n - d)^2. Sólo se busca en la primera mitad
+    de los lotes; el resultado es múltiplo de tam_lote.
+    """
+    if tam_lote < 1:
+        raise ValueError(f"Tamaño de lote inválido: {tam_lote}")
+    lotes = [sum(serie[i:i + tam_lote]) / tam_lote
+             for i in range(0, len(serie) - tam_lote + 1, tam_lote)]
+    k = len(lotes)
+    if k < 2:
+        return 0
+    # Sumas desde el final para evaluar todos los cortes en O(k)
+    suma = cuadrados = 0.0
+    mejor, corte = math.inf, 0
+    for d in range(k - 1, -1, -1):
+        suma += lotes[d]
+        cuadrados += lotes[d] * lotes[d]
+        if d > k // 2:
+            continue
+        n = k - d
+        estadistico = max(cuadrados - suma * suma / n, 0.0) / (n * n)
+        if estadistico <= mejor:   # en empates gana el corte más chico
+            mejor, corte = estadistico, d
+    return corte * tam_lote
+
+
+def autocorrelacion(valores, lag: int = 1) -> float:
+    """Autocorrelación muestral de orden lag (0.0 si no alcanza o no varía)."""
+    n = len(valores)
+    if n <= lag + 1:
+        return 0.0
+    media = sum(valores) / n
+    den = sum((x - media) ** 2 for x in valores)
+    if den == 0:
+        return 0.0
+    num = sum((valores[i] - media) * (valores[i + lag] - media) for i in range(n - lag))
+    return num / den
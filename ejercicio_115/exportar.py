@@ -0,0 +1,250 @@
+# exportar.py
+"""
+Exportación de la traza a Parquet o Arrow IPC a medida que corre la
+simulación.
+
+SumideroTraza es un RegistroTraza de capacidad fija: cada vez que se llena
+escribe las filas como un record batch y vuelve a empezar, así que la
+memoria queda acotada por tam_lote sin importar cuántos eventos haya. Lo
+mismo hace con el historial de los zapatos, en un archivo aparte.
+
+El formato sale de la extensión: .parquet, o .arrow / .feather / .ipc
+para Arrow IPC. leer_traza() y leer_zapatos() abren los archivos con
+memory map y devuelven los mismos DataFrames que traza.a_dataframe() y
+traza.zapatos.a_dataframe().
+
+    python exportar.py --salida traza_larga --hora-cierre 100000 --semilla 1
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from motor import ParametrosSimulacion, agregar_argumentos_modelo, parametros_desde_args, simular
+from traza import (CATEGORIAS_INICIALES, COLUMNAS_CATEGORICAS, COLUMNAS_FLOAT, COLUMNAS_INT,
+                   ESTADOS_ZAPATO, ORDEN_COLUMNAS, HistorialZapatos, RegistroTraza)
+
+TAM_LOTE = 8192
+
+EXTENSIONES = {".parquet": "parquet", ".arrow": "ipc", ".feather": "ipc", ".ipc": "ipc"}
+
+# ------------------------------------------------------------
+# 1) Esquemas
+# ------------------------------------------------------------
+# Las columnas categóricas se escriben como texto (null = vacío) y los
+# float vacíos como NaN, igual que en memoria
+_TIPOS = {c: pa.float64() for c in COLUMNAS_FLOAT}
+_TIPOS.update({c: pa.int64() for c in COLUMNAS_INT})
+_TIPOS.update({c: pa.string() for c in COLUMNAS_CATEGORICAS})
+ESQUEMA_TRAZA = pa.schema([(c, _TIPOS[c]) for c in ORDEN_COLUMNAS])
+
+ESQUEMA_ZAPATOS = pa.schema([
+    ("nro_evento", pa.int64()),
+    ("reloj", pa.float64()),
+    ("zapato", pa.int64()),
+    ("estado", pa.string()),
+])
+
+
+def _formato(ruta: str) -> str:
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension not in EXTENSIONES:
+        raise ValueError(f"Extensión no soportada: {ruta!r} (usar {', '.join(EXTENSIONES)})")
+    return EXTENSIONES[extension]
+
+
+def _texto(codigos: np.ndarray, valores: list[str]) -> pa.Array:
+    """Códigos categóricos (-1 = None) a columna de texto."""
+    indices = pa.array(codigos, mask=codigos < 0)
+    return pa.DictionaryArray.from_arrays(indices, pa.array(valores, pa.string())).cast(pa.string())
+
+
+class _Escritor:
+    """Escribe record batches en un archivo Parquet o Arrow IPC."""
+
+    def __init__(self, ruta: str, esquema: pa.Schema):
+        self.ruta = ruta
+        if _formato(ruta) == "parquet":
+            self._escritor = pq.ParquetWriter(ruta, esquema)
+        else:
+            self._escritor = pa.ipc.new_file(ruta, esquema)
+
+    def escribir(self, lote: pa.RecordBatch):
+        self._escritor.write_batch(lote)
+
+    def cerrar(self):
+        self._escritor.close()
+
+
+# ------------------------------------------------------------
+# 2) Sumideros
+# ------------------------------------------------------------
+class _HistorialEnDisco(HistorialZapatos):
+    """HistorialZapatos que escribe un lote cada vez que se llena."""
+
+    def __init__(self, escritor: _Escritor, tam_lote: int):
+        super().__init__(capacidad=tam_lote)
+        self._escritor = escritor
+        self._escritos = 0
+
+    def __len__(self) -> int:
+        return self._escritos + self._n
+
+    def _crecer(self):
+        self.volcar()
+
+    def volcar(self):
+        n = self._n
+        if not n:
+            return
+        self._escritor.escribir(pa.record_batch([
+            pa.array(self._evento[:n]),
+            pa.array(self._reloj[:n]),
+            pa.array(self._zapato[:n]),
+            _texto(self._estado[:n], list(ESTADOS_ZAPATO)),
+        ], schema=ESQUEMA_ZAPATOS))
+        self._escritos += n
+        self._n = 0
+
+
+class SumideroTraza(RegistroTraza):
+    """
+    Registro de la traza que va escribiendo a disco de a tam_lote filas.
+
+    En memoria queda sólo el lote en curso: a_dataframe(), a_multiindex()
+    y compañía ven únicamente esas filas. Para analizar la corrida se
+    leen los archivos (leer_traza / leer_zapatos) después de cerrar().
+    """
+
+    def __init__(self, ruta_traza: str, ruta_zapatos: str | None = None,
+                 tam_lote: int = TAM_LOTE):
+        if tam_lote < 1:
+            raise ValueError(f"Tamaño de lote inválido: {tam_lote}")
+        super().__init__(con_zapatos=ruta_zapatos is not None, capacidad=tam_lote)
+        self._escritor = _Escritor(ruta_traza, ESQUEMA_TRAZA)
+        self._escritos = 0
+        if ruta_zapatos is not None:
+            self.zapatos = _HistorialEnDisco(_Escritor(ruta_zapatos, ESQUEMA_ZAPATOS), tam_lote)
+
+    def __len__(self) -> int:
+        return self._escritos + self._n
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def _crecer(self):
+        self.volcar()
+
+    def cambio_zapato(self, zapato: int, estado: int, reloj: float):
+        self.zapatos.agregar(self._escritos + self._n, reloj, zapato, estado)
+
+    def volcar(self):
+        """Escribe las filas en memoria como un record batch."""
+        n = self._n
+        if not n:
+            return
+        columnas = {c: pa.array(self._f[:n, j]) for j, c in enumerate(COLUMNAS_FLOAT)}
+        columnas.update({c: pa.array(self._i[:n, j]) for j, c in enumerate(COLUMNAS_INT)})
+        columnas.update({c: _texto(self._c[:n, j], self._categorias[c].valores)
+                         for j, c in enumerate(COLUMNAS_CATEGORICAS)})
+        self._escritor.escribir(pa.record_batch([columnas[c] for c in ORDEN_COLUMNAS],
+                                                schema=ESQUEMA_TRAZA))
+        self._escritos += n
+        self._n = 0
+
+    def cerrar(self):
+        self.volcar()
+        self._escritor.cerrar()
+        if self.con_zapatos:
+            self.zapatos.volcar()
+            self.zapatos._escritor.cerrar()
+
+
+def exportar(parametros: ParametrosSimulacion, directorio: str, formato: str = "parquet",
+             tam_lote: int = TAM_LOTE, con_zapatos: bool = True):
+    """
+    Corre un día escribiendo la traza en directorio/traza.<ext> (y el
+    historial de los zapatos en directorio/zapatos.<ext>).
+
+    Devuelve (resultado, ruta_traza, ruta_zapatos o None).
+    """
+    extension = {"parquet": ".parquet", "ipc": ".arrow"}.get(formato)
+    if extension is None:
+        raise ValueError(f"Formato no soportado: {formato}")
+    os.makedirs(directorio, exist_ok=True)
+    ruta_traza = os.path.join(directorio, "traza" + extension)
+    ruta_zapatos = os.path.join(directorio, "zapatos" + extension) if con_zapatos else None
+    with SumideroTraza(ruta_traza, ruta_zapatos, tam_lote) as sumidero:
+        resultado = simular(parametros, traza=sumidero)
+    return resultado, ruta_traza, ruta_zapatos
+
+
+# ------------------------------------------------------------
+# 3) Lectura
+# ------------------------------------------------------------
+def abrir(ruta: str) -> pa.Table:
+    """Tabla de Arrow leída con memory map (sin copia en Arrow IPC)."""
+    if _formato(ruta) == "parquet":
+        return pq.read_table(ruta, memory_map=True)
+    with pa.memory_map(ruta) as fuente:
+        return pa.ipc.open_file(fuente).read_all()
+
+
+def _categorica(columna, iniciales):
+    """Misma categórica que arma traza._Categorias: iniciales y después por aparición."""
+    import pandas as pd
+
+    nuevas = [v for v in columna.dropna().unique().tolist() if v not in iniciales]
+    return pd.Categorical(columna, categories=list(iniciales) + nuevas)
+
+
+def leer_traza(ruta: str):
+    """La traza exportada como el DataFrame de RegistroTraza.a_dataframe()."""
+    df = abrir(ruta).to_pandas()
+    for c in COLUMNAS_CATEGORICAS:
+        df[c] = _categorica(df[c], CATEGORIAS_INICIALES[c])
+    return df
+
+
+def leer_zapatos(ruta: str):
+    """El historial exportado como el DataFrame de HistorialZapatos.a_dataframe()."""
+    import pandas as pd
+
+    df = abrir(ruta).to_pandas()
+    df["estado"] = pd.Categorical(df["estado"], categories=ESTADOS_ZAPATO)
+    return df
+
+
+# ------------------------------------------------------------
+# 4) Línea de comandos
+# ------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta la traza de un día a Parquet o Arrow.")
+    agregar_argumentos_modelo(parser)
+    parser.add_argument("--salida", required=True, help="Directorio de salida")
+    parser.add_argument("--formato", choices=("parquet", "ipc"), default="parquet")
+    parser.add_argument("--tam-lote", type=int, default=TAM_LOTE)
+    parser.add_argument("--sin-zapatos", action="store_true",
+                        help="No exportar el historial de los zapatos")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    resultado, ruta_traza, ruta_zapatos = exportar(
+        parametros_desde_args(args), args.salida, args.formato, args.tam_lote,
+        con_zapatos=not args.sin_zapatos,
+    )
+    segundos = time.perf_counter() - inicio
+    print(f"Eventos: {resultado.cant_eventos} en {segundos:.2f} s")
+    for ruta in (ruta_traza, ruta_zapatos):
+        if ruta is not None:
+            print(f"{ruta}: {os.path.getsize(ruta) / 1024:,.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
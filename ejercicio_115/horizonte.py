@@ -0,0 +1,407 @@
+# horizonte.py
+"""
+Simulación de muchos días seguidos (régimen estacionario).
+
+SimulacionHorizonte encadena días sobre una sola Simulacion: el reloj
+sigue corriendo y el stock listo para retiro (ready_queue), la cola de
+pedidos y las reparaciones sin terminar pasan de un día al siguiente.
+Cada día abre a la hora dia * duracion_dia con un evento "Apertura" y
+acepta pedidos hasta hora_cierre (relativa a la apertura). Sin
+fin_jornada se trabaja hasta vaciar el taller, como en un día de
+simular(); con fin_jornada los zapateros cortan a esa hora (evento
+"Fin_jornada"), las reparaciones en curso quedan interrumpidas y se
+retoman a la apertura siguiente.
+
+Por día se guardan sólo unos totales (columnas de COLUMNAS_DIA), así que
+la memoria no crece con la cantidad de eventos. Al terminar:
+
+• el calentamiento se detecta con MSER-5 sobre las series diarias de
+  METRICAS_CALENTAMIENTO (se toma el corte más largo);
+• con los días que quedan se estiman las métricas con medias por lotes
+  (intervalo t sobre las medias de cant_lotes lotes de días seguidos).
+
+    python horizonte.py --dias 365 --semilla 1
+    python horizonte.py --dias 3650 --fin-jornada 540 --semilla 1 --salida dias.csv
+"""
+import argparse
+import csv
+import json
+import time
+from array import array
+from dataclasses import dataclass, field
+
+from estadisticas import autocorrelacion, semiancho, truncamiento_mser
+from motor import (ParametrosSimulacion, Simulacion, agregar_argumentos_modelo,
+                   parametros_desde_args)
+from replicaciones import Estimacion
+from traza import RegistroTraza
+
+DURACION_DIA = 1440.0   # minutos entre dos aperturas
+CANT_LOTES = 20
+TAM_LOTE_MSER = 5
+
+# Totales por día (los acumulados son diferencias entre aperturas; stock
+# y pendientes son el nivel al final del día)
+COLUMNAS_DIA = ("inicio", "duracion", "pedidos", "pedidos_rechazados", "pares_reparados",
+                "tiempo_reparacion", "zapatos_listos", "tiempo_en_taller",
+                "zapatos_retirados", "espera_retiro", "retiros_sin_zapato",
+                "interrupciones", "area_cola", "area_ocupados",
+                "stock_listo", "pedidos_pendientes")
+
+# métrica -> (numerador, denominador) sobre las columnas diarias; sin
+# denominador es un promedio por día
+METRICAS_ESTACIONARIAS = {
+    "avg_rep": ("tiempo_reparacion", "pares_reparados"),
+    "tiempo_en_taller": ("tiempo_en_taller", "zapatos_listos"),
+    "espera_retiro": ("espera_retiro", "zapatos_retirados"),
+    "largo_medio_cola": ("area_cola", "duracion"),
+    "utilizacion": ("area_ocupados", "duracion"),
+    "pares_por_dia": ("pares_reparados", None),
+    "stock_listo": ("stock_listo", None),
+    "pedidos_pendientes": ("pedidos_pendientes", None),
+}
+NOMBRES_METRICAS = {
+    "avg_rep": "Tiempo promedio reparación",
+    "tiempo_en_taller": "Tiempo en el taller",
+    "espera_retiro": "Espera hasta el retiro",
+    "largo_medio_cola": "Largo medio de cola",
+    "utilizacion": "Utilización de zapateros",
+    "pares_por_dia": "Pares reparados por día",
+    "stock_listo": "Stock listo al cierre",
+    "pedidos_pendientes": "Pedidos pendientes al cierre",
+}
+# Series que arrastran estado de un día a otro: definen el calentamiento
+METRICAS_CALENTAMIENTO = ("stock_listo", "pedidos_pendientes", "largo_medio_cola", "utilizacion")
+
+
+# ------------------------------------------------------------
+# 1) Simulación de varios días
+# ------------------------------------------------------------
+class SimulacionHorizonte(Simulacion):
+    """
+    Simulacion de cant_dias días seguidos (ver el docstring del módulo).
+    Por defecto corre sin traza; con una traza (p. ej.
+    exportar.SumideroTraza) todos los días van al mismo registro y el
+    reloj es absoluto.
+    """
+
+    def __init__(self, parametros: ParametrosSimulacion, cant_dias: int,
+                 duracion_dia: float = DURACION_DIA, fin_jornada: float | None = None,
+                 registrar_traza: bool = False, traza: RegistroTraza | None = None):
+        if cant_dias < 1:
+            raise ValueError(f"Cantidad de días inválida: {cant_dias}")
+        if duracion_dia < parametros.hora_cierre or duracion_dia <= 0:
+            raise ValueError(f"Duración del día inválida: {duracion_dia}")
+        if fin_jornada is not None and not (parametros.hora_cierre <= fin_jornada <= duracion_dia):
+            raise ValueError(f"Fin de jornada inválido: {fin_jornada}")
+        self.cant_dias = cant_dias
+        self.duracion_dia = duracion_dia
+        self.fin_jornada = fin_jornada
+        self.dia = 0
+        self._apertura = None           # evento "Apertura" programado
+        self._evento_fin_jornada = None
+        # 8 bytes por columna y por día: un año entero son unos 47 KB
+        self.dias = {c: array("d") for c in COLUMNAS_DIA}
+        super().__init__(parametros, registrar_traza, traza)
+        self._inicio_dia = 0.0
+        self._acumulado = self._acumulados(0.0)
+        self._programar_fin_jornada()
+
+    def _procesar(self, evento):
+        if evento.tipo == "Apertura":
+            self.reloj = evento.tiempo
+            self._abrir()
+        elif evento.tipo == "Fin_jornada":
+            self.reloj = evento.tiempo
+            self._terminar_jornada()
+        else:
+            super()._procesar(evento)
+
+    def resultado(self, calentamiento: int | None = None, cant_lotes: int = CANT_LOTES,
+                  nivel_confianza: float = 0.95) -> "ResultadoHorizonte":
+        """Cierra el último día y estima el régimen estacionario (ver estimar_estacionario)."""
+        if len(self.dias["inicio"]) <= self.dia:
+            self._cerrar_dia(max(self.reloj, self._inicio_dia + self.duracion_dia))
+        return estimar_estacionario(self, calentamiento, cant_lotes, nivel_confianza)
+
+    # ---------------- días ----------------
+    def _abrir(self):
+        self._apertura = None
+        self._cerrar_dia(self.reloj)
+        self.dia += 1
+        self.hora_cierre = self.reloj + self.parametros.hora_cierre
+        for z in self.zapateros:
+            if z.reparacion_restante is not None:
+                self._retomar_reparacion(z)
+        for z in self.zapateros:
+            if z.estado == "Libre" and self.cola_pedidos:
+                self._empezar_reparacion(z)
+        self.rnd_llegada, self.tiempo_entre = self.fuentes.llegadas.sortear()
+        self.llegada = self.calendario.programar(self.reloj + self.tiempo_entre, "Llegada")
+        self._programar_fin_jornada()
+        self._registrar("Apertura")
+
+    def _terminar_jornada(self):
+        """Corta la jornada: sin más llegadas y con las reparaciones suspendidas."""
+        self._evento_fin_jornada = None
+        self.calendario.cancelar(self.llegada)
+        self.llegada = None
+        for z in self.zapateros:
+            if z.estado == "Atendiendo":
+                # El cliente ya dejó (o retiró) el zapato: la atención se da por terminada
+                self.calendario.cancelar(z.fin_atencion)
+                z.fin_atencion = None
+            elif z.estado == "Reparando":
+                self._interrumpir_reparacion(z)
+            self._cambiar_estado(z, "Libre")
+        self._programar_apertura()
+        self._registrar("Fin_jornada")
+
+    def _verificar_cierre(self):
+        super()._verificar_cierre()
+        if self.llegada is None and self._apertura is None:
+            # Se vació el taller antes del fin de jornada
+            self.calendario.cancelar(self._evento_fin_jornada)
+            self._evento_fin_jornada = None
+            self._programar_apertura()
+
+    def _programar_fin_jornada(self):
+        if self.fin_jornada is not None:
+            self._evento_fin_jornada = self.calendario.programar(
+                self._inicio_dia + self.fin_jornada, "Fin_jornada")
+
+    def _programar_apertura(self):
+        if self.dia + 1 >= self.cant_dias:
+            return   # último día: al vaciarse el calendario termina la corrida
+        # Si el día anterior se estiró más allá de la apertura, se abre al terminar
+        tiempo = max(self.reloj, self._inicio_dia + self.duracion_dia)
+        self._apertura = self.calendario.programar(tiempo, "Apertura")
+
+    def _acumulados(self, t: float) -> dict:
+        ind = self.indicadores
+        return {
+            "pedidos": ind.pedidos,
+            "pedidos_rechazados": ind.pedidos_rechazados,
+            "pares_reparados": self.cant_pares_reparados,
+            "tiempo_reparacion": self.acum_tiempo_rep,
+            "zapatos_listos": ind.tiempo_en_taller.n,
+            "tiempo_en_taller": ind.tiempo_en_taller.n * ind.tiempo_en_taller.media,
+            "zapatos_retirados": ind.espera_retiro.n,
+            "espera_retiro": ind.espera_retiro.n * ind.espera_retiro.media,
+            "retiros_sin_zapato": ind.retiros_sin_zapato,
+            "interrupciones": ind.interrupciones,
+            "area_cola": ind.cola.area(t),
+            "area_ocupados": (ind.atendiendo.area(t) + ind.reparando.area(t)) / ind.cant_zapateros,
+        }
+
+    def _cerrar_dia(self, t: float):
+        """Agrega la fila del día que termina en t."""
+        acumulado = self._acumulados(t)
+        dias = self.dias
+        dias["inicio"].append(self._inicio_dia)
+        dias["duracion"].append(t - self._inicio_dia)
+        for columna, valor in acumulado.items():
+            dias[columna].append(valor - self._acumulado[columna])
+        dias["stock_listo"].append(self.zapatos_para_retirar)
+        dias["pedidos_pendientes"].append(
+            len(self.cola_pedidos) + sum(1 for z in self.zapateros if z.zapato_actual))
+        self._acumulado = acumulado
+        self._inicio_dia = t
+
+
+# ------------------------------------------------------------
+# 2) Estimación del régimen estacionario
+# ------------------------------------------------------------
+@dataclass
+class ResultadoHorizonte:
+    cant_dias: int
+    cant_eventos: int
+    hora_final: float
+    semilla: int | None
+    calentamiento: int                      # días descartados al principio
+    calentamiento_por_metrica: dict[str, int]
+    cant_lotes: int
+    dias_por_lote: int
+    estimaciones: dict[str, Estimacion]
+    autocorrelacion: dict[str, float]       # lag 1 entre medias de lotes
+    nivel_confianza: float
+    advertencias: list[str] = field(default_factory=list)
+    indicadores: dict = field(default_factory=dict)   # de toda la corrida
+    dias: dict[str, array] = field(default_factory=dict, repr=False)
+    traza: RegistroTraza | None = field(default=None, repr=False)
+
+    def tabla(self) -> list[dict]:
+        """Una fila por métrica (para mostrar o exportar)."""
+        return [
+            {
+                "Métrica": NOMBRES_METRICAS[m],
+                "Media": e.media,
+                "Desvío": e.desvio,
+                "Semiancho": e.semiancho,
+                "IC inferior": e.inferior,
+                "IC superior": e.superior,
+                "Lotes": e.n,
+                "Autocorrelación": self.autocorrelacion[m],
+            }
+            for m, e in self.estimaciones.items()
+        ]
+
+    def filas_dias(self) -> list[dict]:
+        """Las columnas diarias como filas (una por día)."""
+        return [dict(zip(self.dias, valores)) for valores in zip(*self.dias.values())]
+
+    def resumen(self) -> dict:
+        """Todo menos las series diarias y la traza (para logs, JSON, etc.)."""
+        return {
+            "cant_dias": self.cant_dias,
+            "cant_eventos": self.cant_eventos,
+            "hora_final": self.hora_final,
+            "semilla": self.semilla,
+            "calentamiento": self.calentamiento,
+            "calentamiento_por_metrica": self.calentamiento_por_metrica,
+            "cant_lotes": self.cant_lotes,
+            "dias_por_lote": self.dias_por_lote,
+            "nivel_confianza": self.nivel_confianza,
+            "estimaciones": {m: vars(e) for m, e in self.estimaciones.items()},
+            "autocorrelacion": self.autocorrelacion,
+            "advertencias": self.advertencias,
+            "indicadores": self.indicadores,
+        }
+
+
+def serie_diaria(dias: dict, metrica: str) -> list[float]:
+    """Valor de la métrica día por día (0.0 los días sin observaciones)."""
+    numerador, denominador = METRICAS_ESTACIONARIAS[metrica]
+    if denominador is None:
+        return [float(x) for x in dias[numerador]]
+    return [n / d if d else 0.0 for n, d in zip(dias[numerador], dias[denominador])]
+
+
+def estimar_estacionario(sim: SimulacionHorizonte, calentamiento: int | None = None,
+                         cant_lotes: int = CANT_LOTES,
+                         nivel_confianza: float = 0.95) -> ResultadoHorizonte:
+    """
+    Descarta el calentamiento (MSER-5 si no se pasa, en días) y estima
+    cada métrica con medias por lotes de días seguidos. Las métricas que
+    son cocientes (p. ej. tiempo en el taller) se calculan por lote como
+    total / cantidad; los lotes sin observaciones se saltean.
+    """
+    dias = sim.dias
+    total = len(dias["inicio"])
+    por_metrica = {m: truncamiento_mser(serie_diaria(dias, m), TAM_LOTE_MSER)
+                   for m in METRICAS_CALENTAMIENTO}
+    if calentamiento is None:
+        calentamiento = max(por_metrica.values())
+    if not 0 <= calentamiento < total:
+        raise ValueError(f"Calentamiento inválido: {calentamiento} de {total} días")
+
+    advertencias = []
+    if total >= 2 * TAM_LOTE_MSER and 2 * calentamiento >= total - TAM_LOTE_MSER:
+        advertencias.append(
+            "El calentamiento ocupa la mitad de la corrida: alargar el horizonte "
+            "(o el sistema no llega a un régimen estacionario)."
+        )
+    restantes = total - calentamiento
+    cant_lotes = max(1, min(cant_lotes, restantes))
+    por_lote = restantes // cant_lotes
+    # Los días que sobran se descartan al principio, junto al calentamiento
+    primero = total - cant_lotes * por_lote
+
+    estimaciones, correlaciones = {}, {}
+    for metrica, (numerador, denominador) in METRICAS_ESTACIONARIAS.items():
+        medias = []
+        for inicio in range(primero, total, por_lote):
+            num = sum(dias[numerador][inicio:inicio + por_lote])
+            den = sum(dias[denominador][inicio:inicio + por_lote]) if denominador else por_lote
+            if den:
+                medias.append(num / den)
+        n = len(medias)
+        media = sum(medias) / n if n else 0.0
+        desvio = (sum((x - media) ** 2 for x in medias) / (n - 1)) ** 0.5 if n > 1 else 0.0
+        estimaciones[metrica] = Estimacion(media, desvio, semiancho(desvio, n, nivel_confianza), n)
+        correlaciones[metrica] = autocorrelacion(medias)
+    altas = [m for m, r in correlaciones.items() if r > 0.3]
+    if altas:
+        advertencias.append(
+            "Medias por lotes correlacionadas (lag 1 > 0.3) en "
+            f"{', '.join(altas)}: usar menos lotes o un horizonte más largo."
+        )
+
+    return ResultadoHorizonte(
+        cant_dias=total,
+        cant_eventos=sim.nro_evento,
+        hora_final=sim.reloj,
+        semilla=sim.fuentes.semilla,
+        calentamiento=calentamiento,
+        calentamiento_por_metrica=por_metrica,
+        cant_lotes=cant_lotes,
+        dias_por_lote=por_lote,
+        estimaciones=estimaciones,
+        autocorrelacion=correlaciones,
+        nivel_confianza=nivel_confianza,
+        advertencias=advertencias,
+        indicadores=sim.indicadores.resumen(sim.reloj),
+        dias=dias,
+        traza=sim.traza,
+    )
+
+
+def simular_horizonte(parametros: ParametrosSimulacion, cant_dias: int,
+                      duracion_dia: float = DURACION_DIA, fin_jornada: float | None = None,
+                      registrar_traza: bool = False, traza: RegistroTraza | None = None,
+                      calentamiento: int | None = None, cant_lotes: int = CANT_LOTES,
+                      nivel_confianza: float = 0.95) -> ResultadoHorizonte:
+    """Corre cant_dias días seguidos y estima el régimen estacionario."""
+    sim = SimulacionHorizonte(parametros, cant_dias, duracion_dia, fin_jornada,
+                              registrar_traza, traza)
+    while sim.paso():
+        pass
+    return sim.resultado(calentamiento, cant_lotes, nivel_confianza)
+
+
+# ------------------------------------------------------------
+# 3) Línea de comandos
+# ------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simula muchos días seguidos (estado estacionario).")
+    agregar_argumentos_modelo(parser)
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--duracion-dia", type=float, default=DURACION_DIA,
+                        help="Minutos entre aperturas")
+    parser.add_argument("--fin-jornada", type=float, default=None,
+                        help="Minuto (desde la apertura) en que se deja de trabajar; "
+                             "sin esto se trabaja hasta vaciar el taller")
+    parser.add_argument("--calentamiento", type=int, default=None,
+                        help="Días a descartar (por defecto MSER-5)")
+    parser.add_argument("--lotes", type=int, default=CANT_LOTES)
+    parser.add_argument("--confianza", type=float, default=0.95)
+    parser.add_argument("--salida", default=None, help="CSV con los totales por día")
+    parser.add_argument("--json", action="store_true", help="Imprime el resumen como JSON")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    resultado = simular_horizonte(
+        parametros_desde_args(args), args.dias, args.duracion_dia, args.fin_jornada,
+        calentamiento=args.calentamiento, cant_lotes=args.lotes, nivel_confianza=args.confianza,
+    )
+    segundos = time.perf_counter() - inicio
+    if args.salida:
+        with open(args.salida, "w", newline="") as archivo:
+            escritor = csv.DictWriter(archivo, fieldnames=COLUMNAS_DIA)
+            escritor.writeheader()
+            escritor.writerows(resultado.filas_dias())
+
+    if args.json:
+        print(json.dumps(resultado.resumen()))
+        return
+    print(f"Días: {resultado.cant_dias}  eventos: {resultado.cant_eventos} ({segundos:.2f} s)")
+    print(f"Calentamiento (MSER-5): {resultado.calentamiento} días; "
+          f"{resultado.cant_lotes} lotes de {resultado.dias_por_lote} días")
+    for fila in resultado.tabla():
+        print(f"  {fila['Métrica']:<30} {fila['Media']:>10.3f} ± {fila['Semiancho']:.3f}")
+    for advertencia in resultado.advertencias:
+        print(f"Atención: {advertencia}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# instantanea.py
+"""
+Instantáneas de una corrida: guardar el estado completo, reanudarlo y
+bifurcar variantes ("¿y si a los 300 minutos entra un segundo zapatero?").
+
+La instantánea es el pickle (comprimido) de la Simulacion: reloj,
+calendario con los eventos pendientes, zapateros (incluida la
+reparacion_restante de una reparación interrumpida), cola_pedidos,
+ready_queue, estados de los zapatos, acumuladores de estadísticas y la
+posición de cada flujo de números aleatorios (ver aleatorios.Flujo). Una
+corrida reanudada da exactamente lo mismo que la corrida sin cortar.
+
+La traza queda afuera salvo con con_traza=True (y sólo un RegistroTraza
+en memoria: un exportar.SumideroTraza tiene archivos abiertos).
+
+    python instantanea.py --semilla 1 --hasta 300 --variante cant_zapateros=2 --variante mu=15
+"""
+import argparse
+import copy
+import os
+import pickle
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from motor import (ResultadoSimulacion, Simulacion, agregar_argumentos_modelo,
+                   parametros_desde_args, variante_desde_texto)
+from traza import RegistroTraza
+
+
+# ------------------------------------------------------------
+# 1) Tomar y restaurar
+# ------------------------------------------------------------
+def tomar(sim: Simulacion, con_traza: bool = False) -> bytes:
+    """Estado completo de la corrida en este momento, como bytes."""
+    copia = copy.copy(sim)   # copia superficial: sólo para sacar la traza
+    if not con_traza:
+        copia.traza = None
+        copia.registrar_traza = False
+    return zlib.compress(pickle.dumps(copia, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def restaurar(datos: bytes, traza: RegistroTraza | None = None) -> Simulacion:
+    """
+    Simulacion lista para seguir desde la instantánea. Con `traza` se
+    registran las filas desde acá en ese registro (reemplaza la que
+    pudiera traer la instantánea).
+    """
+    sim = pickle.loads(zlib.decompress(datos))
+    if traza is not None:
+        sim.traza = traza
+        sim.registrar_traza = True
+    return sim
+
+
+def bifurcar(datos: bytes, traza: RegistroTraza | None = None, **cambios) -> Simulacion:
+    """Restaura la instantánea y le aplica los cambios de parámetros (ver Simulacion.cambiar_parametros)."""
+    sim = restaurar(datos, traza)
+    sim.cambiar_parametros(**cambios)
+    return sim
+
+
+# ------------------------------------------------------------
+# 2) Ramas en paralelo
+# ------------------------------------------------------------
+def _correr_rama(datos: bytes, cambios: dict) -> ResultadoSimulacion:
+    """Corre una variante hasta el final. Se ejecuta en los workers."""
+    resultado = bifurcar(datos, **cambios).ejecutar()
+    resultado.traza = None
+    return resultado
+
+
+def correr_ramas(datos: bytes, variantes: list[dict],
+                 procesos: int | None = None) -> list[ResultadoSimulacion]:
+    """
+    Corre hasta el final cada variante (dict de cambios de parámetros)
+    desde la misma instantánea, en un pool de procesos. Los resultados
+    vienen sin traza y en el orden de `variantes`.
+    """
+    procesos = min(procesos or os.cpu_count() or 1, len(variantes))
+    if procesos <= 1:
+        return [_correr_rama(datos, cambios) for cambios in variantes]
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        return list(ejecutor.map(_correr_rama, [datos] * len(variantes), variantes))
+
+
+# ------------------------------------------------------------
+# 3) Línea de comandos
+# ------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bifurca variantes desde una instantánea de un día.")
+    agregar_argumentos_modelo(parser)
+    parser.add_argument("--hasta", type=float, required=True,
+                        help="Minuto en que se toma la instantánea")
+    parser.add_argument("--variante", type=variante_desde_texto, action="append", default=[],
+                        metavar="PARAM=VALOR[,PARAM=VALOR]", help="Variante a correr (repetible)")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--guardar", default=None, help="Archivo donde guardar la instantánea")
+    args = parser.parse_args(argv)
+
+    sim = Simulacion(parametros_desde_args(args), registrar_traza=False)
+    sim.avanzar_hasta(reloj=args.hasta)
+    datos = tomar(sim)
+    print(f"Instantánea en t={sim.reloj:.2f} (evento {sim.nro_evento}): {len(datos)} bytes")
+    if args.guardar:
+        with open(args.guardar, "wb") as archivo:
+            archivo.write(datos)
+
+    variantes = [{}] + args.variante
+    for cambios, r in zip(variantes, correr_ramas(datos, variantes, args.procesos)):
+        nombre = ", ".join(f"{k}={v}" for k, v in cambios.items()) or "sin cambios"
+        print(f"  {nombre:<30} avg_rep={r.avg_rep:7.2f}  max_cola={r.cant_max_cola:3d}  "
+              f"fin={r.hora_final:8.2f}  utilizacion={r.indicadores['utilizacion']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
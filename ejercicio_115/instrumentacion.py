@@ -0,0 +1,266 @@
+# instrumentacion.py
+"""
+Instrumentación del loop de eventos.
+
+SimulacionInstrumentada es una subclase de Simulacion que mide, por tipo
+de evento, cantidad y tiempo acumulado, y el tiempo de cada fase:
+
+• seleccion:    sacar el próximo evento del calendario
+• aleatorios:   sortear variables (llegadas, petición, atención, reparación)
+• estado:       actualizar el estado del modelo (lo que queda del evento)
+• zapatos:      cambios de estado de los zapatos (historial de la traza)
+• estadisticas: cola máxima y contadores de _registrar
+• persistentes: _actualizar_eventos_persistentes
+• fila:         armar y guardar la fila de la traza
+
+Simulacion no se toca: si no se usa esta clase la instrumentación no
+cuesta nada. Con asignaciones=True además cuenta bloques de memoria
+netos por tipo de evento y los principales sitios de asignación
+(tracemalloc; hace la corrida bastante más lenta).
+
+    python instrumentacion.py --semilla 1 --hora-cierre 5000 --asignaciones
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+
+from aleatorios import FLUJOS
+from motor import (ParametrosSimulacion, ResultadoSimulacion, Simulacion,
+                   agregar_argumentos_modelo, parametros_desde_args)
+
+FASES = ("seleccion", "aleatorios", "estado", "zapatos", "estadisticas", "persistentes", "fila")
+
+
+# ------------------------------------------------------------
+# 1) Reporte
+# ------------------------------------------------------------
+@dataclass
+class ReportePerfil:
+    segundos_total: float
+    eventos: dict[str, dict]          # tipo -> {"cantidad", "segundos"}
+    fases: dict[str, float]           # fase -> segundos (exclusivos)
+    bloques_por_tipo: dict[str, int] | None = None   # bloques netos asignados por tipo
+    sitios_asignacion: list[dict] = field(default_factory=list)
+
+    @property
+    def cant_eventos(self) -> int:
+        return sum(e["cantidad"] for e in self.eventos.values())
+
+    def tabla_eventos(self) -> list[dict]:
+        return [
+            {
+                "Evento": tipo,
+                "Cantidad": e["cantidad"],
+                "Tiempo (ms)": e["segundos"] * 1000,
+                "us/evento": e["segundos"] / e["cantidad"] * 1e6 if e["cantidad"] else 0.0,
+                **({"Bloques netos": self.bloques_por_tipo.get(tipo, 0)}
+                   if self.bloques_por_tipo is not None else {}),
+            }
+            for tipo, e in self.eventos.items()
+        ]
+
+    def tabla_fases(self) -> list[dict]:
+        total = sum(self.fases.values()) or 1.0
+        return [{"Fase": f, "Tiempo (ms)": s * 1000, "Porcentaje": s / total}
+                for f, s in self.fases.items()]
+
+    def a_dict(self) -> dict:
+        return asdict(self)
+
+    def texto(self) -> str:
+        lineas = [f"Eventos: {self.cant_eventos} en {self.segundos_total * 1000:.1f} ms"]
+        for fila in self.tabla_eventos():
+            lineas.append(f"  {fila['Evento']:<16} {fila['Cantidad']:>8} "
+                          f"{fila['Tiempo (ms)']:>10.2f} ms {fila['us/evento']:>8.2f} us/evento")
+        for fila in self.tabla_fases():
+            lineas.append(f"  {fila['Fase']:<16} {fila['Tiempo (ms)']:>10.2f} ms "
+                          f"{fila['Porcentaje']:>7.1%}")
+        for sitio in self.sitios_asignacion:
+            lineas.append(f"  {sitio['sitio']:<40} {sitio['bloques']:>8} bloques "
+                          f"{sitio['kb']:>9.1f} KB")
+        return "\n".join(lineas)
+
+
+# ------------------------------------------------------------
+# 2) Simulación instrumentada
+# ------------------------------------------------------------
+class _FlujoCronometrado:
+    """Envuelve un aleatorios.Flujo y acumula el tiempo de los sorteos."""
+    __slots__ = ("_flujo", "_tiempos")
+
+    def __init__(self, flujo, tiempos: dict):
+        self._flujo = flujo
+        self._tiempos = tiempos
+
+    def sortear(self):
+        inicio = time.perf_counter()
+        valor = self._flujo.sortear()
+        self._tiempos["aleatorios"] += time.perf_counter() - inicio
+        return valor
+
+    def rnd(self):
+        return self.sortear()[0]
+
+    def __getattr__(self, nombre):
+        # El resto (cambiar_parametros, params, ...) es del flujo envuelto.
+        # Los nombres privados no se reenvían: al restaurar con pickle
+        # _flujo todavía no existe y se entraría en recursión.
+        if nombre.startswith("_"):
+            raise AttributeError(nombre)
+        return getattr(self._flujo, nombre)
+
+
+class SimulacionInstrumentada(Simulacion):
+    """
+    Simulacion con mediciones. `observadores` son funciones
+    f(simulacion, evento) que se llaman después de procesar cada evento
+    (evento es el calendario.EventoFuturo, con tiempo, tipo y servidor).
+    """
+
+    def __init__(self, parametros: ParametrosSimulacion, registrar_traza: bool = True,
+                 traza=None, observadores=(), asignaciones: bool = False):
+        # Los acumuladores tienen que existir antes de que el constructor
+        # base registre la fila inicial
+        self._tiempos = dict.fromkeys(FASES + ("_evento", "_registrar", "_fila"), 0.0)
+        self._por_tipo = {}   # tipo -> [cantidad, segundos] (dict común: se puede guardar con pickle)
+        self._bloques = defaultdict(int) if asignaciones else None
+        self.observadores = list(observadores)
+        self.asignaciones = asignaciones
+        super().__init__(parametros, registrar_traza, traza)
+        # Se mide sólo el loop, no la fila inicial ni la carga del stock
+        self._tiempos.update(dict.fromkeys(self._tiempos, 0.0))
+        self._cronometrar_flujos()
+
+    def _cronometrar_flujos(self):
+        for nombre in FLUJOS:
+            flujo = getattr(self.fuentes, nombre)
+            if not isinstance(flujo, _FlujoCronometrado):
+                setattr(self.fuentes, nombre, _FlujoCronometrado(flujo, self._tiempos))
+
+    def cambiar_parametros(self, **cambios):
+        super().cambiar_parametros(**cambios)
+        # Con otra semilla el motor arma flujos nuevos: también se miden
+        self._cronometrar_flujos()
+
+    # ---------------- loop ----------------
+    def paso(self) -> bool:
+        reloj, t = time.perf_counter, self._tiempos
+        inicio = reloj()
+        evento = self.calendario.proximo()
+        elegido = reloj()
+        t["seleccion"] += elegido - inicio
+        if evento is None:
+            return False
+        if self._bloques is not None:
+            bloques = sys.getallocatedblocks()
+        self._procesar(evento)
+        fin = reloj()
+        t["_evento"] += fin - elegido
+        acumulado = self._por_tipo.setdefault(evento.tipo, [0, 0.0])
+        acumulado[0] += 1
+        acumulado[1] += fin - elegido
+        if self._bloques is not None:
+            self._bloques[evento.tipo] += sys.getallocatedblocks() - bloques
+        for observador in self.observadores:
+            observador(self, evento)
+        return True
+
+    def ejecutar(self) -> ResultadoSimulacion:
+        inicio = time.perf_counter()
+        if self.asignaciones:
+            tracemalloc.start()
+        try:
+            resultado = super().ejecutar()
+            if self.asignaciones:
+                instantanea = tracemalloc.take_snapshot()
+        finally:
+            if self.asignaciones:
+                tracemalloc.stop()
+        self._segundos_total = time.perf_counter() - inicio
+        self._sitios = []
+        if self.asignaciones:
+            for estadistica in instantanea.statistics("lineno")[:10]:
+                marco = estadistica.traceback[0]
+                self._sitios.append({
+                    "sitio": f"{marco.filename.rsplit('/', 1)[-1]}:{marco.lineno}",
+                    "bloques": estadistica.count,
+                    "kb": estadistica.size / 1024,
+                })
+        return resultado
+
+    # ---------------- fases ----------------
+    def _cambiar_zapato(self, zapato_id: int, estado: int):
+        inicio = time.perf_counter()
+        super()._cambiar_zapato(zapato_id, estado)
+        self._tiempos["zapatos"] += time.perf_counter() - inicio
+
+    def _registrar(self, evento: str, rnd_pet=None, tipo_pet=None):
+        inicio = time.perf_counter()
+        super()._registrar(evento, rnd_pet, tipo_pet)
+        self._tiempos["_registrar"] += time.perf_counter() - inicio
+
+    def _agregar_fila(self, evento: str, en_cola: int, rnd_pet, tipo_pet):
+        inicio = time.perf_counter()
+        super()._agregar_fila(evento, en_cola, rnd_pet, tipo_pet)
+        self._tiempos["_fila"] += time.perf_counter() - inicio
+
+    def _actualizar_eventos_persistentes(self, evento_actual):
+        inicio = time.perf_counter()
+        super()._actualizar_eventos_persistentes(evento_actual)
+        self._tiempos["persistentes"] += time.perf_counter() - inicio
+
+    # ---------------- reporte ----------------
+    def reporte(self) -> ReportePerfil:
+        """Reporte de lo medido hasta ahora (tiempos exclusivos por fase)."""
+        t = self._tiempos
+        fases = {
+            "seleccion": t["seleccion"],
+            "aleatorios": t["aleatorios"],
+            "estado": t["_evento"] - t["aleatorios"] - t["zapatos"] - t["_registrar"],
+            "zapatos": t["zapatos"],
+            "estadisticas": t["_registrar"] - t["_fila"],
+            "persistentes": t["persistentes"],
+            "fila": t["_fila"] - t["persistentes"],
+        }
+        return ReportePerfil(
+            segundos_total=getattr(self, "_segundos_total", sum(fases.values())),
+            eventos={tipo: {"cantidad": c, "segundos": s}
+                     for tipo, (c, s) in self._por_tipo.items()},
+            fases=fases,
+            bloques_por_tipo=dict(self._bloques) if self._bloques is not None else None,
+            sitios_asignacion=getattr(self, "_sitios", []),
+        )
+
+
+def perfilar(parametros: ParametrosSimulacion, registrar_traza: bool = True,
+             observadores=(), asignaciones: bool = False) -> tuple[ResultadoSimulacion, ReportePerfil]:
+    """Corre un día instrumentado; devuelve (resultado, reporte)."""
+    sim = SimulacionInstrumentada(parametros, registrar_traza, observadores=observadores,
+                                  asignaciones=asignaciones)
+    resultado = sim.ejecutar()
+    return resultado, sim.reporte()
+
+
+# ------------------------------------------------------------
+# 3) Línea de comandos
+# ------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perfil de un día de simulación.")
+    agregar_argumentos_modelo(parser)
+    parser.add_argument("--sin-traza", action="store_true")
+    parser.add_argument("--asignaciones", action="store_true",
+                        help="Contar asignaciones de memoria (más lento)")
+    parser.add_argument("--json", action="store_true", help="Imprime el reporte como JSON")
+    args = parser.parse_args(argv)
+
+    _, reporte = perfilar(parametros_desde_args(args), not args.sin_traza,
+                          asignaciones=args.asignaciones)
+    print(json.dumps(reporte.a_dict(), indent=2) if args.json else reporte.texto())
+
+
+if __name__ == "__main__":
+    main()
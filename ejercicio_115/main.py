@@ -1,9 +1,18 @@
+import os
+import time
+from dataclasses import replace
+
 import streamlit as st
-import pandas as pd
-import random
-import math
-from itertools import count
-from utils import generar_nueva_fila_multiindex, marcar_zapatos_retirados, limpiar_zapatos_retirados
+from barrido import PARAMETROS_BARRIBLES, barrer, grilla
+from cache import CacheResultados
+from horizonte import METRICAS_ESTACIONARIAS, serie_diaria, simular_horizonte
+from horizonte import NOMBRES_METRICAS as NOMBRES_ESTACIONARIAS
+from instrumentacion import perfilar
+from motor import ParametrosSimulacion
+from optimizador import REPLICAS_INICIALES, optimizar
+from presentacion import TAM_PAGINA, formatear, pagina_traza, paginar
+from replicaciones import METRICAS, NOMBRES_METRICAS, replicar
+from trabajos import GestorTrabajos
 
 
 # -----------------------------------------------------------
@@ -22,359 +31,433 @@ b1            = st.sidebar.number_input("Atención (min) - máximo", 0.1, 10.0,
 a2            = st.sidebar.number_input("Reparación (min) - mínimo", 1.0, 50.0, 10.0)
 b2            = st.sidebar.number_input("Reparación (min) - máximo", 1.0, 50.0, 20.0)
 p_retiro      = st.sidebar.slider("Probabilidad de retiro", 0.0, 1.0, 0.5, 0.01)
+modo          = st.sidebar.radio("Modo", ["Un día", "Varios días", "Replicaciones", "Barrido",
+                                          "Optimización", "Trabajos"])
 # Removemos jornada fija ya que el zapatero trabaja hasta completar todo
 # jornada       = st.sidebar.number_input("Duración de la jornada (min)", 1, 2000, 480)
 
 # -----------------------------------------------------------
-# 2) Generadores auxiliares
+# 2) Simulación de un día (el motor vive en motor.py)
 # -----------------------------------------------------------
-def gen_exponencial(media: float) -> tuple[float, float]:
-    rnd = random.random()
-    valor = -media * math.log(1 - rnd)
-    return rnd, valor
-
-
-def gen_uniforme(a: float, b: float) -> tuple[float, float]:
-    rnd = random.random()
-    valor = a + rnd * (b - a)
-    return rnd, valor
+@st.cache_resource
+def cache_resultados() -> CacheResultados:
+    """Una sola caché por proceso; SIMULACION_CACHE_DIR la guarda además en disco."""
+    return CacheResultados(directorio=os.environ.get("SIMULACION_CACHE_DIR"))
+
+
+class PanelAvance:
+    """
+    Muestra una corrida mientras avanza: métricas, barra de progreso según
+    el reloj contra la hora de cierre y las últimas filas de la traza,
+    actualizados en el lugar como mucho cada `intervalo` segundos. Se usa
+    como al_avanzar de motor.simular.
+
+    El botón Cancelar corta la corrida: al tocarlo Streamlit vuelve a
+    correr el script y la corrida en curso se interrumpe en la próxima
+    actualización.
+    """
+
+    def __init__(self, filas: int = 10, intervalo: float = 0.25):
+        self.inicio = time.perf_counter()
+        self.filas = filas
+        self.intervalo = intervalo
+        self.primer_dibujo = None    # segundos desde que se creó el panel
+        self._ultimo = 0.0
+        self._cancelar = st.empty()
+        self._cancelar.button("Cancelar", key="cancelar")
+        self._barra = st.progress(0.0, text="Arrancando…")
+        self._metricas = [col.empty() for col in st.columns(4)]
+        self._ultimas = st.empty()
+
+    def __call__(self, avance):
+        ahora = time.perf_counter()
+        if (self.primer_dibujo is not None and not avance.terminado
+                and ahora - self._ultimo < self.intervalo):
+            return
+        if avance.reloj < avance.hora_cierre:
+            texto = f"Minuto {avance.reloj:.0f} de {avance.hora_cierre:.0f}"
+        else:
+            texto = f"Cerrado: terminando los trabajos pendientes (minuto {avance.reloj:.0f})"
+        self._barra.progress(avance.progreso, text=texto)
+        for placeholder, (nombre, valor) in zip(self._metricas, (
+                ("Eventos", avance.nro_evento),
+                ("Pares reparados", avance.cant_pares_reparados),
+                ("Clientes en cola", avance.en_cola),
+                ("Máx. clientes en cola", avance.cant_max_cola))):
+            placeholder.metric(nombre, valor)
+        # La primera vez sólo métricas y barra: armar la tabla (y en un
+        # proceso nuevo cargar pyarrow) demora el primer dibujo
+        if avance.traza is not None and self.primer_dibujo is not None:
+            n = len(avance.traza)
+            self._ultimas.dataframe(formatear(avance.traza.a_multiindex(desde=max(0, n - self.filas))),
+                                    use_container_width=True)
+        self._ultimo = time.perf_counter()
+        if self.primer_dibujo is None:
+            self.primer_dibujo = self._ultimo - self.inicio
+
+    def limpiar(self):
+        for placeholder in (self._cancelar, self._barra, self._ultimas, *self._metricas):
+            placeholder.empty()
+
+
+@st.cache_resource
+def gestor_trabajos() -> GestorTrabajos:
+    """
+    Un solo pool de trabajos por proceso, compartido por todas las
+    sesiones; SIMULACION_TRABAJOS_DB elige el archivo SQLite.
+    """
+    return GestorTrabajos()
+
+
+@st.cache_resource(max_entries=8)
+def resultado_trabajo(id_trabajo: str):
+    # El resultado de un trabajo terminado no cambia: se lee una sola vez
+    return gestor_trabajos().almacen.resultado(id_trabajo)
+
+
+def enviar_trabajo(tipo: str, parametros: ParametrosSimulacion, **opciones):
+    id_trabajo = gestor_trabajos().enviar(tipo, parametros, **opciones)
+    st.success(f"Trabajo {id_trabajo} enviado: se puede seguir en el modo Trabajos, "
+               "aunque se cierre esta página.")
+
+
+@st.fragment(run_every=2.0)
+def panel_trabajos():
+    """Lista de trabajos y el detalle del elegido; se relee del almacén cada 2 segundos."""
+    gestor = gestor_trabajos()
+    trabajos = gestor.almacen.listar()
+    if not trabajos:
+        st.info("Todavía no hay trabajos: usá \"Enviar en segundo plano\" en los otros modos.")
+        return
+    st.dataframe([t.fila() for t in trabajos], use_container_width=True, column_config={
+        "Progreso": st.column_config.ProgressColumn("Progreso", min_value=0.0, max_value=1.0),
+    })
+    por_id = {t.id: t for t in trabajos}
+    trabajo = por_id[st.selectbox("Trabajo", list(por_id), key="trabajo_elegido",
+                                  format_func=lambda i: f"{i} – {por_id[i].tipo} ({por_id[i].estado})")]
+    if trabajo.activo:
+        st.progress(trabajo.progreso, text=f"{trabajo.estado} – {trabajo.fila()['Parcial']}")
+        if st.button("Cancelar trabajo"):
+            gestor.cancelar(trabajo.id)
+        return
+    if trabajo.estado != "terminado":
+        st.warning(f"Trabajo {trabajo.estado}. {trabajo.error or ''}")
+        return
+
+    resultado = resultado_trabajo(trabajo.id)
+    if trabajo.tipo == "dia":
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Tiempo promedio reparación", f"{resultado.avg_rep:.2f}")
+        col2.metric("Máx. clientes en cola", resultado.cant_max_cola)
+        col3.metric("Hora de finalización", f"{resultado.hora_final:.2f}")
+        st.dataframe([{"Indicador": k, "Valor": v} for k, v in resultado.indicadores.items()],
+                     use_container_width=True)
+    elif trabajo.tipo == "replicas":
+        st.caption(f"{resultado.cant_replicas} replicaciones, intervalos al "
+                   f"{resultado.nivel_confianza:.0%} de confianza.")
+        st.dataframe(resultado.tabla(), use_container_width=True)
+    elif trabajo.tipo == "barrido":
+        st.caption(f"{resultado.calculados} puntos calculados, {resultado.reutilizados} reutilizados.")
+        st.dataframe(resultado.tabla, use_container_width=True)
+    else:
+        mostrar_optimizacion(resultado)
+
+
+def mostrar_optimizacion(resultado):
+    (st.success if resultado.decidido else st.warning)(resultado.garantia())
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Configuración elegida", resultado.elegido.nombre if resultado.elegido else "ninguna")
+    igual = resultado.linea_base
+    if igual is None:
+        col2.metric("Corridas usadas", resultado.presupuesto)
+    else:
+        col2.metric("Corridas usadas", resultado.presupuesto,
+                    f"{resultado.presupuesto - igual.presupuesto:+d}", delta_color="inverse")
+        col3.metric("Con asignación igual", igual.presupuesto)
+        st.caption(f"La asignación igual elige {igual.elegido.nombre if igual.elegido else 'ninguna'}"
+                   + ("" if igual.decidido else " (se agotó el presupuesto antes de decidir)") + ".")
+    st.dataframe(resultado.tabla(), use_container_width=True)
+
+
+def simular_dia(parametros: ParametrosSimulacion, al_avanzar=None):
+    # La traza se guarda cruda; la tabla se arma y formatea por página
+    return cache_resultados().simular(parametros, al_avanzar)
 
 # -----------------------------------------------------------
-# 3) Función para mapear estados internos a estados mostrados
+# 3) Ejecución desde Streamlit
 # -----------------------------------------------------------
-def mapear_estado_zapato(estado_interno):
-    """Mapea estados internos a abreviaturas para mostrar"""
-    mapeo = {
-        "En cola": "ER",  # esperandoReparacion
-        "Reparando": "SR",  # siendoReparado
-        "Interrumpido": "RI",  # reparacionInterrumpida
-        "Listo para retiro": "LR",  # listoParaRetiro
-        "Retirado": ""  # Sin texto, solo color
-    }
-    return mapeo.get(estado_interno, estado_interno)
+if modo == "Un día":
+    # La vista ancha (columnas por zapato) se arma sólo para la página visible
+    semilla_dia  = st.sidebar.number_input("Semilla (-1 = aleatoria)", -1, 2**31 - 1, 42)
+    tam_pagina   = st.sidebar.number_input("Filas por página", 10, 10**5, TAM_PAGINA)
+    perfilar_dia = st.sidebar.checkbox("Perfilar la corrida (profiling)")
+
+if modo == "Varios días":
+    # Régimen estacionario: el stock y los pedidos pasan de un día al otro
+    cant_dias      = st.sidebar.number_input("Días", 2, 100000, 365)
+    semilla_dias   = st.sidebar.number_input("Semilla", 0, 2**31 - 1, 1)
+    fin_jornada    = st.sidebar.number_input(
+        "Fin de la jornada (min desde la apertura, 0 = hasta vaciar el taller)", 0.0, 1440.0, 0.0
+    )
+    metrica_dias   = st.sidebar.selectbox(
+        "Serie diaria", list(METRICAS_ESTACIONARIAS), format_func=NOMBRES_ESTACIONARIAS.get
+    )
 
-# -----------------------------------------------------------
-# 4) Simulación de un día
-# -----------------------------------------------------------
-def simular_dia(stock_inicial: int, mu: float, a1: float, b1: float,
-                a2: float, b2: float, p_retiro: float):
-    reloj           = 0.0
-    nro_evento      = 0
-    rnd_llegada, tiempo_entre = gen_exponencial(mu)
-    prox_llegada    = reloj + tiempo_entre
-
-    rnd_atencion = tiempo_atencion = None
-    fin_atencion  = math.inf
-
-    rnd_reparacion = tiempo_reparacion = None
-    fin_reparacion = math.inf
-    reparacion_restante = None
-
-    estado_zapatero = "Libre"
-    cola_pedidos: list[int] = []
-    id_generator = count(start=stock_inicial+1)
-
-    # IDs iniciales como "Listo para retiro"
-    ready_queue = list(range(1, stock_inicial+1))
-    zapatos_para_retirar = stock_inicial
-    cant_pares_reparados = 0
-    zapatos_estado: dict[int, str] = {i: 'Listo para retiro' for i in ready_queue}
-    zapatos_hora_inicio: dict[int, float] = {i: None for i in ready_queue}  # Hora inicio reparación
-    current_repair_id: int | None = None
-
-    # Variables para estadísticas
-    acum_tiempo_rep = 0.0
-    cant_max_cola   = 0
-    filas: list[dict] = []
-    
-    # Modificar la función safe para asegurar 2 decimales en todos los números, enteros para IDs
-    def safe(v, es_id=False):
-        if v is None:
-            return None
-        elif es_id and isinstance(v, (int, float)):
-            return int(v)
-        elif isinstance(v, (int, float)):
-            return round(float(v), 2)
-        else:
-            return v
-
-    # Variables para persistir eventos futuros
-    eventos_persistentes = {
-        "Proxima_llegada": None,
-        "Fin_atencion": None,
-        "Fin_reparacion": None,
-        "RND_llegada": None,
-        "Tiempo_entre_llegadas": None,
-        "RND_atencion": None,
-        "Tiempo_atencion": None,
-        "RND_reparacion": None,
-        "Tiempo_reparacion": None
-    }
-    
-    # Para tracking de zapatos retirados
-    zapatos_recien_retirados = set()
-
-    def actualizar_eventos_persistentes(evento_actual):
-        # Actualizar valores persistentes
-        if prox_llegada != math.inf:
-            eventos_persistentes["Proxima_llegada"] = safe(prox_llegada)
-            eventos_persistentes["RND_llegada"] = safe(rnd_llegada)
-            eventos_persistentes["Tiempo_entre_llegadas"] = safe(tiempo_entre)
-        else:
-            if evento_actual != "Llegada":
-                # Mantener valores previos si no es una llegada
-                pass
-            else:
-                eventos_persistentes["Proxima_llegada"] = None
-                eventos_persistentes["RND_llegada"] = None
-                eventos_persistentes["Tiempo_entre_llegadas"] = None
-
-        if fin_atencion != math.inf:
-            eventos_persistentes["Fin_atencion"] = safe(fin_atencion)
-            eventos_persistentes["RND_atencion"] = safe(rnd_atencion)
-            eventos_persistentes["Tiempo_atencion"] = safe(tiempo_atencion)
-        else:
-            if evento_actual != "Fin_atencion":
-                # Mantener valores previos si no es fin de atención
-                pass
-            else:
-                eventos_persistentes["Fin_atencion"] = None
-                eventos_persistentes["RND_atencion"] = None
-                eventos_persistentes["Tiempo_atencion"] = None
-
-        if fin_reparacion != math.inf:
-            eventos_persistentes["Fin_reparacion"] = safe(fin_reparacion)
-            eventos_persistentes["RND_reparacion"] = safe(rnd_reparacion)
-            eventos_persistentes["Tiempo_reparacion"] = safe(tiempo_reparacion)
-        else:
-            if evento_actual != "Fin_reparacion":
-                # Mantener valores previos si no es fin de reparación
-                pass
-            else:
-                eventos_persistentes["Fin_reparacion"] = None
-                eventos_persistentes["RND_reparacion"] = None
-                eventos_persistentes["Tiempo_reparacion"] = None
-
-    def crear_columnas_objetos_multiindex():
-        """Crea las columnas de objetos temporales con multi-índice"""
-        objetos_cols = {}
-        for zapato_id, estado in zapatos_estado.items():
-            objetos_cols[f"Zapato_{zapato_id}"] = estado
-        return objetos_cols
-
-    def registrar(evento: str, rnd_pet=None, tipo_pet=None):
-        nonlocal nro_evento, cant_max_cola, zapatos_recien_retirados
-
-        # ──────────────────────────────────────────────────────────────
-        # 1) CANTIDAD REAL DE CLIENTES EN COLA
-        #    • Si el zapatero está "Atendiendo", el primer elemento de
-        #      cola_pedidos corresponde al cliente que está en el mostrador
-        #      (no debe contarse como "en cola").
-        # ──────────────────────────────────────────────────────────────
-        en_cola = len(cola_pedidos)
-        if estado_zapatero == "Atendiendo" and en_cola:
-            en_cola -= 1                        # excluimos al atendido
-
-        # 2) Actualizar el máximo con esa cantidad depurada
-        cant_max_cola = max(cant_max_cola, en_cola)
-
-        # 3) Mantener el resto de la lógica tal cual
-        actualizar_eventos_persistentes(evento)
-
-        # Marcar zapatos retirados antes de crear la fila
-        if zapatos_recien_retirados:
-            zapatos_estado_marcado = marcar_zapatos_retirados(
-                zapatos_estado, zapatos_recien_retirados
-            )
-        else:
-            zapatos_estado_marcado = zapatos_estado.copy()
-
-        # Crear estado actual para generar fila con multi-índice
-        estado_actual = {
-            "nro_evento": nro_evento,
-            "evento": evento,
-            "reloj": safe(reloj),
-            "rnd_llegada": eventos_persistentes["RND_llegada"],
-            "tiempo_entre_llegadas": eventos_persistentes["Tiempo_entre_llegadas"],
-            "proxima_llegada": eventos_persistentes["Proxima_llegada"],
-            "rnd_peticion": safe(rnd_pet) if evento == "Llegada" else None,
-            "tipo_peticion": tipo_pet if evento == "Llegada" else None,
-            "rnd_atencion": eventos_persistentes["RND_atencion"],
-            "tiempo_atencion": eventos_persistentes["Tiempo_atencion"],
-            "fin_atencion": eventos_persistentes["Fin_atencion"],
-            "rnd_reparacion": eventos_persistentes["RND_reparacion"],
-            "tiempo_reparacion": eventos_persistentes["Tiempo_reparacion"],
-            "fin_reparacion": eventos_persistentes["Fin_reparacion"],
-            "estado_zapatero": estado_zapatero,
-            "cant_pares_reparados": cant_pares_reparados,
-            "zapatos_para_retirar": zapatos_para_retirar,
-            # -------------- estadísticas de cola --------------
-            "cola_pedidos": en_cola,            # ← aquí usamos la nueva var
-            "max_cola": cant_max_cola,
-            # ---------------------------------------------------
-            "acum_tiempo_reparacion": acum_tiempo_rep,
-            "objetos_temporales": zapatos_estado_marcado,
-            "horas_inicio_reparacion": zapatos_hora_inicio,
-        }
-
-        # Generar fila con multi-índice
-        fila_multiindex = generar_nueva_fila_multiindex(
-            estado_actual, con_objetos_temporales=True
-        )
-        filas.append(fila_multiindex)
-
-        # Limpiar zapatos retirados después de registrar
-        if zapatos_recien_retirados:
-            for zapato_id in zapatos_recien_retirados:
-                zapatos_estado.pop(zapato_id, None)
-                zapatos_hora_inicio.pop(zapato_id, None)
-            zapatos_recien_retirados.clear()
-
-        nro_evento += 1
-
-    def hay_trabajo_pendiente():
-        """Verifica si hay trabajo pendiente (reparaciones en curso o en cola)"""
-        return (len(cola_pedidos) > 0 or 
-                fin_reparacion != math.inf or 
-                estado_zapatero == "Reparando")
-
-    registrar("Inicial")
-    while True:
-        evento, proximo = min(
-            ("Llegada", prox_llegada),
-            ("Fin_atencion", fin_atencion),
-            ("Fin_reparacion", fin_reparacion),
-            key=lambda x: x[1]
+if modo == "Replicaciones":
+    cant_replicas = st.sidebar.number_input("Replicaciones (máximo)", 2, 100000, 200)
+    semilla       = st.sidebar.number_input("Semilla base", 0, 2**31 - 1, 1)
+    semiancho_obj = st.sidebar.number_input(
+        "Semiancho objetivo del tiempo de reparación (0 = correr todas)", 0.0, 100.0, 0.0
+    )
+    antitetico    = st.sidebar.checkbox("Variables antitéticas (replicaciones de a pares)")
+    control       = st.sidebar.checkbox("Variables de control (primeras llegadas y reparaciones)")
+
+if modo == "Barrido":
+    # Superficie de respuesta sobre dos parámetros; el resto queda fijo
+    eje_x    = st.sidebar.selectbox("Parámetro eje X", PARAMETROS_BARRIBLES, index=1)
+    x_min    = st.sidebar.number_input("Eje X desde", 0.0, 10000.0, 10.0)
+    x_max    = st.sidebar.number_input("Eje X hasta", 0.0, 10000.0, 30.0)
+    eje_y    = st.sidebar.selectbox("Parámetro eje Y", PARAMETROS_BARRIBLES, index=6)
+    y_min    = st.sidebar.number_input("Eje Y desde", 0.0, 10000.0, 0.1)
+    y_max    = st.sidebar.number_input("Eje Y hasta", 0.0, 10000.0, 0.9)
+    pasos    = st.sidebar.number_input("Valores por eje", 2, 20, 5)
+    replicas_punto = st.sidebar.number_input("Replicaciones por punto", 2, 10000, 30)
+    metrica_barrido = st.sidebar.selectbox(
+        "Métrica", METRICAS, format_func=NOMBRES_METRICAS.get
+    )
+
+    def puntos_barrido() -> list[dict]:
+        def valores_eje(nombre, minimo, maximo):
+            valores = [minimo + i * (maximo - minimo) / (pasos - 1) for i in range(int(pasos))]
+            return sorted({round(v) for v in valores}) if nombre in ("stock_inicial", "cant_zapateros") \
+                else [round(v, 4) for v in valores]
+
+        if eje_x == eje_y:
+            st.error("Elegí dos parámetros distintos para los ejes.")
+            st.stop()
+        return grilla(**{eje_x: valores_eje(eje_x, x_min, x_max),
+                         eje_y: valores_eje(eje_y, y_min, y_max)})
+
+
+if modo == "Optimización":
+    # La configuración más barata (zapateros y después stock) que cumple las cotas
+    max_zapateros = st.sidebar.number_input("Zapateros: hasta", 1, 20, 4)
+    stock_desde   = st.sidebar.number_input("Stock inicial desde", 0, 1000, 0)
+    stock_hasta   = st.sidebar.number_input("Stock inicial hasta", 0, 1000, 20)
+    stock_paso    = st.sidebar.number_input("Stock inicial: paso", 1, 1000, 10)
+    cota_cola     = st.sidebar.number_input("Cota de la cola máxima (media)", 0.0, 1000.0, 4.0)
+    cota_rep      = st.sidebar.number_input("Cota del tiempo de reparación (media)", 0.0, 1000.0, 16.0)
+    confianza_opt = st.sidebar.slider("Confianza", 0.80, 0.99, 0.95, 0.01)
+    presupuesto   = st.sidebar.number_input("Presupuesto (corridas)", 100, 10**6, 20000)
+    semilla_opt   = st.sidebar.number_input("Semilla base", 0, 2**31 - 1, 1)
+    linea_base    = st.sidebar.checkbox("Correr también la asignación igual (línea de base)", True)
+
+    def opciones_optimizacion() -> dict:
+        if stock_desde > stock_hasta:
+            st.error("El stock inicial \"desde\" no puede ser mayor que \"hasta\".")
+            st.stop()
+        configuraciones = grilla(cant_zapateros=list(range(1, int(max_zapateros) + 1)),
+                                 stock_inicial=list(range(int(stock_desde), int(stock_hasta) + 1,
+                                                          int(stock_paso))))
+        if presupuesto < REPLICAS_INICIALES * len(configuraciones):
+            st.error(f"El presupuesto no alcanza: hacen falta al menos "
+                     f"{REPLICAS_INICIALES * len(configuraciones)} corridas para las "
+                     f"{len(configuraciones)} configuraciones.")
+            st.stop()
+        return dict(
+            configuraciones=configuraciones,
+            objetivos={"cant_max_cola": cota_cola, "avg_rep": cota_rep},
+            nivel_confianza=confianza_opt, semilla=int(semilla_opt),
+            presupuesto_maximo=int(presupuesto), linea_base=linea_base,
         )
-        if proximo == math.inf:
-            break
-        reloj = proximo
-
-        if evento == "Llegada":
-            rnd_peticion = random.random()
-            tipo_peticion = "Retiro" if rnd_peticion < p_retiro else "Pedido"
-            
-            # CAMBIO PRINCIPAL: Después de las 16hs (480min), solo se aceptan retiros
-            if reloj < 480:  # Antes de las 16hs: pedidos y retiros
-                # Programar próxima llegada normalmente
-                rnd_llegada, tiempo_entre = gen_exponencial(mu)
-                prox_llegada = reloj + tiempo_entre
-            else:  # Después de las 16hs: solo retiros
-                if tipo_peticion == "Pedido":
-                    # Si es un pedido después de las 16hs, el cliente se va
-                    # No se procesa el pedido, pero sí programamos próxima llegada
-                    rnd_llegada, tiempo_entre = gen_exponencial(mu)
-                    prox_llegada = reloj + tiempo_entre
-                    registrar("Llegada", rnd_peticion, "Pedido_rechazado")
-                    continue  # Saltamos el resto del procesamiento
-                else:
-                    # Es un retiro, se procesa normalmente y programamos próxima llegada
-                    rnd_llegada, tiempo_entre = gen_exponencial(mu)
-                    prox_llegada = reloj + tiempo_entre
-            
-            # Procesamiento normal de llegada (pedidos antes de 16hs o retiros siempre)
-            if estado_zapatero == "Reparando":
-                reparacion_restante = fin_reparacion - reloj
-                fin_reparacion = math.inf
-                # NUEVO: Cambiar estado del zapato que se está reparando a "Interrumpido"
-                if current_repair_id:
-                    zapatos_estado[current_repair_id] = "Interrumpido"
-            
-            rnd_atencion, tiempo_atencion = gen_uniforme(a1, b1)
-            fin_atencion = reloj + tiempo_atencion
-            estado_zapatero = "Atendiendo"
-            
-            if tipo_peticion == "Pedido":
-                nuevo_id = next(id_generator)
-                cola_pedidos.append(nuevo_id)
-                rnd_reparacion, tiempo_reparacion = gen_uniforme(a2, b2)
-                zapatos_estado[nuevo_id] = "En cola"
-                zapatos_hora_inicio[nuevo_id] = None  # Inicializar hora inicio
-            else:  # tipo_peticion == "Retiro"
-                if ready_queue:
-                    id_retiro = ready_queue.pop(0)
-                    zapatos_recien_retirados.add(id_retiro)  # Marcar como retirado
-                    zapatos_para_retirar -= 1
-                # Si no hay zapatos para retirar, el cliente se va (no hace nada más)
-            
-            registrar("Llegada", rnd_peticion, tipo_peticion)
-
-        elif evento == "Fin_atencion":
-            fin_atencion = math.inf
-            if reparacion_restante is not None:
-                tiempo_reparacion = reparacion_restante
-                fin_reparacion = reloj + tiempo_reparacion
-                reparacion_restante = None
-                if current_repair_id:
-                    zapatos_estado[current_repair_id] = "Reparando"
-                estado_zapatero = "Reparando"
-            elif cola_pedidos:
-                current_repair_id = cola_pedidos.pop(0)
-                rnd_reparacion, tiempo_reparacion = gen_uniforme(a2, b2)
-                fin_reparacion = reloj + tiempo_reparacion
-                zapatos_estado[current_repair_id] = "Reparando"
-                zapatos_hora_inicio[current_repair_id] = reloj  # Registrar hora inicio
-                estado_zapatero = "Reparando"
-            else:
-                estado_zapatero = "Libre"
-                # CAMBIO: Si no hay trabajo pendiente y son más de las 16hs, detener llegadas
-                if reloj >= 480 and not hay_trabajo_pendiente():
-                    prox_llegada = math.inf
-            registrar("Fin_atencion")
-
-        elif evento == "Fin_reparacion":
-            fin_reparacion = math.inf
-            estado_zapatero = "Libre"
-            acum_tiempo_rep += tiempo_reparacion
-            cant_pares_reparados += 1
-            if current_repair_id:
-                ready_queue.append(current_repair_id)
-                zapatos_estado[current_repair_id] = "Listo para retiro"
-                zapatos_para_retirar += 1
-            if cola_pedidos:
-                current_repair_id = cola_pedidos.pop(0)
-                rnd_reparacion, tiempo_reparacion = gen_uniforme(a2, b2)
-                fin_reparacion = reloj + tiempo_reparacion
-                zapatos_estado[current_repair_id] = "Reparando"
-                zapatos_hora_inicio[current_repair_id] = reloj  # Registrar hora inicio
-                estado_zapatero = "Reparando"
-            else:
-                # CAMBIO: Si no hay trabajo pendiente y son más de las 16hs, detener llegadas
-                if reloj >= 480 and not hay_trabajo_pendiente():
-                    prox_llegada = math.inf
-            registrar("Fin_reparacion")
-
-    # Crear DataFrame con multi-índice
-    df = pd.DataFrame(filas)
-    
-    # El DataFrame ya viene con estructura multi-índice desde generar_nueva_fila_multiindex
-    if not df.empty:
-        # Convertir las tuplas de columnas a MultiIndex
-        columnas_tuples = [col if isinstance(col, tuple) else ("", col) for col in df.columns]
-        df.columns = pd.MultiIndex.from_tuples(columnas_tuples)
-    
-    avg_rep = acum_tiempo_rep / cant_pares_reparados if cant_pares_reparados else 0.0
-    return df, avg_rep, cant_max_cola
 
-# -----------------------------------------------------------
-# 5) Ejecución desde Streamlit
-# -----------------------------------------------------------
-if st.sidebar.button("Arrancar simulación"):
-    df, avg_rep, max_cola = simular_dia(
-        stock_inicial, mu, a1, b1, a2, b2, p_retiro
+
+# Las corridas largas se pueden mandar a un trabajo en segundo plano (ver trabajos.py)
+en_segundo_plano = (modo in ("Un día", "Replicaciones", "Barrido", "Optimización")
+                    and st.sidebar.button("Enviar en segundo plano"))
+
+if modo == "Trabajos":
+    st.subheader("Trabajos en segundo plano")
+    panel_trabajos()
+
+elif en_segundo_plano:
+    parametros = ParametrosSimulacion(stock_inicial, mu, a1, b1, a2, b2, p_retiro)
+    if modo == "Un día":
+        enviar_trabajo("dia", replace(parametros, semilla=None if semilla_dia < 0 else int(semilla_dia)))
+    elif modo == "Replicaciones":
+        enviar_trabajo("replicas", parametros, cant_replicas=int(cant_replicas), semilla=int(semilla),
+                       semiancho_objetivo=semiancho_obj or None, antitetico=antitetico,
+                       control=control)
+    elif modo == "Barrido":
+        enviar_trabajo("barrido", parametros, puntos=puntos_barrido(),
+                       cant_replicas=int(replicas_punto),
+                       almacen=os.environ.get("SIMULACION_BARRIDO_DB", "barrido.sqlite"))
+    else:
+        enviar_trabajo("optimizacion", parametros, **opciones_optimizacion())
+
+elif modo == "Optimización" and st.sidebar.button("Arrancar simulación"):
+    barra = st.progress(0.0, text="Optimización")
+    resultado = optimizar(
+        base=ParametrosSimulacion(stock_inicial, mu, a1, b1, a2, b2, p_retiro),
+        al_avanzar=lambda r: barra.progress(
+            min(r.presupuesto / presupuesto, 1.0),
+            text=f"{r.presupuesto} corridas, ronda {r.rondas}"
+                 + (f" – línea de base: {r.linea_base.presupuesto} corridas" if r.linea_base else "")),
+        **opciones_optimizacion(),
+    )
+    barra.empty()
+    st.subheader("Optimización de la dotación")
+    mostrar_optimizacion(resultado)
+
+elif modo == "Barrido" and st.sidebar.button("Arrancar simulación"):
+    puntos = puntos_barrido()
+    barra = st.progress(0.0, text="Barrido")
+    try:
+        resumen = barrer(
+            puntos, ParametrosSimulacion(stock_inicial, mu, a1, b1, a2, b2, p_retiro),
+            int(replicas_punto),
+            almacen=os.environ.get("SIMULACION_BARRIDO_DB", "barrido.sqlite"),
+            al_avanzar=lambda hechos, total: barra.progress(hechos / total,
+                                                            text=f"{hechos}/{total} puntos"),
+        )
+    except ValueError as error:
+        st.error(f"Parámetros inválidos: {error}")
+        st.stop()
+    barra.empty()
+
+    import altair as alt
+
+    tabla = resumen.tabla[resumen.tabla["metrica"] == metrica_barrido]
+    st.subheader(f"Superficie de respuesta – {NOMBRES_METRICAS[metrica_barrido]}")
+    st.caption(f"{resumen.calculados} puntos calculados, {resumen.reutilizados} reutilizados "
+               f"del almacén; {int(replicas_punto)} replicaciones por punto.")
+    st.altair_chart(
+        alt.Chart(tabla).mark_rect().encode(
+            x=alt.X(f"{eje_x}:O"), y=alt.Y(f"{eje_y}:O", sort="descending"),
+            color=alt.Color("media:Q", title="Media"),
+            tooltip=[eje_x, eje_y, "media", "semiancho", "n"],
+        ),
+        use_container_width=True,
+    )
+    st.line_chart(tabla, x=eje_x, y="media", color=eje_y)
+    st.dataframe(tabla, use_container_width=True)
+
+elif modo == "Varios días" and st.sidebar.button("Arrancar simulación"):
+    try:
+        resultado = simular_horizonte(
+            ParametrosSimulacion(stock_inicial, mu, a1, b1, a2, b2, p_retiro, int(semilla_dias)),
+            int(cant_dias), fin_jornada=fin_jornada or None,
+        )
+    except ValueError as error:
+        st.error(f"Parámetros inválidos: {error}")
+        st.stop()
+    st.subheader(f"Régimen estacionario ({resultado.cant_dias} días, "
+                 f"{resultado.cant_eventos} eventos)")
+    st.caption(f"Calentamiento descartado (MSER-5): {resultado.calentamiento} días. "
+               f"Medias por lotes: {resultado.cant_lotes} lotes de {resultado.dias_por_lote} días, "
+               f"intervalos al {resultado.nivel_confianza:.0%}.")
+    st.dataframe(resultado.tabla(), use_container_width=True)
+    for advertencia in resultado.advertencias:
+        st.warning(advertencia)
+
+    nombre = NOMBRES_ESTACIONARIAS[metrica_dias]
+    st.line_chart([{"Día": d, nombre: v}
+                   for d, v in enumerate(serie_diaria(resultado.dias, metrica_dias))], x="Día")
+    st.caption(f"Los primeros {resultado.calentamiento} días no entran en las estimaciones.")
+
+elif modo == "Replicaciones" and st.sidebar.button("Arrancar simulación"):
+    parametros = ParametrosSimulacion(stock_inicial, mu, a1, b1, a2, b2, p_retiro)
+    resumen = replicar(
+        parametros, int(cant_replicas), semilla=int(semilla),
+        semiancho_objetivo=semiancho_obj or None, antitetico=antitetico, control=control,
     )
+    st.subheader(f"Replicaciones ({resumen.cant_replicas})")
+    st.dataframe(resumen.tabla(), use_container_width=True)
+
+    for col, (metrica, est) in zip(st.columns(len(METRICAS)), resumen.estimaciones.items()):
+        col.metric(NOMBRES_METRICAS[metrica], f"{est.media:.2f}",
+                   f"± {est.semiancho:.2f}", delta_color="off")
+    if resumen.alcanzo_precision is False:
+        st.warning("No se alcanzó el semiancho objetivo con las replicaciones disponibles.")
+    if antitetico or control:
+        est = resumen.estimaciones["avg_rep"]
+        st.caption(f"Reducción de varianza del tiempo de reparación: x{est.factor_reduccion:.2f} "
+                   f"(equivale a {est.replicas_equivalentes:.0f} replicaciones simples).")
+    st.caption(f"Intervalos al {resumen.nivel_confianza:.0%} de confianza.")
+
+elif modo == "Un día" and ((arrancar := st.sidebar.button("Arrancar simulación"))
+                           or "corrida_dia" in st.session_state):
+    # La última corrida queda en la sesión (con la semilla que usó) para
+    # poder cambiar de página sin volver a apretar el botón: se relee de
+    # la caché
+    if arrancar:
+        # Si no está en la caché la corrida se muestra mientras avanza
+        panel = PanelAvance()
+        resultado = simular_dia(
+            ParametrosSimulacion(stock_inicial, mu, a1, b1, a2, b2, p_retiro,
+                                 None if semilla_dia < 0 else int(semilla_dia)),
+            al_avanzar=panel,
+        )
+        panel.limpiar()
+        st.session_state["corrida_dia"] = ParametrosSimulacion(
+            stock_inicial, mu, a1, b1, a2, b2, p_retiro, resultado.semilla)
+        st.session_state.pop("pagina_dia", None)    # vuelve a la primera página
+        if panel.primer_dibujo is not None:
+            st.caption(f"Primer dibujo a los {panel.primer_dibujo * 1000:.0f} ms; "
+                       f"corrida completa en {(time.perf_counter() - panel.inicio):.2f} s")
+    else:
+        resultado = simular_dia(st.session_state["corrida_dia"])
     st.subheader("Simulacion")
-    
-    # Mostrar DataFrame sin estilos
-    st.dataframe(df, use_container_width=True)
+
+    # Paginado del lado del servidor: sólo la página visible se arma y se formatea
+    pagina = paginar(len(resultado.traza), int(tam_pagina), st.session_state.get("pagina_dia", 1))
+    if st.session_state.get("pagina_dia", 1) != pagina.numero:
+        st.session_state["pagina_dia"] = pagina.numero     # menos páginas que antes
+    st.number_input(f"Página (de {pagina.cant_paginas})", 1, pagina.cant_paginas, key="pagina_dia")
+    st.caption(f"Filas {pagina.desde} a {pagina.hasta - 1} de {pagina.total}")
+    st.dataframe(pagina_traza(resultado.traza, pagina), use_container_width=True)
+
+    with st.expander("Historial de estados de los zapatos"):
+        st.dataframe(resultado.traza.zapatos.a_dataframe(), use_container_width=True)
+
+    if arrancar and perfilar_dia:
+        # Corrida aparte (fuera de la caché) con la misma semilla
+        _, reporte = perfilar(ParametrosSimulacion(stock_inicial, mu, a1, b1, a2, b2, p_retiro,
+                                                   resultado.semilla), asignaciones=True)
+        with st.expander("Profiling", expanded=True):
+            st.caption(f"{reporte.cant_eventos} eventos en {reporte.segundos_total * 1000:.1f} ms "
+                       "(con la medición de asignaciones activa)")
+            st.dataframe(reporte.tabla_eventos(), use_container_width=True)
+            st.bar_chart(reporte.tabla_fases(), x="Fase", y="Tiempo (ms)")
+            st.dataframe(reporte.tabla_fases(), use_container_width=True)
+            if reporte.sitios_asignacion:
+                st.caption("Sitios con más memoria retenida al final de la corrida")
+                st.dataframe(reporte.sitios_asignacion, use_container_width=True)
     
     st.subheader("Estadísticas")
     col1, col2 = st.columns(2)
    
-    col1.metric("Tiempo promedio reparación", f"{avg_rep:.2f}")
-    col2.metric("Máx. clientes en cola", max_cola)
+    col1.metric("Tiempo promedio reparación", f"{resultado.avg_rep:.2f}")
+    col2.metric("Máx. clientes en cola", resultado.cant_max_cola)
+
+    ind = resultado.indicadores
+    col3, col4, col5 = st.columns(3)
+    col3.metric("Largo medio de cola", f"{ind['largo_medio_cola']:.2f}")
+    col4.metric("Utilización de zapateros", f"{ind['utilizacion']:.1%}")
+    col5.metric("Pedidos rechazados (post cierre)", f"{ind['fraccion_rechazados']:.1%}")
+    with st.expander("Indicadores del día"):
+        st.dataframe([{"Indicador": k, "Valor": v} for k, v in ind.items()],
+                     use_container_width=True)
     
     # Mostrar hora de finalización
-    if not df.empty:
-        hora_final = df[("", "Reloj")].iloc[-1]
-        st.info(f"Simulación finalizada a las {hora_final:.2f} minutos ({hora_final/60:.2f} horas)")
\ No newline at end of file
+    hora_final = resultado.hora_final
+    st.info(f"Simulación finalizada a las {hora_final:.2f} minutos ({hora_final/60:.2f} horas)")
+
+if modo == "Un día" and st.session_state.get("cancelar"):
+    st.warning("Simulación cancelada.")
+
+cache = cache_resultados()
+st.sidebar.caption(
+    f"Caché de resultados: {cache.aciertos} aciertos "
+    f"({cache.aciertos_disco} desde disco), {cache.fallos} fallos"
+)
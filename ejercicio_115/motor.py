@@ -0,0 +1,706 @@
+# motor.py
+"""
+Motor de simulación – Casa de Reparaciones de Zapatos.
+
+Este módulo no importa Streamlit ni pandas, así que se puede usar desde
+procesos batch, workers o la línea de comandos:
+
+    python motor.py --mu 20 --semilla 42
+
+main.py es sólo la interfaz gráfica sobre este motor.
+"""
+import argparse
+import heapq
+import json
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass, field, fields, replace
+
+from aleatorios import FuentesAleatorias
+from calendario import CalendarioEventos
+from estadisticas import IndicadoresDia
+from traza import (EN_COLA, ESTADOS_ZAPATO, INTERRUMPIDO, LISTO_PARA_RETIRO, REPARANDO,
+                   RETIRADO, RegistroTraza)
+
+# Versión de la lógica del motor: subirla cuando un cambio altere los
+# resultados para una misma semilla (invalida los resultados en caché)
+VERSION_MOTOR = 7
+
+
+# ------------------------------------------------------------
+# 1) Parámetros y resultado
+# ------------------------------------------------------------
+@dataclass(frozen=True)
+class ParametrosSimulacion:
+    """Parámetros de entrada de una corrida (mismos que la barra lateral)."""
+    stock_inicial: int = 10
+    mu: float = 20.0          # media entre llegadas (min)
+    a1: float = 3.0           # atención - mínimo
+    b1: float = 4.0           # atención - máximo
+    a2: float = 10.0          # reparación - mínimo
+    b2: float = 20.0          # reparación - máximo
+    p_retiro: float = 0.5
+    semilla: int | None = None
+    hora_cierre: float = 480.0  # a partir de acá sólo se aceptan retiros (16hs)
+    cant_zapateros: int = 1
+
+    def __post_init__(self):
+        if self.stock_inicial < 0:
+            raise ValueError(f"Stock inicial inválido: {self.stock_inicial}")
+        if self.mu <= 0:
+            raise ValueError(f"Media entre llegadas inválida: {self.mu}")
+        if min(self.a1, self.b1) < 0:
+            raise ValueError(f"Rango de atención inválido: ({self.a1}, {self.b1})")
+        if min(self.a2, self.b2) < 0:
+            raise ValueError(f"Rango de reparación inválido: ({self.a2}, {self.b2})")
+        if not (0.0 <= self.p_retiro <= 1.0):
+            raise ValueError(f"Probabilidad de retiro inválida: {self.p_retiro}")
+        if self.hora_cierre < 0:
+            raise ValueError(f"Hora de cierre inválida: {self.hora_cierre}")
+        if self.cant_zapateros < 1:
+            raise ValueError(f"Cantidad de zapateros inválida: {self.cant_zapateros}")
+
+
+@dataclass
+class ResultadoSimulacion:
+    """
+    Salida de simular(): estadísticas del día y la traza columnar
+    (None si la corrida fue sin traza).
+    """
+    avg_rep: float
+    cant_max_cola: int
+    hora_final: float
+    cant_eventos: int
+    cant_pares_reparados: int
+    semilla: int | None = None      # semilla efectivamente usada
+    indicadores: dict = field(default_factory=dict)   # ver estadisticas.IndicadoresDia
+    traza: RegistroTraza | None = field(default=None, repr=False)
+
+    def resumen(self) -> dict:
+        """Estadísticas sin la traza (para logs, JSON, etc.)."""
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name != "traza"}
+
+
+@dataclass
+class Avance:
+    """Estado de una corrida en curso (lo que va devolviendo Simulacion.por_lotes)."""
+    reloj: float
+    nro_evento: int
+    cant_pares_reparados: int
+    cant_max_cola: int
+    en_cola: int
+    zapatos_para_retirar: int
+    hora_cierre: float
+    terminado: bool = False
+    traza: RegistroTraza | None = field(default=None, repr=False)   # la de la corrida, en vivo
+
+    @property
+    def progreso(self) -> float:
+        """Fracción del día hasta el cierre (1.0 del cierre en adelante)."""
+        return min(self.reloj / self.hora_cierre, 1.0) if self.hora_cierre > 0 else 1.0
+
+
+# ------------------------------------------------------------
+# 2) Estado del modelo
+# ------------------------------------------------------------
+class Zapatero:
+    """Estado de un zapatero (servidor) y sus eventos pendientes."""
+    __slots__ = ("nro", "estado", "fin_atencion", "fin_reparacion",
+                 "reparacion_restante", "zapato_actual",
+                 "rnd_atencion", "tiempo_atencion",
+                 "rnd_reparacion", "tiempo_reparacion")
+
+    def __init__(self, nro: int):
+        self.nro = nro
+        self.estado = "Libre"
+        self.fin_atencion = None        # EventoFuturo pendiente o None
+        self.fin_reparacion = None      # EventoFuturo pendiente o None
+        self.reparacion_restante = None  # tiempo que le falta a una reparación interrumpida
+        self.zapato_actual = None
+        self.rnd_atencion = self.tiempo_atencion = None
+        self.rnd_reparacion = self.tiempo_reparacion = None
+
+
+class EstadosZapatos:
+    """
+    Estado de los zapatos que están en el taller: el código de
+    traza.ESTADOS_ZAPATO de cada uno en un bytearray indexado por id (los
+    ids son correlativos). AUSENTE marca a los que todavía no llegaron o
+    ya se retiraron; la cantidad de presentes se lleva en cada cambio.
+    """
+    __slots__ = ("_codigos", "presentes")
+
+    AUSENTE = 255
+
+    def __init__(self, capacidad: int = 64):
+        self._codigos = bytearray([self.AUSENTE]) * capacidad
+        self.presentes = 0
+
+    def __len__(self) -> int:
+        return self.presentes
+
+    def cambiar(self, zapato_id: int, estado: int):
+        codigos = self._codigos
+        if zapato_id >= len(codigos):
+            codigos.extend(bytearray([self.AUSENTE]) * max(len(codigos), zapato_id + 1 - len(codigos)))
+        if estado == RETIRADO:
+            estado = self.AUSENTE
+        self.presentes += (estado != self.AUSENTE) - (codigos[zapato_id] != self.AUSENTE)
+        codigos[zapato_id] = estado
+
+    def codigo(self, zapato_id: int) -> int:
+        """Código del estado del zapato (AUSENTE si no está en el taller)."""
+        return self._codigos[zapato_id] if zapato_id < len(self._codigos) else self.AUSENTE
+
+    def a_dict(self) -> dict[int, str]:
+        """{id: estado} de los zapatos presentes (recorre todos los ids: para pruebas y depuración)."""
+        return {i: ESTADOS_ZAPATO[c] for i, c in enumerate(self._codigos) if c != self.AUSENTE}
+
+
+# ------------------------------------------------------------
+# 3) Simulación de un día
+# ------------------------------------------------------------
+class Simulacion:
+    """
+    Corre un día completo: llegadas hasta las 16hs (hora_cierre) y después
+    los zapateros siguen hasta terminar todo el trabajo pendiente.
+
+    Los eventos futuros se guardan en un CalendarioEventos, así que puede
+    haber varios zapateros (cant_zapateros) con sus propios fines de
+    atención y de reparación pendientes.
+
+    Con registrar_traza=False se ejecuta exactamente la misma lógica de
+    eventos pero sólo se actualizan las estadísticas: no se arman filas,
+    así que la memoria no crece con la cantidad de eventos.
+
+    `traza` permite pasar otro registro (p. ej. exportar.SumideroTraza,
+    que va escribiendo las filas a disco). Con antitetico=True los flujos
+    entregan 1 - rnd: la corrida antitética de la misma semilla.
+    """
+
+    ESTADOS_ZAPATERO = ("Libre", "Atendiendo", "Reparando")
+
+    def __init__(self, parametros: ParametrosSimulacion, registrar_traza: bool = True,
+                 traza: RegistroTraza | None = None, antitetico: bool = False):
+        self.parametros = parametros
+        # Un flujo de números aleatorios independiente por propósito
+        self.fuentes = FuentesAleatorias.para(parametros, antitetico=antitetico)
+        self.calendario = CalendarioEventos()
+
+        self.reloj = 0.0
+        self.nro_evento = 0
+        # Hora de cierre absoluta del día en curso (horizonte.py la corre cada día)
+        self.hora_cierre = parametros.hora_cierre
+        stock_inicial = parametros.stock_inicial
+
+        self.zapateros = [Zapatero(i) for i in range(parametros.cant_zapateros)]
+        # Índices de zapateros por estado (heaps con borrado perezoso) para
+        # elegir al que atiende una llegada en O(log n)
+        self._por_estado = {estado: [] for estado in self.ESTADOS_ZAPATERO}
+        self._por_estado["Libre"] = list(range(parametros.cant_zapateros))
+        self._cant_por_estado = dict.fromkeys(self.ESTADOS_ZAPATERO, 0)
+        self._cant_por_estado["Libre"] = parametros.cant_zapateros
+        self._cant_interrumpidas = 0
+
+        # Colas FIFO: sacar el primero es O(1) aunque haya miles de zapatos
+        self.cola_pedidos: deque[int] = deque()
+        self._proximo_id = stock_inicial + 1
+
+        # IDs iniciales como "Listo para retiro"
+        self.ready_queue = deque(range(1, stock_inicial+1))
+        self.zapatos_para_retirar = stock_inicial
+        self.cant_pares_reparados = 0
+        self.zapatos_estado = EstadosZapatos(stock_inicial + 64)
+
+        # Variables para estadísticas
+        self.acum_tiempo_rep = 0.0
+        self.cant_max_cola = 0
+        self.indicadores = IndicadoresDia(parametros.cant_zapateros)
+        if traza is None and registrar_traza:
+            traza = RegistroTraza()
+        self.traza = traza
+        self.registrar_traza = traza is not None
+        for i in self.ready_queue:
+            self._cambiar_zapato(i, LISTO_PARA_RETIRO)
+
+        # Valores de la traza que persisten entre filas
+        self.eventos_persistentes = {
+            "Proxima_llegada": None,
+            "Fin_atencion": None,
+            "Fin_reparacion": None,
+            "RND_llegada": None,
+            "Tiempo_entre_llegadas": None,
+            "RND_atencion": None,
+            "Tiempo_atencion": None,
+            "RND_reparacion": None,
+            "Tiempo_reparacion": None
+        }
+
+        self.rnd_llegada, self.tiempo_entre = self.fuentes.llegadas.sortear()
+        self.llegada = self.calendario.programar(self.reloj + self.tiempo_entre, "Llegada")
+        self._registrar("Inicial")
+
+    # ---------------- loop principal ----------------
+    def ejecutar(self) -> ResultadoSimulacion:
+        while self.paso():
+            pass
+        return self.resultado()
+
+    def paso(self) -> bool:
+        """Procesa el próximo evento. Devuelve False si ya no quedan eventos."""
+        evento = self.calendario.proximo()
+        if evento is None:
+            return False
+        self._procesar(evento)
+        return True
+
+    def por_lotes(self, tam_lote: int = 500) -> Iterator[Avance]:
+        """
+        Generador: devuelve un Avance antes del primer evento y después uno
+        cada tam_lote eventos; el último tiene terminado=True. Si se deja
+        de iterar, la corrida queda donde está (se puede seguir con paso()
+        o ejecutar(), o tomar una instantánea).
+        """
+        if tam_lote < 1:
+            raise ValueError(f"Tamaño de lote inválido: {tam_lote}")
+        paso = self.paso
+        yield self.avance()
+        while True:
+            for _ in range(tam_lote):
+                if not paso():
+                    yield self.avance(terminado=True)
+                    return
+            yield self.avance()
+
+    def avance(self, terminado: bool = False) -> Avance:
+        return Avance(
+            reloj=self.reloj,
+            nro_evento=self.nro_evento,
+            cant_pares_reparados=self.cant_pares_reparados,
+            cant_max_cola=self.cant_max_cola,
+            en_cola=self.indicadores.cola.valor,
+            zapatos_para_retirar=self.zapatos_para_retirar,
+            hora_cierre=self.hora_cierre,
+            terminado=terminado,
+            traza=self.traza,
+        )
+
+    def avanzar_hasta(self, reloj: float | None = None, nro_evento: int | None = None) -> bool:
+        """
+        Procesa eventos mientras el próximo ocurra a más tardar en `reloj`
+        y no se haya llegado al evento número `nro_evento`. Devuelve False
+        si ya no quedan eventos (la corrida terminó).
+        """
+        while True:
+            proximo = self.calendario.ver_proximo()
+            if proximo is None:
+                return False
+            if reloj is not None and proximo.tiempo > reloj:
+                return True
+            if nro_evento is not None and self.nro_evento >= nro_evento:
+                return True
+            self.paso()
+
+    def cambiar_parametros(self, **cambios):
+        """
+        Cambia parámetros a mitad de la corrida (variantes que se bifurcan
+        de una instantánea, ver instantanea.py).
+
+        • Las distribuciones cambian sin mover los generadores: la variante
+          usa los mismos RND que la corrida original. Una semilla distinta
+          reinicia los flujos.
+        • hora_cierre corre el cierre del día en curso.
+        • Sólo se pueden agregar zapateros: los nuevos empiezan libres y
+          toman los pedidos que estén esperando.
+        • El stock inicial no se puede cambiar.
+        """
+        viejos = self.parametros
+        nuevos = replace(viejos, **cambios)
+        if nuevos == viejos:
+            return
+        if nuevos.stock_inicial != viejos.stock_inicial:
+            raise ValueError("El stock inicial no se puede cambiar a mitad de la corrida")
+        if nuevos.cant_zapateros < viejos.cant_zapateros:
+            raise ValueError(f"Sólo se pueden agregar zapateros ({viejos.cant_zapateros} -> "
+                             f"{nuevos.cant_zapateros})")
+        self.parametros = nuevos
+        if nuevos.semilla != viejos.semilla:
+            self.fuentes = FuentesAleatorias.para(nuevos, antitetico=self.fuentes.antitetico)
+        else:
+            self.fuentes.cambiar_parametros(nuevos.mu, nuevos.a1, nuevos.b1, nuevos.a2, nuevos.b2)
+        self.hora_cierre += nuevos.hora_cierre - viejos.hora_cierre
+        if nuevos.cant_zapateros > viejos.cant_zapateros:
+            self.indicadores.cambiar_zapateros(self.reloj, nuevos.cant_zapateros)
+            for nro in range(viejos.cant_zapateros, nuevos.cant_zapateros):
+                z = Zapatero(nro)
+                self.zapateros.append(z)
+                heapq.heappush(self._por_estado["Libre"], nro)
+                self._cant_por_estado["Libre"] += 1
+                # El primero de la cola puede ser el cliente que está en el mostrador
+                if len(self.cola_pedidos) > self._cant_por_estado["Atendiendo"]:
+                    self._empezar_reparacion(z)
+        self._registrar("Cambio_parametros")
+
+    def _procesar(self, evento):
+        self.reloj = evento.tiempo
+        if evento.tipo == "Llegada":
+            self._llegada()
+        elif evento.tipo == "Fin_atencion":
+            self._fin_atencion(self.zapateros[evento.servidor])
+        elif evento.tipo == "Fin_reparacion":
+            self._fin_reparacion(self.zapateros[evento.servidor])
+        else:
+            raise ValueError(f"Tipo de evento desconocido: {evento.tipo}")
+
+    def resultado(self) -> ResultadoSimulacion:
+        cant = self.cant_pares_reparados
+        avg_rep = self.acum_tiempo_rep / cant if cant else 0.0
+        return ResultadoSimulacion(
+            avg_rep=avg_rep,
+            cant_max_cola=self.cant_max_cola,
+            hora_final=self.reloj,
+            cant_eventos=self.nro_evento,
+            cant_pares_reparados=cant,
+            semilla=self.fuentes.semilla,
+            indicadores=self.indicadores.resumen(self.reloj),
+            traza=self.traza,
+        )
+
+    # ---------------- eventos ----------------
+    def _llegada(self):
+        p, fuentes = self.parametros, self.fuentes
+        rnd_peticion = fuentes.peticion.rnd()
+        tipo_peticion = "Retiro" if rnd_peticion < p.p_retiro else "Pedido"
+
+        # Después de las 16hs (hora_cierre) sólo se aceptan retiros; la
+        # próxima llegada se programa siempre.
+        self.rnd_llegada, self.tiempo_entre = fuentes.llegadas.sortear()
+        self.llegada = self.calendario.programar(self.reloj + self.tiempo_entre, "Llegada")
+        if tipo_peticion == "Pedido":
+            self.indicadores.pedidos += 1
+        if self.reloj >= self.hora_cierre and tipo_peticion == "Pedido":
+            # Si es un pedido después de las 16hs, el cliente se va
+            self.indicadores.pedidos_rechazados += 1
+            self._registrar("Llegada", rnd_peticion, "Pedido_rechazado")
+            return
+
+        # Atiende un zapatero libre; si no hay, se interrumpe una reparación
+        z = self._elegir_zapatero()
+        if z.estado == "Reparando":
+            self._interrumpir_reparacion(z)
+            self.indicadores.interrupciones += 1
+        elif z.estado == "Atendiendo":
+            # El cliente nuevo pasa al mostrador y reemplaza la atención en curso
+            self.calendario.cancelar(z.fin_atencion)
+            self.indicadores.atenciones_reemplazadas += 1
+
+        z.rnd_atencion, z.tiempo_atencion = fuentes.atencion.sortear()
+        z.fin_atencion = self.calendario.programar(
+            self.reloj + z.tiempo_atencion, "Fin_atencion", z.nro
+        )
+        self._cambiar_estado(z, "Atendiendo")
+
+        if tipo_peticion == "Pedido":
+            nuevo_id = self._proximo_id
+            self._proximo_id += 1
+            self.cola_pedidos.append(nuevo_id)
+            # Sólo para la traza: el tiempo que usa la reparación se sortea al
+            # empezarla, del flujo de reparación
+            z.rnd_reparacion, z.tiempo_reparacion = fuentes.reparacion_mostrada.sortear()
+            self._cambiar_zapato(nuevo_id, EN_COLA)
+        else:  # tipo_peticion == "Retiro"
+            if self.ready_queue:
+                id_retiro = self.ready_queue.popleft()
+                self._cambiar_zapato(id_retiro, RETIRADO)
+                self.zapatos_para_retirar -= 1
+            else:
+                # Si no hay zapatos para retirar, el cliente se va (no hace nada más)
+                self.indicadores.retiros_sin_zapato += 1
+
+        self._registrar("Llegada", rnd_peticion, tipo_peticion)
+
+    def _fin_atencion(self, z: Zapatero):
+        z.fin_atencion = None
+        if z.reparacion_restante is not None:
+            self._retomar_reparacion(z)
+        elif self.cola_pedidos:
+            self._empezar_reparacion(z)
+        else:
+            self._cambiar_estado(z, "Libre")
+            self._verificar_cierre()
+        self._registrar("Fin_atencion")
+
+    def _fin_reparacion(self, z: Zapatero):
+        z.fin_reparacion = None
+        self._cambiar_estado(z, "Libre")
+        self.acum_tiempo_rep += z.tiempo_reparacion
+        self.cant_pares_reparados += 1
+        if z.zapato_actual:
+            self.ready_queue.append(z.zapato_actual)
+            self._cambiar_zapato(z.zapato_actual, LISTO_PARA_RETIRO)
+            self.zapatos_para_retirar += 1
+            z.zapato_actual = None
+        if self.cola_pedidos:
+            self._empezar_reparacion(z)
+        else:
+            self._verificar_cierre()
+        self._registrar("Fin_reparacion")
+
+    # ---------------- auxiliares ----------------
+    def _empezar_reparacion(self, z: Zapatero):
+        z.zapato_actual = self.cola_pedidos.popleft()
+        z.rnd_reparacion, z.tiempo_reparacion = self.fuentes.reparacion.sortear()
+        z.fin_reparacion = self.calendario.programar(
+            self.reloj + z.tiempo_reparacion, "Fin_reparacion", z.nro
+        )
+        self._cambiar_zapato(z.zapato_actual, REPARANDO)
+        self._cambiar_estado(z, "Reparando")
+
+    def _interrumpir_reparacion(self, z: Zapatero):
+        """Suspende la reparación en curso y guarda el tiempo que le falta."""
+        z.reparacion_restante = z.fin_reparacion.tiempo - self.reloj
+        self.calendario.cancelar(z.fin_reparacion)
+        z.fin_reparacion = None
+        self._cant_interrumpidas += 1
+        # Cambiar estado del zapato que se está reparando a "Interrumpido"
+        if z.zapato_actual:
+            self._cambiar_zapato(z.zapato_actual, INTERRUMPIDO)
+
+    def _retomar_reparacion(self, z: Zapatero):
+        """Retoma una reparación interrumpida con el tiempo que le faltaba."""
+        z.tiempo_reparacion = z.reparacion_restante
+        z.fin_reparacion = self.calendario.programar(
+            self.reloj + z.tiempo_reparacion, "Fin_reparacion", z.nro
+        )
+        z.reparacion_restante = None
+        self._cant_interrumpidas -= 1
+        if z.zapato_actual:
+            self._cambiar_zapato(z.zapato_actual, REPARANDO)
+        self._cambiar_estado(z, "Reparando")
+
+    def _cambiar_zapato(self, zapato_id: int, estado: int):
+        """Cambia el estado (código de traza.ESTADOS_ZAPATO) de un zapato y lo anota en el historial de la traza."""
+        self.zapatos_estado.cambiar(zapato_id, estado)
+        self.indicadores.zapato(self.reloj, zapato_id, estado)
+        if self.traza is not None and self.traza.con_zapatos:
+            self.traza.cambio_zapato(zapato_id, estado, self.reloj)
+
+    def _cambiar_estado(self, z: Zapatero, estado: str):
+        if z.estado == estado:
+            return
+        self._cant_por_estado[z.estado] -= 1
+        self._cant_por_estado[estado] += 1
+        z.estado = estado
+        cant = self._cant_por_estado
+        self.indicadores.ocupacion(self.reloj, cant["Atendiendo"], cant["Reparando"])
+        heap = self._por_estado[estado]
+        heapq.heappush(heap, z.nro)
+        # Compactar de vez en cuando las entradas viejas
+        if len(heap) > 2 * len(self.zapateros) + 8:
+            heap[:] = sorted({i for i in heap if self.zapateros[i].estado == estado})
+
+    def _primero_en(self, estado: str) -> Zapatero | None:
+        """Zapatero de menor número en el estado pedido (O(log n) amortizado)."""
+        heap = self._por_estado[estado]
+        while heap:
+            z = self.zapateros[heap[0]]
+            if z.estado == estado:
+                return z
+            heapq.heappop(heap)
+        return None
+
+    def _elegir_zapatero(self) -> Zapatero:
+        """Libre primero; si no, uno reparando (se interrumpe); si no, uno atendiendo."""
+        for estado in ("Libre", "Reparando", "Atendiendo"):
+            if self._cant_por_estado[estado]:
+                return self._primero_en(estado)
+        raise RuntimeError("No hay zapateros")
+
+    def _hay_trabajo_pendiente(self) -> bool:
+        """Verifica si hay trabajo pendiente (reparaciones en curso, interrumpidas o en cola)"""
+        return (len(self.cola_pedidos) > 0 or
+                self._cant_por_estado["Reparando"] > 0 or
+                self._cant_interrumpidas > 0)
+
+    def _verificar_cierre(self):
+        # Si no hay trabajo pendiente y son más de las 16hs, detener llegadas
+        if self.reloj >= self.hora_cierre and not self._hay_trabajo_pendiente():
+            self.calendario.cancelar(self.llegada)
+            self.llegada = None
+
+    # ---------------- traza ----------------
+    def _proximo_fin(self, atributo: str) -> Zapatero | None:
+        """Zapatero con el fin (de atención o de reparación) más próximo."""
+        elegido = None
+        for z in self.zapateros:
+            evento = getattr(z, atributo)
+            if evento is not None and (elegido is None or
+                                       evento.tiempo < getattr(elegido, atributo).tiempo):
+                elegido = z
+        return elegido
+
+    def _actualizar_eventos_persistentes(self, evento_actual):
+        ep = self.eventos_persistentes
+        if self.llegada is not None:
+            ep["Proxima_llegada"] = self.llegada.tiempo
+            ep["RND_llegada"] = self.rnd_llegada
+            ep["Tiempo_entre_llegadas"] = self.tiempo_entre
+        elif evento_actual == "Llegada":
+            ep["Proxima_llegada"] = None
+            ep["RND_llegada"] = None
+            ep["Tiempo_entre_llegadas"] = None
+
+        z = self._proximo_fin("fin_atencion")
+        if z is not None:
+            ep["Fin_atencion"] = z.fin_atencion.tiempo
+            ep["RND_atencion"] = z.rnd_atencion
+            ep["Tiempo_atencion"] = z.tiempo_atencion
+        elif evento_actual == "Fin_atencion":
+            ep["Fin_atencion"] = None
+            ep["RND_atencion"] = None
+            ep["Tiempo_atencion"] = None
+
+        z = self._proximo_fin("fin_reparacion")
+        if z is not None:
+            ep["Fin_reparacion"] = z.fin_reparacion.tiempo
+            ep["RND_reparacion"] = z.rnd_reparacion
+            ep["Tiempo_reparacion"] = z.tiempo_reparacion
+        elif evento_actual == "Fin_reparacion":
+            ep["Fin_reparacion"] = None
+            ep["RND_reparacion"] = None
+            ep["Tiempo_reparacion"] = None
+
+    def _registrar(self, evento: str, rnd_pet=None, tipo_pet=None):
+        # ──────────────────────────────────────────────────────────────
+        # 1) CANTIDAD REAL DE CLIENTES EN COLA
+        #    • Si un zapatero está "Atendiendo", el primer elemento de
+        #      cola_pedidos corresponde al cliente que está en el mostrador
+        #      (no debe contarse como "en cola").
+        # ──────────────────────────────────────────────────────────────
+        en_cola = len(self.cola_pedidos)
+        en_cola -= min(en_cola, self._cant_por_estado["Atendiendo"])
+
+        # 2) Actualizar el máximo con esa cantidad depurada
+        if en_cola > self.cant_max_cola:
+            self.cant_max_cola = en_cola
+        if en_cola != self.indicadores.cola.valor:
+            self.indicadores.cola.actualizar(self.reloj, en_cola)
+
+        if self.registrar_traza:
+            self._agregar_fila(evento, en_cola, rnd_pet, tipo_pet)
+
+        self.nro_evento += 1
+
+    def _agregar_fila(self, evento: str, en_cola: int, rnd_pet, tipo_pet):
+        self._actualizar_eventos_persistentes(evento)
+        ep = self.eventos_persistentes
+
+        if len(self.zapateros) == 1:
+            estado_zapatero = self.zapateros[0].estado
+        else:
+            estado_zapatero = " | ".join(z.estado for z in self.zapateros)
+
+        es_llegada = evento == "Llegada"
+        # Mismo orden que traza.COLUMNAS_FLOAT / traza.COLUMNAS_INT
+        self.traza.agregar(
+            evento,
+            tipo_pet if es_llegada else None,
+            estado_zapatero,
+            (self.reloj,
+             ep["RND_llegada"], ep["Tiempo_entre_llegadas"], ep["Proxima_llegada"],
+             rnd_pet if es_llegada else None,
+             ep["RND_atencion"], ep["Tiempo_atencion"], ep["Fin_atencion"],
+             ep["RND_reparacion"], ep["Tiempo_reparacion"], ep["Fin_reparacion"],
+             self.acum_tiempo_rep),
+            (self.nro_evento, self.cant_pares_reparados, self.zapatos_para_retirar,
+             en_cola, self.cant_max_cola),
+        )
+
+
+def simular(parametros: ParametrosSimulacion, registrar_traza: bool = True,
+            traza: RegistroTraza | None = None, al_avanzar=None,
+            tam_lote: int = 500, antitetico: bool = False) -> ResultadoSimulacion:
+    """
+    Corre un día completo (ver Simulacion) y devuelve el resultado.
+    al_avanzar(avance) se llama con cada Avance de Simulacion.por_lotes.
+    Con antitetico=True los flujos usan 1 - rnd (ver aleatorios.py).
+    """
+    sim = Simulacion(parametros, registrar_traza, traza, antitetico)
+    if al_avanzar is None:
+        return sim.ejecutar()
+    for avance in sim.por_lotes(tam_lote):
+        al_avanzar(avance)
+    return sim.resultado()
+
+
+# ------------------------------------------------------------
+# 4) Línea de comandos
+# ------------------------------------------------------------
+def agregar_argumentos_modelo(parser: argparse.ArgumentParser):
+    """Agrega al parser los parámetros del modelo (los de ParametrosSimulacion)."""
+    defaults = ParametrosSimulacion()
+    parser.add_argument("--stock-inicial", type=int, default=defaults.stock_inicial)
+    parser.add_argument("--mu", type=float, default=defaults.mu)
+    parser.add_argument("--a1", type=float, default=defaults.a1)
+    parser.add_argument("--b1", type=float, default=defaults.b1)
+    parser.add_argument("--a2", type=float, default=defaults.a2)
+    parser.add_argument("--b2", type=float, default=defaults.b2)
+    parser.add_argument("--p-retiro", type=float, default=defaults.p_retiro)
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument("--hora-cierre", type=float, default=defaults.hora_cierre)
+    parser.add_argument("--zapateros", type=int, default=defaults.cant_zapateros)
+
+
+def parametros_desde_args(args: argparse.Namespace) -> ParametrosSimulacion:
+    return ParametrosSimulacion(
+        stock_inicial=args.stock_inicial, mu=args.mu,
+        a1=args.a1, b1=args.b1, a2=args.a2, b2=args.b2,
+        p_retiro=args.p_retiro, semilla=args.semilla, hora_cierre=args.hora_cierre,
+        cant_zapateros=args.zapateros,
+    )
+
+
+def variante_desde_texto(texto: str) -> dict:
+    """'cant_zapateros=2,mu=15' -> {'cant_zapateros': 2, 'mu': 15.0} (para --variante, --comparar)."""
+    tipos = {f.name: f.type for f in fields(ParametrosSimulacion)}
+    cambios = {}
+    for asignacion in texto.split(","):
+        nombre, _, valor = asignacion.partition("=")
+        nombre = nombre.strip()
+        if nombre not in tipos:
+            raise argparse.ArgumentTypeError(f"Parámetro desconocido: {nombre}")
+        entero = tipos[nombre] is int or nombre == "semilla"
+        cambios[nombre] = int(valor) if entero else float(valor)
+    return cambios
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Simula un día de la casa de reparaciones de zapatos."
+    )
+    agregar_argumentos_modelo(parser)
+    parser.add_argument("--sin-traza", action="store_true",
+                        help="Sólo estadísticas, sin armar la traza")
+    parser.add_argument("--json", action="store_true", help="Imprime el resumen como JSON")
+    args = parser.parse_args(argv)
+
+    resultado = simular(parametros_desde_args(args), registrar_traza=not args.sin_traza)
+
+    if args.json:
+        print(json.dumps(resultado.resumen()))
+    else:
+        print(f"Tiempo promedio reparación: {resultado.avg_rep:.2f}")
+        print(f"Máx. clientes en cola:      {resultado.cant_max_cola}")
+        print(f"Pares reparados:            {resultado.cant_pares_reparados}")
+        print(f"Eventos:                    {resultado.cant_eventos}")
+        print(f"Hora de finalización:       {resultado.hora_final:.2f} min")
+        ind = resultado.indicadores
+        print(f"Largo medio de cola:        {ind['largo_medio_cola']:.2f}")
+        print(f"Utilización de zapateros:   {ind['utilizacion']:.1%}")
+        print(f"Interrupciones:             {ind['interrupciones']}")
+        print(f"Pedidos rechazados:         {ind['pedidos_rechazados']} de {ind['pedidos']}")
+        print(f"Espera hasta el retiro:     {ind['espera_retiro_media']:.2f} min")
+
+
+if __name__ == "__main__":
+    main()
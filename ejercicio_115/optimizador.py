@@ -0,0 +1,410 @@
+# optimizador.py
+"""
+Optimización de la dotación: la configuración más barata que cumple los
+objetivos ("la menor cantidad de zapateros y el menor stock inicial con
+la cola máxima y el tiempo de reparación por debajo de tanto").
+
+Las configuraciones son los puntos de una grilla (barrido.grilla) sobre
+zapateros, stock inicial, hora de cierre, rangos de servicio, etc. La
+más barata es la menor según los parámetros de `minimizar`, en orden
+(por defecto el orden de la grilla). Los objetivos son cotas superiores
+para las medias de las métricas de replicaciones.METRICAS.
+
+Es una selección con restricciones estocásticas. En lugar de correr las
+mismas replicaciones en todas las configuraciones, se procede por rondas:
+
+• cada configuración arranca con replicas_iniciales corridas y se
+  clasifica con intervalos de confianza: factible si en todas las
+  métricas el límite superior es <= objetivo + tolerancia, infactible si
+  en alguna el límite inferior es >= objetivo - tolerancia;
+• las infactibles se descartan, y también las más caras que una que ya
+  es factible (no pueden ganar);
+• las corridas de cada ronda se reparten entre las indecisas como en
+  OCBA: en proporción a las que le faltan a cada una para decidirse,
+  (t · desvío / distancia al objetivo)²; las que están lejos del
+  objetivo se deciden con pocas corridas y las dudosas reciben más;
+• termina cuando la más barata de las que quedan es factible.
+
+Todas las configuraciones usan las mismas semillas (números aleatorios
+comunes). asignacion="igual" corre el mismo procedimiento dándole a todas
+las configuraciones las mismas corridas en cada ronda: es la línea de
+base contra la que se compara el presupuesto (linea_base=True la corre
+también y la deja en el resultado).
+
+Garantía (zona de indiferencia): cada configuración se mira una vez por
+ronda y las rondas están acotadas por el presupuesto,
+R = 1 + ceil((presupuesto_maximo - k · replicas_iniciales) / tam_ronda)
+(ver rondas_maximas; el procedimiento no pasa de R rondas). Los
+intervalos son individuales al nivel 1 - (1 - nivel_confianza) / (k · m · R),
+Bonferroni sobre k configuraciones, m métricas y R miradas. Con
+probabilidad de al menos nivel_confianza todos los intervalos de todas
+las rondas cubren su media, y entonces la elegida tiene cada media <=
+objetivo + tolerancia y cada configuración más barata alguna media >=
+objetivo - tolerancia. Es conservador: cuanto más presupuesto, más
+anchos los intervalos de cada ronda.
+
+    python optimizador.py --valores cant_zapateros 1 2 3 --valores stock_inicial 0 5 10 20 \\
+        --objetivo cant_max_cola 3 --objetivo avg_rep 16 --semilla 1 --linea-base
+"""
+import argparse
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+
+from barrido import PARAMETROS_BARRIBLES, grilla
+from estadisticas import cuantil_t
+from motor import ParametrosSimulacion, agregar_argumentos_modelo, parametros_desde_args
+from replicaciones import (METRICAS, NOMBRES_METRICAS, Estimacion, correr_lote, estimar,
+                           semillas_replicas)
+
+ASIGNACIONES = ("ocba", "igual")
+TOLERANCIA_RELATIVA = 0.05   # tolerancia por defecto: 5 % del objetivo
+REPLICAS_INICIALES = 10      # corridas de cada configuración en la primera ronda
+# Distancia mínima al objetivo (relativa) al estimar las corridas que faltan:
+# con tolerancia 0 y la media justo en el objetivo la distancia sería 0
+DISTANCIA_MINIMA = 1e-6
+
+
+# ------------------------------------------------------------
+# 1) Resultado
+# ------------------------------------------------------------
+@dataclass
+class Candidato:
+    """Una configuración con sus corridas y su clasificación."""
+    cambios: dict
+    costo: tuple
+    parametros: ParametrosSimulacion = field(repr=False)
+    muestras: dict[str, list[float]] = field(repr=False)
+    estado: str = "indeciso"      # "factible", "infactible" o "descartado" (más cara que una factible)
+
+    @property
+    def n(self) -> int:
+        return len(self.muestras[METRICAS[0]])
+
+    @property
+    def nombre(self) -> str:
+        return ", ".join(f"{k}={v}" for k, v in self.cambios.items()) or "base"
+
+
+@dataclass
+class ResultadoOptimizacion:
+    objetivos: dict[str, float]
+    tolerancias: dict[str, float]
+    nivel_confianza: float
+    asignacion: str
+    candidatos: list[Candidato] = field(repr=False)
+    elegido: Candidato | None
+    decidido: bool            # False si se agotaron las corridas o las rondas antes de decidir
+    rondas: int
+    rondas_maximas: int       # cota de rondas con la que se corrigió el nivel
+    linea_base: "ResultadoOptimizacion | None" = field(default=None, repr=False)   # asignación igual
+
+    @property
+    def nivel_individual(self) -> float:
+        """Nivel de cada intervalo (Bonferroni sobre configuraciones, métricas y rondas)."""
+        return _nivel_individual(self.nivel_confianza, len(self.candidatos), len(self.objetivos),
+                                 self.rondas_maximas)
+
+    @property
+    def presupuesto(self) -> int:
+        """Corridas usadas en total."""
+        return sum(c.n for c in self.candidatos)
+
+    def estimaciones(self, candidato: Candidato) -> dict[str, Estimacion]:
+        return {m: estimar(candidato.muestras[m], self.nivel_individual) for m in self.objetivos}
+
+    def garantia(self) -> str:
+        cotas = ", ".join(f"{NOMBRES_METRICAS[m]} <= {v:g} (± {self.tolerancias[m]:g})"
+                          for m, v in self.objetivos.items())
+        detalle = (f"error de cada intervalo {1 - self.nivel_individual:.2e}, "
+                   f"Bonferroni sobre {len(self.candidatos)} configuraciones, "
+                   f"{len(self.objetivos)} métricas y hasta {self.rondas_maximas} rondas")
+        if not self.decidido:
+            return (f"Se agotó el presupuesto (corridas o rondas) antes de decidir ({cotas}); "
+                    + (f"la mejor factible hasta ahora es {self.elegido.nombre}."
+                       if self.elegido else "todavía no hay ninguna factible."))
+        if self.elegido is None:
+            return (f"Con confianza {self.nivel_confianza:.0%}, ninguna configuración "
+                    f"cumple {cotas} ({detalle}).")
+        return (f"Con confianza {self.nivel_confianza:.0%}, {self.elegido.nombre} cumple {cotas} y "
+                f"ninguna configuración más barata lo cumple ({detalle}).")
+
+    def tabla(self) -> list[dict]:
+        filas = []
+        for c in self.candidatos:
+            fila = {**c.cambios, "Estado": c.estado, "Replicaciones": c.n}
+            for m, e in self.estimaciones(c).items():
+                fila[f"{NOMBRES_METRICAS[m]} (media)"] = e.media
+                fila[f"{NOMBRES_METRICAS[m]} (semiancho)"] = e.semiancho
+            filas.append(fila)
+        return filas
+
+
+# ------------------------------------------------------------
+# 2) Clasificación y reparto de corridas
+# ------------------------------------------------------------
+def rondas_maximas(cant_configuraciones: int, replicas_iniciales: int, tam_ronda: int,
+                   presupuesto_maximo: int) -> int:
+    """Rondas como máximo: la inicial y las que entran de a tam_ronda en el resto del presupuesto."""
+    resto = max(presupuesto_maximo - cant_configuraciones * replicas_iniciales, 0)
+    return 1 + math.ceil(resto / tam_ronda)
+
+
+def _nivel_individual(nivel_confianza: float, k: int, m: int, rondas: int) -> float:
+    return 1 - (1 - nivel_confianza) / (k * m * rondas)
+
+
+def _clasificar(candidato: Candidato, objetivos: dict, tolerancias: dict, nivel: float) -> str:
+    estimaciones = {m: estimar(candidato.muestras[m], nivel) for m in objetivos}
+    if all(e.superior <= objetivos[m] + tolerancias[m] for m, e in estimaciones.items()):
+        return "factible"
+    if any(e.inferior >= objetivos[m] - tolerancias[m] for m, e in estimaciones.items()):
+        return "infactible"
+    return "indeciso"
+
+
+def _corridas_necesarias(candidato: Candidato, objetivos: dict, tolerancias: dict,
+                         nivel: float) -> float:
+    """
+    Corridas para que el semiancho quede por debajo de la distancia al
+    objetivo (más la tolerancia): la métrica violada más fácil de
+    confirmar si la media ya pasa alguna cota, si no la más difícil.
+    """
+    t = cuantil_t(0.5 + nivel / 2, max(candidato.n - 1, 1))
+    violadas, cumplidas = [], []
+    for m, objetivo in objetivos.items():
+        e = estimar(candidato.muestras[m], nivel)
+        distancia = max(abs(e.media - objetivo) + tolerancias[m],
+                        DISTANCIA_MINIMA * max(abs(objetivo), 1.0))
+        (violadas if e.media > objetivo else cumplidas).append((t * e.desvio / distancia) ** 2)
+    return min(violadas) if violadas else max(cumplidas)
+
+
+def _repartir(necesidades: list[float], tam_ronda: int) -> list[int]:
+    """Reparte tam_ronda corridas en proporción a las necesidades (sin pasarse de cada una)."""
+    total = sum(necesidades)
+    cuotas = [tam_ronda * x / total for x in necesidades]
+    reparto = [min(math.floor(c), math.ceil(x)) for c, x in zip(cuotas, necesidades)]
+    # El resto, a las de mayor parte fraccionaria
+    for i in sorted(range(len(cuotas)), key=lambda i: cuotas[i] - reparto[i], reverse=True):
+        if sum(reparto) >= tam_ronda:
+            break
+        if reparto[i] < math.ceil(necesidades[i]):
+            reparto[i] += 1
+    if not any(reparto):
+        reparto[max(range(len(necesidades)), key=necesidades.__getitem__)] = 1
+    return reparto
+
+
+def _seleccionar(candidatos: list[Candidato], objetivos: dict, tolerancias: dict,
+                 nivel_confianza: float, replicas_iniciales: int, tam_ronda: int,
+                 presupuesto_maximo: int, asignacion: str, correr,
+                 avisar=None) -> tuple[Candidato | None, bool, int]:
+    """
+    El procedimiento por rondas sobre `candidatos`; correr(incrementos)
+    agrega a cada uno las corridas pedidas. avisar(mejor, decidido,
+    rondas) se llama antes de cada ronda nueva. Devuelve (mejor factible,
+    decidido, rondas).
+    """
+    k = len(candidatos)
+    maximo = rondas_maximas(k, replicas_iniciales, tam_ronda, presupuesto_maximo)
+    nivel = _nivel_individual(nivel_confianza, k, len(objetivos), maximo)
+
+    def actualizar() -> tuple[Candidato | None, bool]:
+        """Clasifica a los indecisos; devuelve (mejor factible, decidido)."""
+        for c in candidatos:
+            if c.estado == "indeciso":
+                c.estado = _clasificar(c, objetivos, tolerancias, nivel)
+        factibles = [c for c in candidatos if c.estado == "factible"]
+        mejor = min(factibles, key=lambda c: c.costo) if factibles else None
+        for c in candidatos:
+            if mejor is not None and c.estado == "indeciso" and c.costo > mejor.costo:
+                c.estado = "descartado"
+        pendientes = [c for c in candidatos if c.estado == "indeciso"]
+        return mejor, not pendientes
+
+    correr([replicas_iniciales] * k)
+    mejor, decidido = actualizar()
+    rondas = 1
+    # El nivel está corregido para `maximo` miradas: no se hacen más rondas
+    while not decidido and rondas < maximo and sum(c.n for c in candidatos) < presupuesto_maximo:
+        if avisar is not None:
+            avisar(mejor, decidido, rondas)
+        restante = presupuesto_maximo - sum(c.n for c in candidatos)
+        if asignacion == "igual":
+            # Todas las configuraciones, las mismas corridas, sin descartar ninguna
+            por_configuracion = min(max(tam_ronda // k, 1), restante // k)
+            if por_configuracion == 0:
+                break   # no alcanza para una corrida más en cada una
+            incrementos = [por_configuracion] * k
+        else:
+            necesidades = [max(_corridas_necesarias(c, objetivos, tolerancias, nivel) - c.n, 1.0)
+                           if c.estado == "indeciso" else 0.0 for c in candidatos]
+            incrementos = _repartir(necesidades, min(tam_ronda, restante))
+        correr(incrementos)
+        mejor, decidido = actualizar()
+        rondas += 1
+    return mejor, decidido, rondas
+
+
+# ------------------------------------------------------------
+# 3) Optimización
+# ------------------------------------------------------------
+def optimizar(configuraciones: list[dict],
+              objetivos: dict[str, float],
+              base: ParametrosSimulacion | None = None,
+              minimizar: tuple[str, ...] | None = None,
+              tolerancias: dict[str, float] | None = None,
+              nivel_confianza: float = 0.95,
+              semilla: int = 1,
+              replicas_iniciales: int = REPLICAS_INICIALES,
+              tam_ronda: int = 40,
+              presupuesto_maximo: int = 20000,
+              asignacion: str = "ocba",
+              procesos: int | None = None,
+              linea_base: bool = False,
+              al_avanzar=None) -> ResultadoOptimizacion:
+    """
+    Busca la configuración más barata de `configuraciones` (dicts de
+    cambios sobre `base`) cuyas medias cumplen `objetivos`
+    ({métrica: cota superior}). Ver el docstring del módulo.
+
+    • tolerancias: {métrica: zona de indiferencia}; por defecto el 5 % del
+      objetivo.
+    • presupuesto_maximo: corridas en total; si se agota, el resultado
+      queda con decidido=False. Con asignacion="igual" se corta antes si
+      lo que queda no alcanza para una corrida más en cada configuración.
+    • linea_base=True corre después la asignación igual con las mismas
+      opciones y la deja en resultado.linea_base.
+    • al_avanzar(resultado) se llama después de cada ronda con el
+      resultado parcial (durante la línea de base, con la parcial de
+      ésta en resultado.linea_base).
+    • procesos=1 corre todo en el proceso actual.
+    """
+    if not configuraciones:
+        raise ValueError("No hay configuraciones para evaluar")
+    for m in objetivos:
+        if m not in METRICAS:
+            raise ValueError(f"Métrica no soportada: {m}")
+    if asignacion not in ASIGNACIONES:
+        raise ValueError(f"Asignación desconocida: {asignacion}")
+    if replicas_iniciales < 2:
+        raise ValueError(f"Hacen falta al menos 2 replicaciones iniciales: {replicas_iniciales}")
+    if presupuesto_maximo < replicas_iniciales * len(configuraciones):
+        raise ValueError(f"El presupuesto ({presupuesto_maximo}) no alcanza para las "
+                         f"replicaciones iniciales de {len(configuraciones)} configuraciones")
+    base = base or ParametrosSimulacion()
+    minimizar = tuple(minimizar or dict.fromkeys(k for c in configuraciones for k in c))
+    for nombre in minimizar:
+        if nombre not in PARAMETROS_BARRIBLES:
+            raise ValueError(f"Parámetro no barrible: {nombre}")
+    tolerancias = {m: (tolerancias or {}).get(m, TOLERANCIA_RELATIVA * abs(v))
+                   for m, v in objetivos.items()}
+    for m, tolerancia in tolerancias.items():
+        if tolerancia < 0:
+            raise ValueError(f"Tolerancia inválida para {m}: {tolerancia}")
+    procesos = procesos or os.cpu_count() or 1
+
+    candidatos = []
+    for cambios in configuraciones:
+        parametros = replace(base, **cambios)
+        candidatos.append(Candidato(dict(cambios), tuple(getattr(parametros, n) for n in minimizar),
+                                    parametros, {m: [] for m in METRICAS}))
+    maximo = rondas_maximas(len(candidatos), replicas_iniciales, tam_ronda, presupuesto_maximo)
+
+    def correr(incrementos: list[int], ejecutor):
+        tareas = []
+        for c, k in zip(candidatos, incrementos):
+            semillas = semillas_replicas(semilla, c.n, c.n + k)
+            tam = max(5, math.ceil(len(semillas) / procesos))
+            tareas += [(c, semillas[i:i + tam]) for i in range(0, len(semillas), tam)]
+        if ejecutor is None:
+            filas = [correr_lote(c.parametros, s) for c, s in tareas]
+        else:
+            filas = ejecutor.map(correr_lote, [c.parametros for c, _ in tareas], [s for _, s in tareas])
+        for (c, _), lote in zip(tareas, filas):
+            for fila in lote:
+                for m, valor in zip(METRICAS, fila):
+                    c.muestras[m].append(valor)
+
+    def resultado(mejor, decidido, rondas) -> ResultadoOptimizacion:
+        return ResultadoOptimizacion(dict(objetivos), tolerancias, nivel_confianza, asignacion,
+                                     candidatos, mejor, decidido, rondas, maximo)
+
+    ejecutor = ProcessPoolExecutor(max_workers=procesos) if procesos > 1 else None
+    try:
+        mejor, decidido, rondas = _seleccionar(
+            candidatos, objetivos, tolerancias, nivel_confianza, replicas_iniciales, tam_ronda,
+            presupuesto_maximo, asignacion, lambda incrementos: correr(incrementos, ejecutor),
+            avisar=(lambda *estado: al_avanzar(resultado(*estado))) if al_avanzar else None,
+        )
+    finally:
+        if ejecutor is not None:
+            ejecutor.shutdown()
+
+    final = resultado(mejor, decidido, rondas)
+    if linea_base:
+        def avance_linea_base(parcial):
+            final.linea_base = parcial
+            al_avanzar(final)
+
+        final.linea_base = optimizar(
+            configuraciones, objetivos, base, minimizar, tolerancias, nivel_confianza, semilla,
+            replicas_iniciales, tam_ronda, presupuesto_maximo, "igual", procesos,
+            al_avanzar=avance_linea_base if al_avanzar is not None else None,
+        )
+    if al_avanzar is not None:
+        al_avanzar(final)
+    return final
+
+
+# ------------------------------------------------------------
+# 4) Línea de comandos
+# ------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Configuración más barata que cumple los objetivos (selección con OCBA)."
+    )
+    agregar_argumentos_modelo(parser)
+    parser.add_argument("--valores", nargs="+", action="append", default=[], required=True,
+                        metavar=("PARAMETRO", "VALOR"),
+                        help="Valores de un parámetro (repetible; el orden es el de minimización)")
+    parser.add_argument("--objetivo", nargs=2, action="append", default=[], required=True,
+                        metavar=("METRICA", "COTA"), help="Cota superior de una métrica (repetible)")
+    parser.add_argument("--tolerancia", nargs=2, action="append", default=[],
+                        metavar=("METRICA", "TOLERANCIA"))
+    parser.add_argument("--confianza", type=float, default=0.95)
+    parser.add_argument("--presupuesto", type=int, default=20000, help="Corridas como máximo")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--linea-base", action="store_true",
+                        help="Correr también la asignación igual para comparar")
+    args = parser.parse_args(argv)
+
+    enteros = {"stock_inicial", "cant_zapateros"}
+    configuraciones = grilla(**{n: [int(v) if n in enteros else float(v) for v in vs]
+                                for n, *vs in args.valores})
+    r = optimizar(
+        configuraciones,
+        objetivos={m: float(v) for m, v in args.objetivo},
+        base=parametros_desde_args(args),
+        tolerancias={m: float(v) for m, v in args.tolerancia},
+        nivel_confianza=args.confianza,
+        semilla=args.semilla if args.semilla is not None else 1,
+        presupuesto_maximo=args.presupuesto,
+        procesos=args.procesos,
+        linea_base=args.linea_base,
+    )
+    for fila in r.tabla():
+        print("  " + "  ".join(f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}"
+                               for k, v in fila.items()))
+    print(r.garantia())
+    print(f"Presupuesto: {r.presupuesto} corridas en {r.rondas} rondas")
+    if args.linea_base:
+        igual = r.linea_base
+        print(f"Asignación igual: {igual.presupuesto} corridas, elige "
+              f"{igual.elegido.nombre if igual.elegido else 'ninguna'}")
+
+
+if __name__ == "__main__":
+    main()
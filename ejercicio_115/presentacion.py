@@ -0,0 +1,71 @@
+# presentacion.py
+"""
+Presentación de la traza: formato y paginado sólo de las filas que se ven.
+
+El motor guarda los valores crudos (float64 con NaN = vacío, enteros y los
+estados internos de los zapatos) y la vista de traza.a_multiindex() los
+deja así. El formato de siempre se aplica acá, a la hora de mostrar:
+
+• números con 2 decimales y vacíos en blanco,
+• estados de los zapatos abreviados (ER, SR, RI, LR; retirado en blanco,
+  ver utils.mapear_estado_zapato).
+
+formatear() devuelve un Styler de pandas: el DataFrame no se toca (las
+columnas siguen siendo numéricas) y Streamlit muestra los valores
+formateados. paginar() y pagina_traza() arman la vista ancha de una sola
+página, así una traza larga no se arma ni se manda entera al navegador.
+"""
+import math
+from dataclasses import dataclass
+
+from utils import mapear_estado_zapato
+
+DECIMALES = 2
+TAM_PAGINA = 500
+
+
+@dataclass(frozen=True)
+class Pagina:
+    """Ventana de filas de una página (números de evento desde..hasta-1)."""
+    numero: int          # 1..cant_paginas
+    cant_paginas: int
+    desde: int
+    hasta: int
+    total: int
+
+    @property
+    def cant_filas(self) -> int:
+        return self.hasta - self.desde
+
+
+def paginar(total: int, tam_pagina: int = TAM_PAGINA, numero: int = 1) -> Pagina:
+    """Página `numero` de una traza de `total` filas; fuera de rango se ajusta a la primera o la última."""
+    if tam_pagina < 1:
+        raise ValueError(f"Tamaño de página inválido: {tam_pagina}")
+    cant_paginas = max(1, math.ceil(total / tam_pagina))
+    numero = min(max(numero, 1), cant_paginas)
+    desde = (numero - 1) * tam_pagina
+    return Pagina(numero, cant_paginas, desde, min(desde + tam_pagina, total), total)
+
+
+def columnas_estado_zapato(df) -> list:
+    """Columnas ("Zapato", "Estado <id>") de la vista multi-índice."""
+    return [c for c in df.columns
+            if isinstance(c, tuple) and c[0] == "Zapato" and c[1].startswith("Estado ")]
+
+
+def formatear(df, decimales: int = DECIMALES):
+    """
+    Styler con el formato de la traza para mostrar `df` (una ventana de
+    traza.a_multiindex(), o el DataFrame plano de a_dataframe()).
+    """
+    estilo = df.style.format(precision=decimales, na_rep="")
+    estados = columnas_estado_zapato(df)
+    if estados:
+        estilo = estilo.format(mapear_estado_zapato, subset=estados, na_rep="")
+    return estilo
+
+
+def pagina_traza(traza, pagina: Pagina, zapatos=None):
+    """La página de la traza, ya formateada para mostrar (ver formatear)."""
+    return formatear(traza.a_multiindex(desde=pagina.desde, hasta=pagina.hasta, zapatos=zapatos))
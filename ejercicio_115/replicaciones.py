@@ -0,0 +1,449 @@
+# replicaciones.py
+"""
+Replicaciones Monte Carlo de simular() en un pool de procesos.
+
+Cada replicación i usa su propia semilla, derivada de la semilla base con
+numpy.random.SeedSequence(semilla, spawn_key=(i,)). Así el resultado no
+depende de cuántos procesos haya ni de en qué orden terminen.
+
+Reducción de varianza:
+
+• antitetico=True corre las replicaciones de a pares: la semilla i con
+  los RND de siempre y con 1 - rnd (ver aleatorios.py); la observación
+  es el promedio del par.
+• control=True corrige cada métrica con variables de control de media
+  conocida: la media de los primeros tiempos entre llegadas (mu) y la de
+  los primeros tiempos de reparación ((a2 + b2) / 2) de los flujos de la
+  corrida. Cuántos se promedian depende sólo de los parámetros (ver
+  largos_controles), no de cuándo termina la corrida: si no, la media del
+  control ya no sería la de la distribución y el estimador quedaría
+  sesgado. El estimador es la ordenada de la regresión de la métrica
+  contra los controles centrados.
+• comparar_escenarios() corre todos los escenarios con las mismas
+  semillas (números aleatorios comunes, sincronizados por propósito) y
+  estima las diferencias contra el primero con corridas apareadas.
+
+Cada Estimacion informa el factor de reducción de varianza logrado (la
+varianza de la media simple con las mismas corridas dividida por la del
+estimador usado) y cuántas replicaciones simples harían falta para la
+misma precisión.
+
+    python replicaciones.py --replicas 200 --procesos 4 --semilla 1
+    python replicaciones.py --replicas 2000 --semiancho 0.1 --semilla 1
+    python replicaciones.py --replicas 200 --antitetico --control --semilla 1
+    python replicaciones.py --replicas 100 --comparar cant_zapateros=2 --comparar mu=15
+"""
+import argparse
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+
+from aleatorios import FuentesAleatorias
+from estadisticas import cuantil_t
+from motor import (ParametrosSimulacion, agregar_argumentos_modelo,
+                   parametros_desde_args, simular, variante_desde_texto)
+
+# Salidas de cada replicación que se agregan
+METRICAS = ("avg_rep", "cant_max_cola", "hora_final")
+NOMBRES_METRICAS = {
+    "avg_rep": "Tiempo promedio reparación",
+    "cant_max_cola": "Máx. clientes en cola",
+    "hora_final": "Hora de finalización",
+}
+# Variables de control: flujo de aleatorios.FLUJOS cuyos primeros valores se promedian
+CONTROLES = ("llegadas", "reparacion")
+
+
+# ------------------------------------------------------------
+# 1) Resultado
+# ------------------------------------------------------------
+@dataclass
+class Estimacion:
+    """
+    Media de una métrica sobre las replicaciones con su intervalo de
+    confianza. desvio es el de una corrida y n la cantidad de corridas;
+    factor_reduccion es la varianza de la media simple de esas n corridas
+    dividida por la del estimador (1.0 sin reducción de varianza).
+    """
+    media: float
+    desvio: float
+    semiancho: float
+    n: int
+    factor_reduccion: float = 1.0
+
+    @property
+    def replicas_equivalentes(self) -> float:
+        """Corridas independientes que darían la misma precisión con la media simple."""
+        return self.n * self.factor_reduccion
+
+    @property
+    def inferior(self) -> float:
+        return self.media - self.semiancho
+
+    @property
+    def superior(self) -> float:
+        return self.media + self.semiancho
+
+
+@dataclass
+class ResumenReplicas:
+    parametros: ParametrosSimulacion
+    semilla: int
+    nivel_confianza: float
+    estimaciones: dict[str, Estimacion]
+    muestras: dict[str, list[float]] = field(repr=False)   # una por corrida
+    alcanzo_precision: bool | None = None   # None si no se pidió semiancho objetivo
+    antitetico: bool = False
+    control: bool = False
+
+    @property
+    def cant_replicas(self) -> int:
+        return len(self.muestras[METRICAS[0]])
+
+    def tabla(self) -> list[dict]:
+        """Una fila por métrica (para mostrar o exportar)."""
+        return [
+            {
+                "Métrica": NOMBRES_METRICAS[m],
+                "Media": e.media,
+                "Desvío": e.desvio,
+                "Semiancho": e.semiancho,
+                "IC inferior": e.inferior,
+                "IC superior": e.superior,
+                "Replicaciones": e.n,
+                "Reducción de varianza": e.factor_reduccion,
+                "Replicaciones equivalentes": e.replicas_equivalentes,
+            }
+            for m, e in self.estimaciones.items()
+        ]
+
+
+@dataclass
+class ComparacionEscenarios:
+    """
+    Diferencias de cada variante contra el escenario base, con números
+    aleatorios comunes. El factor de reducción de las diferencias es
+    contra correr los dos escenarios con semillas independientes.
+    """
+    variantes: list[dict]                          # cambios de cada variante sobre la base
+    resumenes: list[ResumenReplicas]               # base primero, después las variantes
+    diferencias: list[dict[str, Estimacion]]       # variante - base, por métrica
+
+    def tabla(self) -> list[dict]:
+        return [
+            {
+                "Escenario": ", ".join(f"{k}={v}" for k, v in cambios.items()),
+                "Métrica": NOMBRES_METRICAS[m],
+                "Diferencia": e.media,
+                "Semiancho": e.semiancho,
+                "IC inferior": e.inferior,
+                "IC superior": e.superior,
+                "Reducción de varianza": e.factor_reduccion,
+            }
+            for cambios, diferencias in zip(self.variantes, self.diferencias)
+            for m, e in diferencias.items()
+        ]
+
+
+# ------------------------------------------------------------
+# 2) Semillas y ejecución
+# ------------------------------------------------------------
+def semilla_replica(semilla: int, indice: int) -> int:
+    """Semilla independiente y reproducible para la replicación `indice`."""
+    ss = np.random.SeedSequence(semilla, spawn_key=(indice,))
+    return int(ss.generate_state(1, np.uint64)[0])
+
+
+def semillas_replicas(semilla: int, desde: int, hasta: int,
+                     antitetico: bool = False) -> list[tuple[int, bool]]:
+    """(semilla, antitético) de las corridas desde..hasta-1; con antitético van de a pares."""
+    if not antitetico:
+        return [(semilla_replica(semilla, i), False) for i in range(desde, hasta)]
+    return [(semilla_replica(semilla, i // 2), i % 2 == 1) for i in range(desde, hasta)]
+
+
+def correr_lote(parametros: ParametrosSimulacion, semillas: list[tuple[int, bool]],
+                controles: bool = False) -> list[tuple]:
+    """
+    Corre una replicación (sin traza) por (semilla, antitético): las
+    métricas y, con controles=True, después las variables de control de
+    CONTROLES (ver controles_replica). Se ejecuta en los workers.
+    """
+    salida = []
+    for s, antitetico in semillas:
+        r = simular(replace(parametros, semilla=s), registrar_traza=False, antitetico=antitetico)
+        fila = (r.avg_rep, r.cant_max_cola, r.hora_final)
+        if controles:
+            fila += controles_replica(parametros, s, antitetico)
+        salida.append(fila)
+    return salida
+
+
+def largos_controles(parametros: ParametrosSimulacion) -> dict[str, int]:
+    """
+    Cuántos valores iniciales de cada flujo de CONTROLES se promedian: las
+    llegadas y los pedidos que se esperan hasta el cierre. Depende sólo de
+    los parámetros, así que la media del control es la de la distribución.
+    """
+    llegadas = max(1, round(parametros.hora_cierre / parametros.mu))
+    return {"llegadas": llegadas,
+            "reparacion": max(1, round(llegadas * (1 - parametros.p_retiro)))}
+
+
+def controles_replica(parametros: ParametrosSimulacion, semilla: int,
+                      antitetico: bool = False) -> tuple[float, ...]:
+    """
+    Media de los primeros largos_controles() valores de cada flujo de
+    CONTROLES en la corrida con esa semilla: son los mismos valores que
+    usa la corrida, sorteados de nuevo desde el principio de cada flujo.
+    """
+    fuentes = FuentesAleatorias.para(replace(parametros, semilla=semilla), antitetico=antitetico)
+    largos = largos_controles(parametros)
+    return tuple(sum(getattr(fuentes, c).sortear()[1] for _ in range(largos[c])) / largos[c]
+                 for c in CONTROLES)
+
+
+def medias_controles(parametros: ParametrosSimulacion) -> dict[str, float]:
+    """Media teórica de cada variable de control."""
+    return {"llegadas": parametros.mu, "reparacion": (parametros.a2 + parametros.b2) / 2}
+
+
+def estimar(valores, nivel_confianza: float = 0.95, pares: bool = False,
+            controles=None, varianza_simple: float | None = None) -> Estimacion:
+    """
+    Estimación de la media de `valores` (uno por corrida).
+
+    • pares=True: las corridas vienen de a pares antitéticos (2k, 2k+1) y
+      la observación es el promedio del par.
+    • controles: columnas (una por corrida) de variables de control ya
+      centradas en su media conocida. El estimador es la ordenada de la
+      regresión de las observaciones contra los controles, con varianza
+      s² [(X'X)^-1]_00 y n - q - 1 grados de libertad.
+    • varianza_simple: varianza de una corrida con la que se compara (por
+      defecto la de `valores`).
+    """
+    y = np.asarray(valores, dtype=float)
+    n = len(y)
+    if varianza_simple is None:
+        varianza_simple = float(y.var(ddof=1)) if n > 1 else 0.0
+    x = np.empty((n, 0)) if controles is None else np.column_stack(controles).astype(float)
+    if pares:
+        y = (y[0::2] + y[1::2]) / 2
+        x = (x[0::2] + x[1::2]) / 2
+    k, q = x.shape
+    if q and k > q + 2:
+        a = np.column_stack([np.ones(k), x])
+        coef, *_ = np.linalg.lstsq(a, y, rcond=None)
+        residuos = y - a @ coef
+        gl = k - q - 1
+        media = float(coef[0])
+        varianza = float(residuos @ residuos) / gl * float(np.linalg.pinv(a.T @ a)[0, 0])
+    else:
+        gl = k - 1
+        media = float(y.mean()) if k else math.nan
+        varianza = float(y.var(ddof=1)) / k if k > 1 else math.inf
+    semi = cuantil_t(0.5 + nivel_confianza / 2, gl) * math.sqrt(varianza) if gl >= 1 else math.inf
+    simple = varianza_simple / n if n else math.inf
+    factor = simple / varianza if 0 < varianza < math.inf and simple < math.inf else 1.0
+    return Estimacion(media, math.sqrt(varianza_simple), semi, n, factor)
+
+
+def _partir(lista: list, partes: int) -> list[list]:
+    tam = max(1, math.ceil(len(lista) / partes))
+    return [lista[i:i + tam] for i in range(0, len(lista), tam)]
+
+
+def replicar(parametros: ParametrosSimulacion,
+             cant_replicas: int = 30,
+             semilla: int | None = None,
+             procesos: int | None = None,
+             nivel_confianza: float = 0.95,
+             semiancho_objetivo: float | None = None,
+             metrica_objetivo: str = "avg_rep",
+             replicas_minimas: int = 10,
+             tam_ronda: int | None = None,
+             antitetico: bool = False,
+             control: bool = False,
+             al_avanzar=None) -> ResumenReplicas:
+    """
+    Corre replicaciones independientes de simular() y agrega las métricas.
+
+    • Sin semiancho_objetivo corre exactamente cant_replicas.
+    • Con semiancho_objetivo corre por rondas (primero replicas_minimas,
+      después de a tam_ronda) y se detiene cuando el semiancho del IC de
+      metrica_objetivo es <= semiancho_objetivo, o al llegar a
+      cant_replicas. Las rondas son fijas, así que la cantidad final de
+      replicaciones tampoco depende del pool.
+    • procesos=1 corre todo en el proceso actual.
+    • al_avanzar(resumen) se llama después de cada ronda con el resumen
+      parcial; si se pasa, también sin semiancho_objetivo se corre por
+      rondas de tam_ronda.
+    • antitetico y control activan la reducción de varianza (ver arriba).
+      Con antitético cant_replicas, replicas_minimas y tam_ronda cuentan
+      corridas y se redondean hacia arriba a pares.
+
+    La semilla de `parametros` se ignora: se usa `semilla` como base.
+    """
+    if cant_replicas < 1:
+        raise ValueError(f"Cantidad de replicaciones inválida: {cant_replicas}")
+    if metrica_objetivo not in METRICAS:
+        raise ValueError(f"Métrica no soportada: {metrica_objetivo}")
+    if semilla is None:
+        semilla = int(np.random.SeedSequence().entropy % 2**63)
+    procesos = procesos or os.cpu_count() or 1
+    tam_ronda = tam_ronda or max(4 * procesos, 10)
+    if antitetico:
+        cant_replicas, replicas_minimas, tam_ronda = (
+            x + x % 2 for x in (cant_replicas, replicas_minimas, tam_ronda))
+
+    muestras = {m: [] for m in METRICAS}
+    sorteadas = {c: [] for c in CONTROLES}
+    conocidas = medias_controles(parametros)
+
+    def estimar_metrica(metrica: str) -> Estimacion:
+        controles = None
+        if control:
+            controles = [[v - conocidas[c] for v in sorteadas[c]] for c in CONTROLES]
+        return estimar(muestras[metrica], nivel_confianza, antitetico, controles)
+
+    def incorporar(filas: list[tuple]):
+        for fila in filas:
+            for m, valor in zip(METRICAS, fila):
+                muestras[m].append(valor)
+            for c, valor in zip(CONTROLES, fila[len(METRICAS):]):
+                sorteadas[c].append(valor)
+
+    def resumir() -> ResumenReplicas:
+        return ResumenReplicas(
+            parametros=parametros,
+            semilla=semilla,
+            nivel_confianza=nivel_confianza,
+            estimaciones={m: estimar_metrica(m) for m in METRICAS},
+            muestras={m: list(v) for m, v in muestras.items()},
+            alcanzo_precision=alcanzo,
+            antitetico=antitetico,
+            control=control,
+        )
+
+    alcanzo = None
+    ejecutor = ProcessPoolExecutor(max_workers=procesos) if procesos > 1 else None
+    try:
+        hechas = 0
+        while hechas < cant_replicas:
+            if semiancho_objetivo is None and al_avanzar is None:
+                hasta = cant_replicas
+            else:
+                hasta = min(cant_replicas,
+                            hechas + (replicas_minimas if hechas == 0 else tam_ronda))
+            semillas = semillas_replicas(semilla, hechas, hasta, antitetico)
+            if ejecutor is None:
+                incorporar(correr_lote(parametros, semillas, control))
+            else:
+                lotes = _partir(semillas, 2 * procesos)
+                for filas in ejecutor.map(correr_lote, [parametros] * len(lotes), lotes,
+                                          [control] * len(lotes)):
+                    incorporar(filas)
+            hechas = hasta
+
+            if semiancho_objetivo is not None:
+                alcanzo = estimar_metrica(metrica_objetivo).semiancho <= semiancho_objetivo
+            if al_avanzar is not None:
+                al_avanzar(resumir())
+            if alcanzo:
+                break
+    finally:
+        if ejecutor is not None:
+            ejecutor.shutdown()
+    return resumir()
+
+
+def comparar_escenarios(base: ParametrosSimulacion,
+                        variantes: list[dict],
+                        cant_replicas: int = 30,
+                        semilla: int | None = None,
+                        procesos: int | None = None,
+                        nivel_confianza: float = 0.95,
+                        antitetico: bool = False) -> ComparacionEscenarios:
+    """
+    Replica la base y cada variante (dict de cambios de parámetros) con
+    las mismas semillas y estima variante - base con las diferencias
+    corrida a corrida. Como cada propósito tiene su flujo, una variante
+    que cambia, por ejemplo, la reparación sigue viendo las mismas
+    llegadas y peticiones que la base.
+    """
+    if semilla is None:
+        semilla = int(np.random.SeedSequence().entropy % 2**63)
+    resumenes = [replicar(replace(base, **cambios), cant_replicas, semilla=semilla,
+                          procesos=procesos, nivel_confianza=nivel_confianza,
+                          antitetico=antitetico)
+                 for cambios in [{}] + list(variantes)]
+    referencia = resumenes[0].muestras
+    diferencias = []
+    for resumen in resumenes[1:]:
+        por_metrica = {}
+        for m in METRICAS:
+            x, y = np.asarray(referencia[m], float), np.asarray(resumen.muestras[m], float)
+            independientes = float(x.var(ddof=1) + y.var(ddof=1)) if len(x) > 1 else 0.0
+            por_metrica[m] = estimar(y - x, nivel_confianza, antitetico,
+                                     varianza_simple=independientes)
+        diferencias.append(por_metrica)
+    return ComparacionEscenarios(list(variantes), resumenes, diferencias)
+
+
+# ------------------------------------------------------------
+# 3) Línea de comandos
+# ------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Replicaciones independientes de un día de simulación."
+    )
+    agregar_argumentos_modelo(parser)
+    parser.add_argument("--replicas", type=int, default=30,
+                        help="Cantidad de replicaciones (máximo si se usa --semiancho)")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--confianza", type=float, default=0.95)
+    parser.add_argument("--semiancho", type=float, default=None,
+                        help="Detenerse al alcanzar este semiancho en --metrica")
+    parser.add_argument("--metrica", choices=METRICAS, default="avg_rep")
+    parser.add_argument("--antitetico", action="store_true",
+                        help="Replicaciones de a pares antitéticos")
+    parser.add_argument("--control", action="store_true",
+                        help="Variables de control (primeras llegadas y reparaciones sorteadas)")
+    parser.add_argument("--comparar", type=variante_desde_texto, action="append", default=[],
+                        metavar="PARAM=VALOR[,PARAM=VALOR]",
+                        help="Variante a comparar contra la base con números comunes (repetible)")
+    args = parser.parse_args(argv)
+
+    if args.comparar:
+        comparacion = comparar_escenarios(
+            parametros_desde_args(args), args.comparar, args.replicas, semilla=args.semilla,
+            procesos=args.procesos, nivel_confianza=args.confianza, antitetico=args.antitetico,
+        )
+        print(f"Replicaciones por escenario: {comparacion.resumenes[0].cant_replicas}  "
+              f"(semilla base {comparacion.resumenes[0].semilla})")
+        for fila in comparacion.tabla():
+            print(f"{fila['Escenario']:<24} {fila['Métrica']:<28} {fila['Diferencia']:>+10.3f} "
+                  f"± {fila['Semiancho']:.3f}  (reducción x{fila['Reducción de varianza']:.1f})")
+        return
+
+    resumen = replicar(
+        parametros_desde_args(args), args.replicas, semilla=args.semilla,
+        procesos=args.procesos, nivel_confianza=args.confianza,
+        semiancho_objetivo=args.semiancho, metrica_objetivo=args.metrica,
+        antitetico=args.antitetico, control=args.control,
+    )
+    print(f"Replicaciones: {resumen.cant_replicas}  (semilla base {resumen.semilla})")
+    for fila in resumen.tabla():
+        print(f"{fila['Métrica']:<28} {fila['Media']:>10.3f} ± {fila['Semiancho']:.3f}"
+              + (f"  (reducción x{fila['Reducción de varianza']:.2f}, "
+                 f"equivale a {fila['Replicaciones equivalentes']:.0f} replicaciones)"
+                 if args.antitetico or args.control else ""))
+    if resumen.alcanzo_precision is False:
+        print("Atención: no se alcanzó el semiancho pedido")
+
+
+if __name__ == "__main__":
+    main()
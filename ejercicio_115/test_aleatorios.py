@@ -0,0 +1,70 @@
+import math
+import pickle
+
+import pytest
+
+from aleatorios import Flujo, FuentesAleatorias, crear_flujo
+from motor import ParametrosSimulacion, Simulacion
+
+
+def test_bloques_no_cambian_la_secuencia():
+    chico = Flujo.exponencial(3, 20.0, tam_bloque=7)
+    grande = Flujo.exponencial(3, 20.0, tam_bloque=1000)
+    a = [chico.sortear() for _ in range(50)]
+    b = [grande.sortear() for _ in range(50)]
+    # Misma semilla, mismos RND aunque cambie el tamaño del bloque
+    assert [r for r, _ in a] == pytest.approx([r for r, _ in b])
+    for rnd, valor in a:
+        assert valor == pytest.approx(-20.0 * math.log(1 - rnd))
+
+
+def test_uniforme_y_rnd():
+    f = crear_flujo("Uniforme", (10.0, 20.0), semilla=1)
+    for _ in range(100):
+        rnd, valor = f.sortear()
+        assert 0.0 <= rnd < 1.0 and valor == pytest.approx(10.0 + 10.0 * rnd)
+    with pytest.raises(ValueError):
+        crear_flujo("Normal", (0, 1))
+
+
+def test_flujos_independientes_por_proposito():
+    # Cambiar mu sólo cambia las llegadas: las reparaciones sortean lo mismo
+    f1 = FuentesAleatorias(5, 20.0, 3.0, 4.0, 10.0, 20.0)
+    f2 = FuentesAleatorias(5, 10.0, 3.0, 4.0, 10.0, 20.0)
+    assert [f1.reparacion.sortear() for _ in range(20)] == [f2.reparacion.sortear() for _ in range(20)]
+    assert [f1.llegadas.rnd() for _ in range(20)] == [f2.llegadas.rnd() for _ in range(20)]
+    assert f1.llegadas.sortear()[1] != f2.llegadas.sortear()[1]
+
+
+def test_traza_registra_el_rnd_usado():
+    sim = Simulacion(ParametrosSimulacion(semilla=4))
+    sim.ejecutar()
+    df = sim.traza.a_dataframe()
+    rnd, valor = FuentesAleatorias(4, 20.0, 3.0, 4.0, 10.0, 20.0).llegadas.sortear()
+    assert df["reloj"][1] == valor
+    assert df["rnd_llegada"][0] == rnd
+
+
+@pytest.mark.parametrize("sorteados", [0, 5, 8, 13])   # incluye bordes de bloque
+def test_flujo_serializable(sorteados):
+    f = Flujo.uniforme(9, 1.0, 2.0, tam_bloque=8)
+    [f.sortear() for _ in range(sorteados)]
+    g = pickle.loads(pickle.dumps(f))
+    assert [f.sortear() for _ in range(20)] == [g.sortear() for _ in range(20)]
+
+
+def test_cambiar_parametros_usa_los_mismos_rnd():
+    flujo, otro = Flujo.uniforme(9, 10.0, 20.0), Flujo.uniforme(9, 5.0, 8.0)
+    for _ in range(600):
+        flujo.sortear(), otro.sortear()
+    flujo.cambiar_parametros((5.0, 8.0))
+    assert [flujo.sortear() for _ in range(600)] == [otro.sortear() for _ in range(600)]
+
+
+def test_antitetico_usa_uno_menos_rnd():
+    normal = Flujo.exponencial(6, 20.0, tam_bloque=16)
+    anti = Flujo.exponencial(6, 20.0, tam_bloque=16, antitetico=True)
+    for _ in range(40):
+        (u, _), (v, valor) = normal.sortear(), anti.sortear()
+        assert v == pytest.approx(1 - u) and 0.0 < v < 1.0
+        assert valor == pytest.approx(-20.0 * math.log(1 - v))
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from barrido import barrer, grilla, hipercubo_latino
+from motor import ParametrosSimulacion
+
+
+def test_grilla_y_parametros_invalidos():
+    puntos = grilla(mu=[10.0, 20.0, 30.0], p_retiro=[0.3, 0.7])
+    assert len(puntos) == 6 and {"mu": 30.0, "p_retiro": 0.7} in puntos
+    with pytest.raises(ValueError):
+        grilla(semilla=[1, 2])
+
+
+def test_hipercubo_latino_un_punto_por_estrato():
+    puntos = hipercubo_latino({"mu": (10.0, 30.0), "stock_inicial": (0, 40)}, 8, semilla=1)
+    estratos = sorted(int((p["mu"] - 10.0) / 20.0 * 8) for p in puntos)
+    assert estratos == list(range(8))
+    assert all(isinstance(p["stock_inicial"], int) for p in puntos)
+
+
+def test_solo_se_calculan_los_puntos_que_faltan(tmp_path):
+    almacen = str(tmp_path / "barrido.sqlite")
+    base = ParametrosSimulacion(hora_cierre=120.0)
+    primero = barrer(grilla(mu=[10.0, 20.0]), base, cant_replicas=5, almacen=almacen, procesos=1)
+    assert (primero.calculados, primero.reutilizados) == (2, 0)
+
+    segundo = barrer(grilla(mu=[10.0, 20.0, 30.0]), base, cant_replicas=5, almacen=almacen,
+                     procesos=2)
+    assert (segundo.calculados, segundo.reutilizados) == (1, 2)
+    tabla = segundo.tabla
+    assert len(tabla) == 3 * 3 and segundo.variables == ["mu"]
+    comunes = tabla[tabla["mu"] < 30.0].reset_index(drop=True)
+    assert np.allclose(comunes["media"], primero.tabla["media"])
+    assert (tabla["inferior"] <= tabla["media"]).all() and (tabla["media"] <= tabla["superior"]).all()
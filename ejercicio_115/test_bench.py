@@ -0,0 +1,16 @@
+from bench import comparar
+
+
+def test_comparar_detecta_regresiones_segun_el_sentido():
+    base = {"ms_importacion_motor": 100.0,
+            "escenarios": {"dia": {"eventos": 65, "eventos_por_seg_traza": 1000.0,
+                                   "ms_registrar": 10.0, "ms_dataframe_plano": 0.5}}}
+    nuevo = {"ms_importacion_motor": 110.0,
+             "escenarios": {"dia": {"eventos": 65, "eventos_por_seg_traza": 700.0,
+                                    "ms_registrar": 8.0, "ms_dataframe_plano": 1.5}}}
+    filas = {f["metrica"]: f for f in comparar(base, nuevo, umbral=0.25)}
+    # "eventos" no se compara y los tiempos por debajo del piso de ruido tampoco
+    assert set(filas) == {"ms_importacion_motor", "eventos_por_seg_traza", "ms_registrar"}
+    assert filas["eventos_por_seg_traza"]["regresion"]          # 30% más lento
+    assert not filas["ms_registrar"]["regresion"]               # mejoró
+    assert not filas["ms_importacion_motor"]["regresion"]       # 10% < umbral
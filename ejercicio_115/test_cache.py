@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import CacheResultados, clave_parametros
+from motor import ParametrosSimulacion
+
+
+def test_clave_canonica():
+    p = ParametrosSimulacion(semilla=1)
+    assert clave_parametros(p) == clave_parametros(ParametrosSimulacion(mu=20, semilla=1))
+    assert clave_parametros(p) != clave_parametros(ParametrosSimulacion(semilla=2))
+    assert clave_parametros(p) != clave_parametros(p, version=-1)
+
+
+def test_lru_acotado_y_contadores():
+    cache = CacheResultados(capacidad=2)
+    p1, p2, p3 = (ParametrosSimulacion(semilla=s) for s in (1, 2, 3))
+    r1 = cache.simular(p1)
+    assert cache.simular(p1) is r1
+    cache.simular(p2)
+    cache.simular(p3)              # desaloja p1, el menos usado
+    assert len(cache) == 2 and clave_parametros(p1) not in cache
+    assert (cache.aciertos, cache.fallos) == (1, 3)
+    # Sin semilla no se guarda
+    cache.simular(ParametrosSimulacion())
+    assert len(cache) == 2 and cache.fallos == 4
+
+
+def test_disco_sobrevive_a_un_reinicio(tmp_path):
+    p = ParametrosSimulacion(semilla=4)
+    original = CacheResultados(directorio=str(tmp_path)).simular(p)
+    nueva = CacheResultados(directorio=str(tmp_path))
+    leido = nueva.simular(p)
+    assert (nueva.aciertos, nueva.aciertos_disco, nueva.fallos) == (1, 1, 0)
+    assert leido.resumen() == original.resumen()
+    assert leido.traza.a_multiindex().equals(original.traza.a_multiindex())
+
+
+def test_al_avanzar_solo_si_simula():
+    cache = CacheResultados()
+    p = ParametrosSimulacion(semilla=8)
+    avances = []
+    primero = cache.simular(p, al_avanzar=avances.append)
+    assert avances and avances[-1].terminado
+    cantidad = len(avances)
+    assert cache.simular(p, al_avanzar=avances.append) is primero
+    assert len(avances) == cantidad
+
+
+def test_compartida_entre_hilos():
+    # La aplicación usa una sola instancia para todas las sesiones
+    cache = CacheResultados(capacidad=2)
+    parametros = [ParametrosSimulacion(semilla=s, hora_cierre=60.0) for s in range(4)]
+
+    def usar(i):
+        for j in range(50):
+            cache.simular(parametros[(i + j) % 4])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(usar, range(8)))   # propaga cualquier excepción de los hilos
+    assert cache.aciertos + cache.fallos == 400 and len(cache) == 2
@@ -0,0 +1,36 @@
+from calendario import CalendarioEventos
+
+
+def test_orden_y_desempate():
+    cal = CalendarioEventos()
+    cal.programar(5.0, "Fin_reparacion", 0)
+    cal.programar(5.0, "Llegada")
+    cal.programar(5.0, "Fin_atencion", 1)
+    cal.programar(5.0, "Fin_atencion", 0)
+    cal.programar(1.0, "Fin_reparacion", 3)
+    orden = []
+    while (evento := cal.proximo()) is not None:
+        orden.append((evento.tiempo, evento.tipo, evento.servidor))
+    assert orden == [
+        (1.0, "Fin_reparacion", 3),
+        (5.0, "Llegada", 0),
+        (5.0, "Fin_atencion", 0),
+        (5.0, "Fin_atencion", 1),
+        (5.0, "Fin_reparacion", 0),
+    ]
+
+
+def test_cancelacion():
+    cal = CalendarioEventos()
+    a = cal.programar(1.0, "Llegada")
+    b = cal.programar(2.0, "Fin_atencion")
+    assert len(cal) == 2
+    cal.cancelar(a)
+    cal.cancelar(a)
+    cal.cancelar(None)
+    assert len(cal) == 1
+    assert cal.ver_proximo() is b
+    assert cal.proximo() is b
+    # Un evento ya disparado no se puede cancelar
+    cal.cancelar(b)
+    assert len(cal) == 0 and cal.proximo() is None
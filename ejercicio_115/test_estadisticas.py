@@ -0,0 +1,41 @@
+import pytest
+
+from estadisticas import AcumuladorTiempo, IndicadoresDia, autocorrelacion, truncamiento_mser
+from traza import EN_COLA, INTERRUMPIDO, LISTO_PARA_RETIRO, REPARANDO, RETIRADO
+
+
+def test_acumulador_tiempo():
+    acc = AcumuladorTiempo()
+    acc.actualizar(2.0, 3)      # 0 durante [0, 2)
+    acc.actualizar(4.0, 1)      # 3 durante [2, 4)
+    # 1 durante [4, 10)
+    assert acc.media(10.0) == pytest.approx((3 * 2 + 1 * 6) / 10)
+    assert acc.maximo == 3 and acc.area(4.0) == pytest.approx(6.0)
+
+
+def test_indicadores_tiempos_de_zapatos():
+    ind = IndicadoresDia()
+    ind.zapato(0.0, 1, LISTO_PARA_RETIRO)      # stock inicial: no cuenta
+    ind.zapato(1.0, 2, EN_COLA)
+    ind.zapato(3.0, 2, REPARANDO)
+    ind.zapato(4.0, 2, INTERRUMPIDO)
+    ind.zapato(5.0, 2, REPARANDO)              # reanuda: no es una nueva espera
+    ind.zapato(9.0, 2, LISTO_PARA_RETIRO)
+    ind.zapato(10.0, 1, RETIRADO)
+    ind.zapato(12.0, 2, RETIRADO)
+    r = ind.resumen(12.0)
+    assert r["espera_reparacion_media"] == 2.0 and ind.espera_reparacion.n == 1
+    assert r["tiempo_en_taller_media"] == 8.0
+    assert r["espera_retiro_media"] == 3.0 and r["zapatos_retirados"] == 1
+
+
+def test_mser_descarta_el_transitorio():
+    serie = [10.0 - i for i in range(10)] + [0.0, 1.0] * 45   # 10 valores de arranque
+    assert truncamiento_mser(serie, tam_lote=5) == 10
+    assert truncamiento_mser([1.0, 2.0] * 50, tam_lote=5) == 0
+    assert truncamiento_mser([1.0, 2.0, 3.0]) == 0             # menos de dos lotes
+
+
+def test_autocorrelacion():
+    assert autocorrelacion([1.0, -1.0] * 20) == pytest.approx(-1.0, abs=0.05)
+    assert autocorrelacion([3.0] * 10) == 0.0
@@ -0,0 +1,24 @@
+import pytest
+
+from exportar import SumideroTraza, exportar, leer_traza, leer_zapatos
+from motor import ParametrosSimulacion, simular
+
+
+@pytest.mark.parametrize("formato", ["parquet", "ipc"])
+def test_lectura_igual_a_la_traza_en_memoria(tmp_path, formato):
+    p = ParametrosSimulacion(semilla=3, mu=5.0, cant_zapateros=2)
+    en_memoria = simular(p)
+    resultado, ruta_traza, ruta_zapatos = exportar(p, str(tmp_path), formato, tam_lote=64)
+    assert resultado.resumen() == en_memoria.resumen()
+    assert leer_traza(ruta_traza).equals(en_memoria.traza.a_dataframe())
+    assert leer_zapatos(ruta_zapatos).equals(en_memoria.traza.zapatos.a_dataframe())
+
+
+def test_memoria_acotada_por_el_lote(tmp_path):
+    p = ParametrosSimulacion(semilla=1, hora_cierre=5000.0)
+    with SumideroTraza(str(tmp_path / "t.arrow"), str(tmp_path / "z.arrow"), tam_lote=100) as s:
+        resultado = simular(p, traza=s)
+    # Los arrays nunca crecen más allá de tam_lote
+    assert s._f.shape[0] == 100 and len(s.zapatos._evento) == 100
+    assert len(s) == resultado.cant_eventos > 100
+    assert len(leer_traza(str(tmp_path / "t.arrow"))) == resultado.cant_eventos
@@ -0,0 +1,62 @@
+import pytest
+
+from horizonte import COLUMNAS_DIA, SimulacionHorizonte, simular_horizonte
+from motor import ParametrosSimulacion, simular
+
+
+def test_un_dia_igual_a_simular():
+    p = ParametrosSimulacion(semilla=7)
+    dia = simular(p, registrar_traza=False)
+    r = simular_horizonte(p, 1)
+    assert (r.cant_eventos, r.hora_final) == (dia.cant_eventos, dia.hora_final)
+    assert r.indicadores == dia.indicadores
+    assert r.dias["pares_reparados"][0] == dia.cant_pares_reparados
+
+
+def test_los_totales_diarios_suman_la_corrida():
+    p = ParametrosSimulacion(semilla=3, mu=12)
+    sim = SimulacionHorizonte(p, 60, fin_jornada=500)
+    while sim.paso():
+        pass
+    r = sim.resultado()
+    assert r.cant_dias == 60 and all(len(r.dias[c]) == 60 for c in COLUMNAS_DIA)
+    assert list(r.dias["inicio"]) == [d * 1440.0 for d in range(60)]
+    assert sum(r.dias["pares_reparados"]) == sim.cant_pares_reparados
+    assert sum(r.dias["pedidos"]) == r.indicadores["pedidos"]
+    assert sum(r.dias["area_cola"]) == pytest.approx(sim.indicadores.cola.area(60 * 1440.0))
+    # Con la jornada cortada quedan pedidos de un día para el otro
+    assert max(r.dias["pedidos_pendientes"]) > 0
+    assert r.dias["stock_listo"][-1] == sim.zapatos_para_retirar
+
+
+def test_fuera_de_jornada_no_pasa_nada():
+    p = ParametrosSimulacion(semilla=3, mu=12)
+    sim = SimulacionHorizonte(p, 5, fin_jornada=500, registrar_traza=True)
+    while sim.paso():
+        pass
+    df = sim.traza.a_dataframe()
+    assert df["reloj"].is_monotonic_increasing
+    assert (df["evento"] == "Apertura").sum() == 4
+    minuto_del_dia = df["reloj"] % 1440
+    fuera = df[minuto_del_dia > 500]
+    assert set(fuera["evento"]) <= {"Fin_jornada"}
+
+
+def test_estimacion_por_lotes():
+    p = ParametrosSimulacion(semilla=1)
+    r = simular_horizonte(p, 200, calentamiento=20, cant_lotes=10)
+    assert r.calentamiento == 20 and r.cant_lotes * r.dias_por_lote == 180
+    est = r.estimaciones["pares_por_dia"]
+    assert est.n == 10 and est.inferior < est.media < est.superior
+    assert est.media == pytest.approx(sum(r.dias["pares_reparados"][20:]) / 180)
+    assert set(r.calentamiento_por_metrica.values()) <= set(range(0, 101, 5))
+
+
+def test_parametros_invalidos():
+    p = ParametrosSimulacion()
+    with pytest.raises(ValueError):
+        SimulacionHorizonte(p, 0)
+    with pytest.raises(ValueError):
+        SimulacionHorizonte(p, 10, fin_jornada=400)   # antes del cierre
+    with pytest.raises(ValueError):
+        simular_horizonte(p, 10, calentamiento=10)
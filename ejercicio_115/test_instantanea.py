@@ -0,0 +1,77 @@
+import pytest
+
+from horizonte import SimulacionHorizonte
+from instantanea import bifurcar, correr_ramas, restaurar, tomar
+from instrumentacion import SimulacionInstrumentada
+from motor import ParametrosSimulacion, Simulacion, simular
+
+PARAMETROS = ParametrosSimulacion(semilla=11, mu=6.0, cant_zapateros=2)
+
+
+@pytest.mark.parametrize("reloj", [0.0, 37.5, 300.0, 600.0])
+def test_reanudar_es_identico_a_no_cortar(reloj):
+    completa = simular(PARAMETROS)
+    sim = Simulacion(PARAMETROS)
+    sim.avanzar_hasta(reloj=reloj)
+    reanudada = restaurar(tomar(sim, con_traza=True)).ejecutar()
+    assert reanudada.resumen() == completa.resumen()
+    assert reanudada.traza.a_dataframe().equals(completa.traza.a_dataframe())
+    assert reanudada.traza.zapatos.a_dataframe().equals(completa.traza.zapatos.a_dataframe())
+
+
+def test_instantanea_por_evento_y_sin_traza():
+    sim = Simulacion(PARAMETROS, registrar_traza=False)
+    assert sim.avanzar_hasta(nro_evento=100)
+    assert sim.nro_evento == 100
+    datos = tomar(sim)
+    assert len(datos) < 4096
+    assert restaurar(datos).ejecutar().resumen() == sim.ejecutar().resumen()
+
+
+def test_reanudar_horizonte():
+    sim = SimulacionHorizonte(PARAMETROS, 10)
+    sim.avanzar_hasta(reloj=5000.0)
+    reanudada = restaurar(tomar(sim))
+    reanudada.avanzar_hasta()
+    sim.avanzar_hasta()
+    assert reanudada.resultado().resumen() == sim.resultado().resumen()
+
+
+def test_bifurcar_variantes():
+    sim = Simulacion(ParametrosSimulacion(semilla=3, mu=8.0), registrar_traza=False)
+    sim.avanzar_hasta(reloj=300.0)
+    datos = tomar(sim)
+    assert bifurcar(datos).ejecutar().resumen() == restaurar(datos).ejecutar().resumen()
+    dos = bifurcar(datos, cant_zapateros=2)
+    assert len(dos.zapateros) == 2 and dos.parametros.cant_zapateros == 2
+    resultado = dos.ejecutar()
+    assert 0 < resultado.indicadores["utilizacion"] < 1
+    with pytest.raises(ValueError):
+        bifurcar(datos, stock_inicial=0)
+    with pytest.raises(ValueError):
+        bifurcar(tomar(dos), cant_zapateros=1)
+
+
+def test_ramas_en_paralelo_igual_que_en_serie():
+    sim = Simulacion(ParametrosSimulacion(semilla=5), registrar_traza=False)
+    sim.avanzar_hasta(reloj=240.0)
+    datos = tomar(sim)
+    variantes = [{}, {"cant_zapateros": 2}, {"mu": 15.0}, {"a2": 8.0, "b2": 16.0}]
+    serie = correr_ramas(datos, variantes, procesos=1)
+    paralelo = correr_ramas(datos, variantes, procesos=2)
+    assert [r.resumen() for r in serie] == [r.resumen() for r in paralelo]
+    assert serie[0].resumen() == restaurar(datos).ejecutar().resumen()
+
+
+def test_instrumentada_se_copia_y_se_bifurca():
+    sim = SimulacionInstrumentada(PARAMETROS, registrar_traza=False)
+    sim.avanzar_hasta(reloj=300.0)
+    datos = tomar(sim)
+    simple = Simulacion(PARAMETROS, registrar_traza=False)
+    simple.avanzar_hasta(reloj=300.0)
+    assert restaurar(datos).ejecutar().resumen() == simular(PARAMETROS).resumen()
+    for cambios in ({"mu": 9.0}, {"semilla": 4}):
+        rama = bifurcar(datos, **cambios)
+        assert rama.ejecutar().resumen() == bifurcar(tomar(simple), **cambios).ejecutar().resumen()
+        # Los flujos de la rama (también los nuevos, con otra semilla) se siguen midiendo
+        assert rama.reporte().fases["aleatorios"] > sim.reporte().fases["aleatorios"]
@@ -0,0 +1,25 @@
+from instrumentacion import FASES, perfilar
+from motor import ParametrosSimulacion, simular
+
+
+def test_instrumentada_da_el_mismo_resultado():
+    p = ParametrosSimulacion(semilla=4, mu=6.0, cant_zapateros=2)
+    vistos = []
+    resultado, reporte = perfilar(p, observadores=[lambda sim, ev: vistos.append(ev.tipo)])
+    normal = simular(p)
+    assert resultado.resumen() == normal.resumen()
+    assert resultado.traza.a_dataframe().equals(normal.traza.a_dataframe())
+    # Un llamado al observador por evento (la fila inicial no es un evento)
+    assert len(vistos) == reporte.cant_eventos == resultado.cant_eventos - 1
+    assert {t: vistos.count(t) for t in set(vistos)} == {
+        t: e["cantidad"] for t, e in reporte.eventos.items()}
+
+
+def test_reporte_con_fases_y_asignaciones():
+    _, reporte = perfilar(ParametrosSimulacion(semilla=1, mu=5.0), asignaciones=True)
+    assert set(reporte.fases) == set(FASES)
+    assert all(s >= 0 for s in reporte.fases.values())
+    assert sum(reporte.fases.values()) <= reporte.segundos_total
+    assert set(reporte.bloques_por_tipo) == set(reporte.eventos)
+    assert reporte.sitios_asignacion
+    assert reporte.a_dict()["eventos"] == reporte.eventos
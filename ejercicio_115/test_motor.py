@@ -0,0 +1,126 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from motor import ParametrosSimulacion, Simulacion, simular
+
+# Presupuesto de importación en frío del motor (ver README); incluye numpy
+PRESUPUESTO_IMPORTACION_MS = 200
+
+
+def test_motor_no_importa_streamlit_ni_pandas():
+    codigo = (
+        "import sys, time, json\n"
+        "t = time.perf_counter()\n"
+        "import motor\n"
+        "ms = (time.perf_counter() - t) * 1000\n"
+        "print(json.dumps({'ms': ms, 'mods': ['streamlit' in sys.modules, 'pandas' in sys.modules]}))\n"
+    )
+    salida = subprocess.run(
+        [sys.executable, "-c", codigo], capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    datos = json.loads(salida.stdout)
+    assert datos["mods"] == [False, False]
+    assert datos["ms"] < PRESUPUESTO_IMPORTACION_MS
+
+
+def test_misma_semilla_mismo_resultado():
+    p = ParametrosSimulacion(semilla=7)
+    r1, r2 = simular(p), simular(p)
+    assert r1.resumen() == r2.resumen()
+    assert r1.traza.a_dataframe().equals(r2.traza.a_dataframe())
+
+
+def test_resultado_consistente_con_traza():
+    r = simular(ParametrosSimulacion(semilla=3))
+    df = r.traza.a_dataframe()
+    ultima = df.iloc[-1]
+    assert r.cant_eventos == len(df)
+    assert ultima["reloj"] == r.hora_final
+    assert ultima["max_cola"] == r.cant_max_cola
+    assert ultima["cant_pares_reparados"] == r.cant_pares_reparados
+
+
+def test_parametros_invalidos():
+    for kwargs in ({"mu": 0}, {"p_retiro": 1.5}, {"stock_inicial": -1}):
+        with pytest.raises(ValueError):
+            ParametrosSimulacion(**kwargs)
+
+
+@pytest.mark.parametrize("semilla", range(10))
+def test_sin_traza_igual_que_con_traza(semilla):
+    for p in (ParametrosSimulacion(semilla=semilla),
+              ParametrosSimulacion(stock_inicial=0, mu=6.0, p_retiro=0.3, semilla=semilla),
+              ParametrosSimulacion(semilla=semilla, hora_cierre=3000.0)):
+        completo = simular(p)
+        rapido = simular(p, registrar_traza=False)
+        assert rapido.traza is None
+        assert rapido.resumen() == completo.resumen()
+
+
+@pytest.mark.parametrize("cant_zapateros", [2, 5])
+def test_varios_zapateros_conservan_zapatos(cant_zapateros):
+    p = ParametrosSimulacion(mu=4.0, cant_zapateros=cant_zapateros, semilla=11)
+    sim = Simulacion(p, registrar_traza=False)
+    resultado = sim.ejecutar()
+    assert not sim.cola_pedidos and len(sim.calendario) == 0
+    assert all(z.estado == "Libre" for z in sim.zapateros)
+    assert sim.zapatos_para_retirar == len(sim.ready_queue)
+    # Con más zapateros la cola máxima no empeora
+    un_zapatero = simular(ParametrosSimulacion(mu=4.0, semilla=11), registrar_traza=False)
+    assert resultado.cant_max_cola <= un_zapatero.cant_max_cola
+
+
+@pytest.mark.parametrize("cant_zapateros", [1, 3])
+def test_indicadores_coinciden_con_la_traza(cant_zapateros):
+    r = simular(ParametrosSimulacion(semilla=8, mu=4.0, cant_zapateros=cant_zapateros))
+    ind = r.indicadores
+    df = r.traza.a_dataframe()
+    # Largo medio de cola reconstruido desde la traza
+    duracion = df["reloj"].diff().shift(-1).fillna(0.0)
+    assert ind["largo_medio_cola"] == pytest.approx(
+        (df["cola_pedidos"] * duracion).sum() / df["reloj"].iloc[-1], rel=1e-3)
+    tipos = df["tipo_peticion"].value_counts()
+    assert ind["pedidos"] == tipos["Pedido"] + tipos["Pedido_rechazado"]
+    assert ind["pedidos_rechazados"] == tipos["Pedido_rechazado"]
+    assert 0.0 <= ind["utilizacion"] <= 1.0
+    assert ind["zapatos_retirados"] <= (r.traza.zapatos.a_dataframe()["estado"] == "Retirado").sum()
+
+
+def test_por_lotes_da_el_mismo_resultado():
+    p = ParametrosSimulacion(semilla=4, hora_cierre=2000)
+    sim = Simulacion(p)
+    avances = list(sim.por_lotes(tam_lote=100))
+    assert avances[0].nro_evento == 1 and avances[0].reloj == 0.0   # antes del primer evento
+    assert avances[-1].terminado and not any(a.terminado for a in avances[:-1])
+    assert [a.nro_evento for a in avances[1:-1]] == [1 + 100 * i for i in range(1, len(avances) - 1)]
+    assert avances[-1].progreso == 1.0
+    assert sim.resultado().resumen() == simular(p).resumen()
+
+
+def test_por_lotes_se_puede_cortar_y_seguir():
+    p = ParametrosSimulacion(semilla=4)
+    sim = Simulacion(p, registrar_traza=False)
+    for avance in sim.por_lotes(tam_lote=10):
+        if avance.progreso > 0.5:
+            break
+    assert not avance.terminado
+    assert sim.ejecutar().resumen() == simular(p, registrar_traza=False).resumen()
+
+
+def test_estados_zapatos_coinciden_con_las_colas():
+    sim = Simulacion(ParametrosSimulacion(semilla=6, mu=3.0, stock_inicial=200), registrar_traza=False)
+    for _ in range(30):
+        for _ in range(50):
+            sim.paso()
+        estados = sim.zapatos_estado
+        en_reparacion = sum(z.zapato_actual is not None for z in sim.zapateros)
+        assert len(estados) == len(sim.cola_pedidos) + len(sim.ready_queue) + en_reparacion
+        vivos = estados.a_dict()
+        assert len(vivos) == len(estados)
+        assert all(vivos[i] == "En cola" for i in sim.cola_pedidos)
+        assert all(vivos[i] == "Listo para retiro" for i in sim.ready_queue)
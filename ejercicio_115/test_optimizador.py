@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from barrido import grilla
+from motor import ParametrosSimulacion
+from optimizador import (Candidato, _corridas_necesarias, _repartir, _seleccionar, optimizar,
+                         rondas_maximas)
+from replicaciones import METRICAS
+
+BASE = ParametrosSimulacion(mu=7.0, hora_cierre=240.0)
+OBJETIVOS = {"cant_max_cola": 3.0, "avg_rep": 16.0}
+
+
+def test_repartir():
+    assert _repartir([30.0, 10.0], 20) == [15, 5]
+    # No se pasa de lo que necesita cada una
+    assert _repartir([2.0, 100.0], 40) == [1, 39]
+    assert _repartir([0.5, 0.0], 10) == [1, 0]
+
+
+def test_elige_lo_mismo_que_la_asignacion_igual_con_menos_corridas():
+    configuraciones = grilla(cant_zapateros=[1, 2, 3, 4])
+    ocba = optimizar(configuraciones, OBJETIVOS, BASE, semilla=2, procesos=1, linea_base=True)
+    igual = ocba.linea_base
+    assert igual.asignacion == "igual" and igual.linea_base is None
+    assert ocba.decidido and igual.decidido
+    assert ocba.elegido.cambios == igual.elegido.cambios
+    assert ocba.presupuesto < igual.presupuesto
+    # Las más baratas que la elegida quedaron infactibles
+    for c in ocba.candidatos:
+        if c.costo < ocba.elegido.costo:
+            assert c.estado == "infactible"
+    estimaciones = ocba.estimaciones(ocba.elegido)
+    assert all(estimaciones[m].superior <= v * 1.05 for m, v in OBJETIVOS.items())
+    assert ocba.elegido.nombre in ocba.garantia() and "rondas" in ocba.garantia()
+
+
+def test_presupuesto_agotado_y_validaciones():
+    avances = []
+    r = optimizar(grilla(cant_zapateros=[1, 2]), {"cant_max_cola": 3.4}, BASE,
+                  tolerancias={"cant_max_cola": 0.0}, presupuesto_maximo=30, procesos=1,
+                  al_avanzar=avances.append)
+    assert not r.decidido and r.presupuesto <= 30 and avances[-1] is r
+    assert "agotó" in r.garantia()
+    # La asignación igual no se pasa del presupuesto aunque no alcance para una ronda pareja
+    igual = optimizar(grilla(cant_zapateros=[1, 2, 3]), {"cant_max_cola": 3.4}, BASE,
+                      tolerancias={"cant_max_cola": 0.0}, presupuesto_maximo=32, procesos=1,
+                      asignacion="igual")
+    assert not igual.decidido and igual.presupuesto == 30
+    with pytest.raises(ValueError):
+        optimizar(grilla(cant_zapateros=[1, 2]), OBJETIVOS, BASE, presupuesto_maximo=19)
+    with pytest.raises(ValueError):
+        optimizar([{"cant_zapateros": 1}], {"utilizacion": 0.8})
+    with pytest.raises(ValueError):
+        optimizar([{"cant_zapateros": 1}], OBJETIVOS, asignacion="azar")
+    with pytest.raises(ValueError):
+        optimizar([{"cant_zapateros": 1}], OBJETIVOS, tolerancias={"avg_rep": -1.0})
+
+
+def test_tolerancia_cero_con_la_media_en_el_objetivo():
+    candidato = Candidato({}, (), BASE, {m: [2.0, 4.0, 3.0, 3.0] for m in METRICAS})
+    necesarias = _corridas_necesarias(candidato, {"cant_max_cola": 3.0}, {"cant_max_cola": 0.0}, 0.95)
+    assert 0 < necesarias < float("inf")
+    r = optimizar(grilla(cant_zapateros=[1, 2]), {"cant_max_cola": 3.0}, BASE,
+                  tolerancias={"cant_max_cola": 0.0}, semilla=3, presupuesto_maximo=2000, procesos=1)
+    assert r.presupuesto <= 2000
+
+
+@pytest.mark.parametrize("asignacion", ["ocba", "igual"])
+def test_cobertura_con_miradas_repetidas(asignacion):
+    # Datos normales sintéticos: la configuración barata queda apenas por
+    # encima de objetivo + tolerancia, la cara es claramente factible.
+    # Elegir la barata es un error; sin corregir por las rondas pasaba ~6 %.
+    rng = np.random.default_rng(1)
+    tolerancia, ensayos, errores = 0.1, 1000, 0
+    for _ in range(ensayos):
+        candidatos = [Candidato({"i": i}, (i,), BASE, {"avg_rep": []}) for i in range(2)]
+
+        def correr(incrementos):
+            for c, n, media in zip(candidatos, incrementos, (1.0 + tolerancia + 0.01, 0.0)):
+                c.muestras["avg_rep"].extend(rng.normal(media, 1.0, n).tolist())
+
+        mejor, _, rondas = _seleccionar(candidatos, {"avg_rep": 1.0}, {"avg_rep": tolerancia},
+                                        0.95, 10, 40, 2000, asignacion, correr)
+        assert rondas <= rondas_maximas(2, 10, 40, 2000)
+        errores += mejor is candidatos[0]
+    assert errores / ensayos <= 0.05
@@ -0,0 +1,50 @@
+import math
+
+import pytest
+
+from motor import ParametrosSimulacion, simular
+from presentacion import columnas_estado_zapato, formatear, pagina_traza, paginar
+
+
+@pytest.fixture(scope="module")
+def traza():
+    return simular(ParametrosSimulacion(semilla=5, mu=3.0, hora_cierre=300.0)).traza
+
+
+def test_paginar():
+    assert paginar(0, 10) == paginar(0, 10, 5)              # traza vacía: una página vacía
+    p = paginar(95, 10, 10)
+    assert (p.numero, p.cant_paginas, p.desde, p.hasta, p.cant_filas) == (10, 10, 90, 95, 5)
+    assert paginar(95, 10, 99) == p and paginar(95, 10, -3).desde == 0
+    with pytest.raises(ValueError):
+        paginar(95, 0)
+
+
+def test_la_traza_guarda_valores_crudos(traza):
+    df = traza.a_multiindex(hasta=50)
+    assert df[("", "Reloj")].dtype == "float64"
+    assert df[("", "RND de peticion")].isna().any()                  # vacíos como NaN
+    assert df[("", "Reloj")].round(2).ne(df[("", "Reloj")]).any()    # sin redondear
+    estados = {v for v in df[columnas_estado_zapato(df)].to_numpy().ravel() if isinstance(v, str)}
+    assert estados <= {
+        "En cola", "Reparando", "Interrumpido", "Listo para retiro", "Retirado"}
+
+
+def test_formato_solo_al_mostrar(traza):
+    pagina = paginar(len(traza), 40, 3)
+    estilo = pagina_traza(traza, pagina)
+    df = estilo.data
+    assert list(df.index) == list(range(80, 120))
+    assert df.equals(traza.a_multiindex(desde=80, hasta=120))       # los datos no se tocan
+    mostrado = estilo.to_string()
+    reloj = df[("", "Reloj")].iloc[0]
+    assert f"{reloj:.2f}" in mostrado and repr(reloj) not in mostrado
+    assert "nan" not in mostrado
+    zapatos = formatear(df[columnas_estado_zapato(df)]).to_string()
+    assert "ER" in zapatos and "En cola" not in zapatos and "Reparando" not in zapatos
+
+
+def test_formatear_dataframe_plano(traza):
+    mostrado = formatear(traza.a_dataframe().head(3)).to_string()
+    assert "nan" not in mostrado and "Inicial" in mostrado
+    assert not math.isnan(traza.a_dataframe()["reloj"].iloc[0])
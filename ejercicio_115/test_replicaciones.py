@@ -0,0 +1,84 @@
+import pytest
+
+from estadisticas import AcumuladorWelford, cuantil_t
+from motor import ParametrosSimulacion
+from replicaciones import comparar_escenarios, replicar
+
+
+def test_cuantil_t():
+    # Valores de tabla para t_{0.975}
+    for gl, esperado in ((1, 12.706), (2, 4.303), (5, 2.571), (10, 2.228), (30, 2.042)):
+        assert cuantil_t(0.975, gl) == pytest.approx(esperado, abs=0.01)
+
+
+def test_cuantil_t_en_las_colas():
+    # Valores de tabla con pocos grados de libertad y niveles de Bonferroni
+    tabla = {0.995: (5.8409, 4.6041, 4.0321),
+             0.9975: (7.4533, 5.5976, 4.7733),
+             0.9995: (12.924, 8.6103, 6.8688)}
+    for p, esperados in tabla.items():
+        for gl, esperado in zip((3, 4, 5), esperados):
+            assert cuantil_t(p, gl) == pytest.approx(esperado, abs=1e-3)
+    assert cuantil_t(0.025, 4) == pytest.approx(-cuantil_t(0.975, 4))
+
+
+def test_welford():
+    acc = AcumuladorWelford()
+    for x in (2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0):
+        acc.agregar(x)
+    assert acc.media == pytest.approx(5.0)
+    assert acc.varianza == pytest.approx(32 / 7)
+
+
+def test_resultado_no_depende_de_los_procesos():
+    p = ParametrosSimulacion()
+    serie = replicar(p, 24, semilla=5, procesos=1)
+    pool = replicar(p, 24, semilla=5, procesos=3)
+    assert serie.muestras == pool.muestras
+    assert serie.cant_replicas == 24
+
+
+def test_corte_por_precision():
+    p = ParametrosSimulacion()
+    resumen = replicar(p, 5000, semilla=2, procesos=1, semiancho_objetivo=0.5,
+                       replicas_minimas=10, tam_ronda=10)
+    est = resumen.estimaciones["avg_rep"]
+    assert resumen.alcanzo_precision
+    assert est.semiancho <= 0.5
+    assert resumen.cant_replicas < 5000 and resumen.cant_replicas % 10 == 0
+    assert est.inferior < est.media < est.superior
+
+
+def test_reduccion_de_varianza():
+    p = ParametrosSimulacion()
+    simple = replicar(p, 200, semilla=1, procesos=1)
+    anti = replicar(p, 199, semilla=1, procesos=1, antitetico=True)
+    control = replicar(p, 200, semilla=1, procesos=1, control=True)
+    assert simple.estimaciones["avg_rep"].factor_reduccion == pytest.approx(1.0)
+    assert anti.cant_replicas == 200
+    for resumen in (anti, control):
+        est = resumen.estimaciones["avg_rep"]
+        assert est.factor_reduccion > 1 and est.replicas_equivalentes > 200
+        assert abs(est.media - simple.estimaciones["avg_rep"].media) < simple.estimaciones["avg_rep"].semiancho
+
+
+def test_control_sin_sesgo():
+    # Con las mismas corridas, el estimador con control tiene que caer muy
+    # cerca de la media simple en todas las métricas (los controles
+    # promediados sobre lo que sorteó cada corrida la corrían ~2 semianchos)
+    p = ParametrosSimulacion(hora_cierre=240.0)
+    simple = replicar(p, 2000, semilla=7, procesos=1)
+    control = replicar(p, 2000, semilla=7, procesos=1, control=True)
+    for m, est in control.estimaciones.items():
+        assert abs(est.media - simple.estimaciones[m].media) < simple.estimaciones[m].semiancho / 2
+
+
+def test_numeros_comunes_entre_escenarios():
+    p = ParametrosSimulacion()
+    comparacion = comparar_escenarios(p, [{"cant_zapateros": 2}], 60, semilla=3, procesos=1)
+    base, variante = comparacion.resumenes
+    diferencia = comparacion.diferencias[0]["cant_max_cola"]
+    esperada = (sum(variante.muestras["cant_max_cola"]) - sum(base.muestras["cant_max_cola"])) / 60
+    assert diferencia.media == pytest.approx(esperada)
+    assert diferencia.factor_reduccion > 1
+    assert len(comparacion.tabla()) == 3   # una fila por métrica
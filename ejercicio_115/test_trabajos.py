@@ -0,0 +1,62 @@
+import subprocess
+import sys
+import time
+
+from motor import ParametrosSimulacion, simular
+from replicaciones import replicar
+from trabajos import AlmacenTrabajos, GestorTrabajos, ejecutar_trabajo
+
+
+def test_trabajo_en_el_proceso_actual(tmp_path):
+    ruta = str(tmp_path / "trabajos.sqlite")
+    almacen = AlmacenTrabajos(ruta)
+    p = ParametrosSimulacion()
+    id_trabajo = almacen.crear("replicas", p, {"cant_replicas": 40, "semilla": 3, "tam_ronda": 10})
+    assert almacen.trabajo(id_trabajo).estado == "pendiente"
+    assert ejecutar_trabajo(ruta, id_trabajo) == "terminado"
+
+    # Otra conexión (otra sesión) ve el trabajo terminado y su resultado
+    trabajo = AlmacenTrabajos(ruta).trabajo(id_trabajo)
+    assert (trabajo.estado, trabajo.progreso, trabajo.parcial["replicaciones"]) == ("terminado", 1.0, 40)
+    resumen = AlmacenTrabajos(ruta).resultado(id_trabajo)
+    assert resumen.muestras == replicar(p, 40, semilla=3, procesos=1).muestras
+    # Un trabajo terminado no se vuelve a correr ni se puede cancelar
+    assert ejecutar_trabajo(ruta, id_trabajo) is None
+    assert not almacen.pedir_cancelacion(id_trabajo)
+
+
+def test_cancelar_pendiente_y_marcar_interrumpidos(tmp_path):
+    almacen = AlmacenTrabajos(str(tmp_path / "trabajos.sqlite"))
+    pendiente = almacen.crear("dia", ParametrosSimulacion(semilla=1), {})
+    assert almacen.pedir_cancelacion(pendiente)
+    assert ejecutar_trabajo(almacen.ruta, pendiente) is None
+    assert almacen.trabajo(pendiente).estado == "cancelado"
+
+    huerfano = almacen.crear("dia", ParametrosSimulacion(semilla=1), {})
+    muerto = subprocess.Popen([sys.executable, "-c", "pass"])
+    muerto.wait()
+    assert almacen.empezar(huerfano, muerto.pid)
+    assert almacen.marcar_interrumpidos() == 1
+    assert almacen.trabajo(huerfano).estado == "interrumpido"
+    assert [t.id for t in almacen.listar()] == [huerfano, pendiente]
+
+
+def test_gestor_corre_y_cancela(tmp_path):
+    gestor = GestorTrabajos(str(tmp_path / "trabajos.sqlite"), procesos=2)
+    try:
+        p = ParametrosSimulacion(semilla=7)
+        dia = gestor.enviar("dia", p)
+        largo = gestor.enviar("dia", ParametrosSimulacion(semilla=1, mu=1.0, hora_cierre=1e7))
+        assert gestor.esperar(dia, timeout=60).estado == "terminado"
+        assert gestor.almacen.resultado(dia).resumen() == simular(p, registrar_traza=False).resumen()
+
+        limite = time.monotonic() + 60
+        while gestor.almacen.trabajo(largo).progreso == 0.0 and time.monotonic() < limite:
+            time.sleep(0.05)
+        assert gestor.almacen.trabajo(largo).estado == "corriendo"
+        assert gestor.cancelar(largo)
+        trabajo = gestor.esperar(largo, timeout=60)
+        assert trabajo.estado == "cancelado" and 0.0 < trabajo.progreso < 1.0
+        assert gestor.almacen.resultado(largo) is None
+    finally:
+        gestor.cerrar(cancelar=True)
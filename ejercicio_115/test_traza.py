@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from motor import ParametrosSimulacion, Simulacion, simular
+
+
+@pytest.fixture(scope="module")
+def traza():
+    # Día largo y cargado: muchos zapatos en el sistema a la vez
+    return simular(ParametrosSimulacion(semilla=5, mu=3.0, hora_cierre=1000.0)).traza
+
+
+def test_ventana_igual_a_la_vista_completa(traza):
+    completa = traza.a_multiindex()
+    for desde, hasta, zapatos in ((0, 40, None), (150, 230, None), (200, 260, range(50, 70))):
+        ventana = traza.a_multiindex(desde=desde, hasta=hasta, zapatos=zapatos)
+        assert list(ventana.index) == list(range(desde, hasta))
+        pd.testing.assert_frame_equal(completa.loc[ventana.index, ventana.columns],
+                                      ventana, check_dtype=False)
+
+
+def test_historial_crece_con_los_cambios(traza):
+    largo = traza.zapatos.a_dataframe()
+    assert len(largo) < len(traza)
+    # Un zapato sólo se retira estando listo, y una sola vez
+    for _, cambios in largo.groupby("zapato", observed=True):
+        estados = list(cambios["estado"])
+        if "Retirado" in estados:
+            assert estados[-1] == "Retirado" and estados[-2] == "Listo para retiro"
+            assert estados.count("Retirado") == 1
+
+
+def test_ultima_fila_coincide_con_el_motor():
+    sim = Simulacion(ParametrosSimulacion(semilla=2, mu=6.0))
+    sim.ejecutar()
+    n = len(sim.traza)
+    estados, _ = next(sim.traza.zapatos.instantaneas(n - 1, n))
+    vivos = {z: e for z, e in estados.items() if e != "Retirado"}
+    assert vivos == sim.zapatos_estado.a_dict()
@@ -0,0 +1,39 @@
+import math
+
+import numpy as np
+import pytest
+
+from motor import ParametrosSimulacion
+from replicaciones import METRICAS, replicar
+from vectorizado import simular_lote
+
+ESCENARIOS = [
+    ParametrosSimulacion(),
+    ParametrosSimulacion(stock_inicial=0, mu=6.0, p_retiro=0.3),
+    ParametrosSimulacion(stock_inicial=40, mu=5.0, a1=0.5, b1=1.0, a2=10.0, b2=30.0, p_retiro=0.7),
+]
+
+
+@pytest.mark.parametrize("parametros", ESCENARIOS)
+def test_equivalencia_estadistica_con_el_motor_escalar(parametros):
+    lote = simular_lote(parametros, 20000, semilla=1)
+    escalar = replicar(parametros, 2000, semilla=1, procesos=1)
+    for m in METRICAS:
+        x = getattr(lote, m)
+        e = escalar.estimaciones[m]
+        error = math.hypot(x.std(ddof=1) / math.sqrt(len(x)), e.desvio / math.sqrt(e.n))
+        assert abs(x.mean() - e.media) < 4.5 * error, m
+
+
+def test_reproducible_y_completo():
+    p = ParametrosSimulacion(hora_cierre=600.0)
+    a, b = simular_lote(p, 500, semilla=3), simular_lote(p, 500, semilla=3)
+    assert np.array_equal(a.hora_final, b.hora_final)
+    # Todas las replicaciones llegan a la hora de cierre y terminan después
+    assert (a.hora_final >= 600.0).all()
+    assert (a.cant_pares_reparados > 0).all()
+
+
+def test_un_solo_zapatero():
+    with pytest.raises(ValueError):
+        simular_lote(ParametrosSimulacion(cant_zapateros=2), 10)
@@ -0,0 +1,453 @@
+# trabajos.py
+"""
+Trabajos en segundo plano: corridas largas fuera del script de Streamlit.
+
+GestorTrabajos.enviar() registra el trabajo (un día, replicaciones, un
+barrido o una optimización) en un SQLite, lo manda a un pool de procesos y devuelve su id.
+El worker va guardando en el mismo archivo el progreso, un resultado
+parcial y, al final, el resultado (pickle). Cualquier sesión o proceso
+que abra el archivo ve la lista de trabajos y lee sus resultados: un
+cambio de widget o recargar la página no pierde la corrida.
+
+• Cancelar marca el trabajo: un trabajo pendiente ya no arranca y uno en
+  curso se corta en la próxima actualización de progreso.
+• Cada trabajo corre entero en un worker (procesos=1 adentro): el
+  paralelismo es entre trabajos.
+• Los trabajos que quedaron pendientes o corriendo en un proceso que ya
+  no existe se marcan "interrumpido" al crear un gestor.
+
+    python trabajos.py enviar replicas --replicas 2000 --semilla 1
+    python trabajos.py enviar barrido --valores mu 10 20 30 --replicas 30
+    python trabajos.py enviar optimizacion --valores cant_zapateros 1 2 3 --objetivo cant_max_cola 3
+    python trabajos.py listar
+    python trabajos.py cancelar 3f2a9c1e0b7d
+"""
+import argparse
+import json
+import os
+import pickle
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from dataclasses import asdict, dataclass, field
+
+from motor import ParametrosSimulacion, agregar_argumentos_modelo, parametros_desde_args
+
+RUTA_POR_DEFECTO = os.environ.get("SIMULACION_TRABAJOS_DB", "trabajos.sqlite")
+TIPOS = ("dia", "replicas", "barrido", "optimizacion")
+ESTADOS = ("pendiente", "corriendo", "terminado", "cancelado", "error", "interrumpido")
+ESTADOS_FINALES = frozenset(ESTADOS[2:])
+
+
+class TrabajoCancelado(Exception):
+    """Se pidió cancelar el trabajo mientras corría."""
+
+
+# ------------------------------------------------------------
+# 1) Almacén
+# ------------------------------------------------------------
+@dataclass
+class Trabajo:
+    """Una fila de la tabla de trabajos (sin el resultado)."""
+    id: str
+    tipo: str
+    estado: str
+    parametros: ParametrosSimulacion
+    opciones: dict
+    progreso: float = 0.0
+    parcial: dict = field(default_factory=dict)   # último resultado parcial informado
+    error: str | None = None
+    creado: float = 0.0
+    actualizado: float = 0.0
+    pid: int | None = None
+
+    @property
+    def activo(self) -> bool:
+        return self.estado not in ESTADOS_FINALES
+
+    def fila(self) -> dict:
+        """Resumen para mostrar en una tabla."""
+        return {
+            "Id": self.id,
+            "Tipo": self.tipo,
+            "Estado": self.estado,
+            "Progreso": self.progreso,
+            "Parcial": ", ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}"
+                                 for k, v in self.parcial.items()),
+            "Creado": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.creado)),
+            "Duración (s)": self.actualizado - self.creado,
+            "Error": self.error or "",
+        }
+
+
+class AlmacenTrabajos:
+    """
+    Tabla de trabajos en SQLite. Cada operación abre su propia conexión:
+    el mismo almacén se usa desde los hilos de Streamlit y los workers
+    abren el archivo por su cuenta.
+    """
+
+    def __init__(self, ruta: str = RUTA_POR_DEFECTO):
+        self.ruta = ruta
+        with closing(self._conectar()) as conexion, conexion:
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("""
+                CREATE TABLE IF NOT EXISTS trabajos (
+                    id TEXT PRIMARY KEY,
+                    tipo TEXT NOT NULL,
+                    estado TEXT NOT NULL,
+                    parametros TEXT NOT NULL,
+                    opciones TEXT NOT NULL,
+                    progreso REAL NOT NULL DEFAULT 0,
+                    parcial TEXT NOT NULL DEFAULT '{}',
+                    error TEXT,
+                    cancelar INTEGER NOT NULL DEFAULT 0,
+                    pid INTEGER,
+                    creado REAL NOT NULL,
+                    actualizado REAL NOT NULL,
+                    resultado BLOB
+                )
+            """)
+
+    def _conectar(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.ruta, timeout=30)
+
+    def _ejecutar(self, sql: str, valores: tuple = ()) -> int:
+        """Ejecuta una modificación; devuelve la cantidad de filas afectadas."""
+        with closing(self._conectar()) as conexion, conexion:
+            return conexion.execute(sql, valores).rowcount
+
+    # ---------------- alta y consulta ----------------
+    def crear(self, tipo: str, parametros: ParametrosSimulacion, opciones: dict) -> str:
+        if tipo not in TIPOS:
+            raise ValueError(f"Tipo de trabajo desconocido: {tipo}")
+        id_trabajo = uuid.uuid4().hex[:12]
+        ahora = time.time()
+        self._ejecutar(
+            "INSERT INTO trabajos (id, tipo, estado, parametros, opciones, pid, creado, actualizado) "
+            "VALUES (?, ?, 'pendiente', ?, ?, ?, ?, ?)",
+            (id_trabajo, tipo, json.dumps(asdict(parametros)), json.dumps(opciones),
+             os.getpid(), ahora, ahora),
+        )
+        return id_trabajo
+
+    _COLUMNAS = "id, tipo, estado, parametros, opciones, progreso, parcial, error, creado, actualizado, pid"
+
+    @staticmethod
+    def _trabajo(fila: tuple) -> Trabajo:
+        id_trabajo, tipo, estado, parametros, opciones, progreso, parcial, error, creado, \
+            actualizado, pid = fila
+        return Trabajo(id_trabajo, tipo, estado, ParametrosSimulacion(**json.loads(parametros)),
+                       json.loads(opciones), progreso, json.loads(parcial), error, creado,
+                       actualizado, pid)
+
+    def trabajo(self, id_trabajo: str) -> Trabajo | None:
+        with closing(self._conectar()) as conexion:
+            fila = conexion.execute(f"SELECT {self._COLUMNAS} FROM trabajos WHERE id = ?",
+                                    (id_trabajo,)).fetchone()
+        return None if fila is None else self._trabajo(fila)
+
+    def listar(self, limite: int = 100) -> list[Trabajo]:
+        """Los últimos `limite` trabajos, del más nuevo al más viejo."""
+        with closing(self._conectar()) as conexion:
+            filas = conexion.execute(
+                f"SELECT {self._COLUMNAS} FROM trabajos ORDER BY creado DESC LIMIT ?", (limite,)
+            ).fetchall()
+        return [self._trabajo(fila) for fila in filas]
+
+    def resultado(self, id_trabajo: str):
+        """El resultado de un trabajo terminado (None si no terminó)."""
+        with closing(self._conectar()) as conexion:
+            fila = conexion.execute("SELECT resultado FROM trabajos WHERE id = ?",
+                                    (id_trabajo,)).fetchone()
+        return None if fila is None or fila[0] is None else pickle.loads(fila[0])
+
+    def borrar(self, id_trabajo: str) -> bool:
+        """Borra un trabajo que ya no está activo."""
+        return self._ejecutar("DELETE FROM trabajos WHERE id = ? AND estado IN (?, ?, ?, ?)",
+                              (id_trabajo, *ESTADOS_FINALES)) > 0
+
+    # ---------------- ciclo de vida ----------------
+    def empezar(self, id_trabajo: str, pid: int) -> bool:
+        """Pasa un trabajo pendiente a corriendo; False si ya no está pendiente (cancelado)."""
+        return self._ejecutar(
+            "UPDATE trabajos SET estado = 'corriendo', pid = ?, actualizado = ? "
+            "WHERE id = ? AND estado = 'pendiente'", (pid, time.time(), id_trabajo)) > 0
+
+    def avanzar(self, id_trabajo: str, progreso: float, parcial: dict) -> bool:
+        """Guarda el progreso; devuelve True si se pidió cancelar el trabajo."""
+        with closing(self._conectar()) as conexion, conexion:
+            conexion.execute(
+                "UPDATE trabajos SET progreso = ?, parcial = ?, actualizado = ? WHERE id = ?",
+                (progreso, json.dumps(parcial), time.time(), id_trabajo))
+            fila = conexion.execute("SELECT cancelar FROM trabajos WHERE id = ?",
+                                    (id_trabajo,)).fetchone()
+        return bool(fila and fila[0])
+
+    def terminar(self, id_trabajo: str, estado: str, resultado=None, error: str | None = None):
+        if estado not in ESTADOS_FINALES:
+            raise ValueError(f"Estado final inválido: {estado}")
+        datos = None if resultado is None else pickle.dumps(resultado, pickle.HIGHEST_PROTOCOL)
+        self._ejecutar(
+            "UPDATE trabajos SET estado = ?, resultado = ?, error = ?, actualizado = ?"
+            + (", progreso = 1" if estado == "terminado" else "") + " WHERE id = ?",
+            (estado, datos, error, time.time(), id_trabajo))
+
+    def pedir_cancelacion(self, id_trabajo: str) -> bool:
+        """Marca el trabajo para cancelar; uno pendiente queda cancelado en el acto."""
+        with closing(self._conectar()) as conexion, conexion:
+            activo = conexion.execute(
+                "UPDATE trabajos SET cancelar = 1 WHERE id = ? AND estado IN ('pendiente', 'corriendo')",
+                (id_trabajo,)).rowcount
+            conexion.execute(
+                "UPDATE trabajos SET estado = 'cancelado', actualizado = ? "
+                "WHERE id = ? AND estado = 'pendiente'", (time.time(), id_trabajo))
+        return activo > 0
+
+    def marcar_interrumpidos(self) -> int:
+        """Pasa a "interrumpido" los trabajos activos cuyo proceso ya no existe."""
+        interrumpidos = 0
+        for trabajo in self.listar(limite=-1):
+            if trabajo.activo and not _proceso_vivo(trabajo.pid):
+                interrumpidos += self._ejecutar(
+                    "UPDATE trabajos SET estado = 'interrumpido', actualizado = ? "
+                    "WHERE id = ? AND estado = ?", (time.time(), trabajo.id, trabajo.estado))
+        return interrumpidos
+
+
+def _proceso_vivo(pid: int | None) -> bool:
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# ------------------------------------------------------------
+# 2) Ejecución en los workers
+# ------------------------------------------------------------
+class _Informe:
+    """
+    al_avanzar de las corridas: guarda el progreso como mucho cada
+    `intervalo` segundos (siempre el último, con progreso 1 o forzar=True)
+    y corta con TrabajoCancelado si se pidió cancelar.
+    """
+
+    def __init__(self, almacen: AlmacenTrabajos, id_trabajo: str, intervalo: float = 0.5):
+        self.almacen = almacen
+        self.id_trabajo = id_trabajo
+        self.intervalo = intervalo
+        self._ultimo = 0.0
+
+    def __call__(self, progreso: float, parcial: dict, forzar: bool = False):
+        ahora = time.monotonic()
+        if not forzar and progreso < 1.0 and ahora - self._ultimo < self.intervalo:
+            return
+        self._ultimo = ahora
+        if self.almacen.avanzar(self.id_trabajo, progreso, parcial):
+            raise TrabajoCancelado(self.id_trabajo)
+
+
+def _correr_dia(trabajo: Trabajo, informar: _Informe):
+    from motor import simular
+
+    def al_avanzar(avance):
+        informar(avance.progreso, {"reloj": avance.reloj, "eventos": avance.nro_evento,
+                                   "pares_reparados": avance.cant_pares_reparados,
+                                   "max_cola": avance.cant_max_cola}, forzar=avance.terminado)
+
+    return simular(trabajo.parametros, registrar_traza=trabajo.opciones.get("traza", False),
+                   al_avanzar=al_avanzar)
+
+
+def _correr_replicas(trabajo: Trabajo, informar: _Informe):
+    from replicaciones import replicar
+
+    opciones = dict(trabajo.opciones)
+    cant_replicas = opciones.pop("cant_replicas", 30)
+    metrica = opciones.get("metrica_objetivo", "avg_rep")
+
+    def al_avanzar(resumen):
+        est = resumen.estimaciones[metrica]
+        informar(resumen.cant_replicas / cant_replicas,
+                 {"replicaciones": resumen.cant_replicas, "media": est.media,
+                  "semiancho": est.semiancho}, forzar=bool(resumen.alcanzo_precision))
+
+    return replicar(trabajo.parametros, cant_replicas, procesos=1, al_avanzar=al_avanzar,
+                    **opciones)
+
+
+def _correr_barrido(trabajo: Trabajo, informar: _Informe):
+    from barrido import barrer
+
+    opciones = dict(trabajo.opciones)
+    puntos = opciones.pop("puntos")
+    return barrer(puntos, trabajo.parametros, procesos=1,
+                  al_avanzar=lambda hechos, total: informar(hechos / total,
+                                                            {"puntos": hechos, "total": total}),
+                  **opciones)
+
+
+def _correr_optimizacion(trabajo: Trabajo, informar: _Informe):
+    from optimizador import optimizar
+
+    opciones = dict(trabajo.opciones)
+    configuraciones = opciones.pop("configuraciones")
+    maximo = opciones.get("presupuesto_maximo", 20000)
+
+    def al_avanzar(resultado):
+        informar(1.0 if resultado.decidido else resultado.presupuesto / maximo,
+                 {"corridas": resultado.presupuesto, "rondas": resultado.rondas,
+                  "mejor": resultado.elegido.nombre if resultado.elegido else "-"})
+
+    return optimizar(configuraciones, base=trabajo.parametros, procesos=1, al_avanzar=al_avanzar,
+                     **opciones)
+
+
+_CORRIDAS = {"dia": _correr_dia, "replicas": _correr_replicas, "barrido": _correr_barrido,
+             "optimizacion": _correr_optimizacion}
+
+
+def ejecutar_trabajo(ruta: str, id_trabajo: str) -> str | None:
+    """
+    Corre un trabajo pendiente y guarda el resultado; devuelve el estado
+    final (None si el trabajo ya no estaba pendiente). Se ejecuta en los
+    workers, pero también se puede llamar directamente.
+    """
+    almacen = AlmacenTrabajos(ruta)
+    trabajo = almacen.trabajo(id_trabajo)
+    if trabajo is None or not almacen.empezar(id_trabajo, os.getpid()):
+        return None
+    try:
+        resultado = _CORRIDAS[trabajo.tipo](trabajo, _Informe(almacen, id_trabajo))
+    except TrabajoCancelado:
+        almacen.terminar(id_trabajo, "cancelado")
+        return "cancelado"
+    except Exception as error:
+        almacen.terminar(id_trabajo, "error", error=f"{type(error).__name__}: {error}")
+        return "error"
+    almacen.terminar(id_trabajo, "terminado", resultado)
+    return "terminado"
+
+
+# ------------------------------------------------------------
+# 3) Gestor
+# ------------------------------------------------------------
+class GestorTrabajos:
+    """Pool de procesos que corre los trabajos de un AlmacenTrabajos."""
+
+    def __init__(self, ruta: str = RUTA_POR_DEFECTO, procesos: int | None = None):
+        self.almacen = AlmacenTrabajos(ruta)
+        self.almacen.marcar_interrumpidos()
+        self._ejecutor = ProcessPoolExecutor(max_workers=procesos or os.cpu_count() or 1)
+        self._futuros = {}
+
+    def enviar(self, tipo: str, parametros: ParametrosSimulacion, **opciones) -> str:
+        """
+        Registra y encola un trabajo; devuelve su id. Opciones según el tipo:
+
+        • "dia": traza (bool, guardar la traza en el resultado).
+        • "replicas": cant_replicas y los argumentos de replicaciones.replicar.
+        • "barrido": puntos (lista de dicts) y los de barrido.barrer.
+        • "optimizacion": configuraciones (lista de dicts), objetivos y los
+          de optimizador.optimizar.
+        """
+        id_trabajo = self.almacen.crear(tipo, parametros, opciones)
+        self._futuros[id_trabajo] = self._ejecutor.submit(ejecutar_trabajo, self.almacen.ruta,
+                                                          id_trabajo)
+        return id_trabajo
+
+    def cancelar(self, id_trabajo: str) -> bool:
+        """Pide cancelar el trabajo; False si ya había terminado."""
+        futuro = self._futuros.get(id_trabajo)
+        if futuro is not None:
+            futuro.cancel()
+        return self.almacen.pedir_cancelacion(id_trabajo)
+
+    def esperar(self, id_trabajo: str, timeout: float | None = None) -> Trabajo:
+        """Espera a que termine un trabajo de este gestor y lo devuelve."""
+        futuro = self._futuros.get(id_trabajo)
+        if futuro is not None and not futuro.cancelled():
+            futuro.result(timeout)
+        return self.almacen.trabajo(id_trabajo)
+
+    def cerrar(self, cancelar: bool = False):
+        """Apaga el pool; con cancelar=True corta también los trabajos en curso."""
+        if cancelar:
+            for id_trabajo in self._futuros:
+                self.cancelar(id_trabajo)
+        self._ejecutor.shutdown(wait=True, cancel_futures=cancelar)
+
+
+# ------------------------------------------------------------
+# 4) Línea de comandos
+# ------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trabajos de simulación en segundo plano.")
+    parser.add_argument("--almacen", default=RUTA_POR_DEFECTO, help="Archivo SQLite de trabajos")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    enviar = comandos.add_parser("enviar", help="Envía un trabajo y espera a que termine")
+    enviar.add_argument("tipo", choices=TIPOS)
+    agregar_argumentos_modelo(enviar)
+    enviar.add_argument("--replicas", type=int, default=30)
+    enviar.add_argument("--valores", nargs="+", action="append", default=[],
+                        metavar=("PARAMETRO", "VALOR"),
+                        help="Grilla del barrido o de la optimización (repetible)")
+    enviar.add_argument("--objetivo", nargs=2, action="append", default=[],
+                        metavar=("METRICA", "COTA"), help="Objetivo de la optimización (repetible)")
+    enviar.add_argument("--procesos", type=int, default=None)
+    comandos.add_parser("listar", help="Lista los trabajos")
+    cancelar = comandos.add_parser("cancelar", help="Cancela un trabajo")
+    cancelar.add_argument("id")
+    args = parser.parse_args(argv)
+
+    if args.comando == "listar":
+        for trabajo in AlmacenTrabajos(args.almacen).listar():
+            fila = trabajo.fila()
+            print(f"{fila['Id']}  {fila['Tipo']:<9} {fila['Estado']:<12} "
+                  f"{fila['Progreso']:>6.1%}  {fila['Creado']}  {fila['Parcial']}")
+        return
+    if args.comando == "cancelar":
+        ok = AlmacenTrabajos(args.almacen).pedir_cancelacion(args.id)
+        print("Cancelación pedida" if ok else "El trabajo no existe o ya terminó")
+        return
+
+    from barrido import grilla
+
+    opciones = {}
+    semilla = args.semilla if args.semilla is not None else 1
+    enteros = {"stock_inicial", "cant_zapateros"}
+    puntos = grilla(**{n: [int(v) if n in enteros else float(v) for v in vs]
+                       for n, *vs in args.valores})
+    if args.tipo == "replicas":
+        opciones = {"cant_replicas": args.replicas, "semilla": semilla}
+    elif args.tipo == "barrido":
+        opciones = {"puntos": puntos, "cant_replicas": args.replicas, "semilla": semilla}
+    elif args.tipo == "optimizacion":
+        opciones = {"configuraciones": puntos, "semilla": semilla,
+                    "objetivos": {m: float(v) for m, v in args.objetivo}}
+    gestor = GestorTrabajos(args.almacen, args.procesos)
+    id_trabajo = gestor.enviar(args.tipo, parametros_desde_args(args), **opciones)
+    print(f"Trabajo {id_trabajo}")
+    try:
+        while (trabajo := gestor.almacen.trabajo(id_trabajo)).activo:
+            print(f"\r{trabajo.estado} {trabajo.progreso:.1%}", end="", flush=True)
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        gestor.cancelar(id_trabajo)
+    trabajo = gestor.esperar(id_trabajo)
+    gestor.cerrar()
+    print(f"\r{trabajo.estado} {trabajo.progreso:.1%}  {trabajo.fila()['Parcial']}")
+    if trabajo.error:
+        print(trabajo.error)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+# traza.py
+"""
+Registro columnar de la traza de la simulación.
+
+Las columnas fijas se guardan en arrays de numpy preasignados que crecen
+por duplicación: una matriz float64 (NaN = vacío), una matriz int64 y los
+códigos de las columnas categóricas (evento, tipo de petición y estado del
+zapatero). a_dataframe() arma el DataFrame sin copiar esos arrays; la
+vista con multi-índice de siempre sigue disponible con a_multiindex().
+
+Los zapatos no se copian en cada evento: HistorialZapatos guarda en formato
+largo sólo los cambios de estado (ER -> SR -> RI -> LR -> retirado) con su
+evento y hora, así la memoria crece con la cantidad de cambios y no con
+eventos × zapatos. Las columnas "Zapato" de la vista ancha se derivan a
+pedido y sólo para la ventana de filas y zapatos que se pida.
+
+pandas se importa sólo al construir los DataFrames.
+"""
+import math
+
+import numpy as np
+
+from utils import construir_dataframe, generar_nueva_fila_multiindex
+
+COLUMNAS_FLOAT = (
+    "reloj",
+    "rnd_llegada",
+    "tiempo_entre_llegadas",
+    "proxima_llegada",
+    "rnd_peticion",
+    "rnd_atencion",
+    "tiempo_atencion",
+    "fin_atencion",
+    "rnd_reparacion",
+    "tiempo_reparacion",
+    "fin_reparacion",
+    "acum_tiempo_reparacion",
+)
+COLUMNAS_INT = (
+    "nro_evento",
+    "cant_pares_reparados",
+    "zapatos_para_retirar",
+    "cola_pedidos",
+    "max_cola",
+)
+COLUMNAS_CATEGORICAS = ("evento", "tipo_peticion", "estado_zapatero")
+# Orden de las columnas en a_dataframe() (y en los archivos exportados)
+ORDEN_COLUMNAS = (
+    "nro_evento", "evento", "reloj", "rnd_llegada", "tiempo_entre_llegadas",
+    "proxima_llegada", "rnd_peticion", "tipo_peticion", "rnd_atencion",
+    "tiempo_atencion", "fin_atencion", "rnd_reparacion", "tiempo_reparacion",
+    "fin_reparacion", "estado_zapatero", "cant_pares_reparados",
+    "zapatos_para_retirar", "cola_pedidos", "max_cola", "acum_tiempo_reparacion",
+)
+
+# Categorías conocidas de antemano; las nuevas (p. ej. el estado combinado
+# de varios zapateros) se agregan al vuelo
+CATEGORIAS_INICIALES = {
+    "evento": ("Inicial", "Llegada", "Fin_atencion", "Fin_reparacion"),
+    "tipo_peticion": ("Pedido", "Retiro", "Pedido_rechazado"),
+    "estado_zapatero": ("Libre", "Atendiendo", "Reparando"),
+}
+
+CAPACIDAD_INICIAL = 256
+
+# Estados internos de un zapato; el índice es el código guardado
+ESTADOS_ZAPATO = ("En cola", "Reparando", "Interrumpido", "Listo para retiro", "Retirado")
+EN_COLA, REPARANDO, INTERRUMPIDO, LISTO_PARA_RETIRO, RETIRADO = range(len(ESTADOS_ZAPATO))
+
+
+class _Categorias:
+    """Mapa valor -> código (None se guarda como -1)."""
+    __slots__ = ("codigos", "valores")
+
+    def __init__(self, iniciales=()):
+        self.valores: list[str] = list(iniciales)
+        self.codigos = {v: i for i, v in enumerate(self.valores)}
+
+    def codigo(self, valor) -> int:
+        if valor is None:
+            return -1
+        c = self.codigos.get(valor)
+        if c is None:
+            c = self.codigos[valor] = len(self.valores)
+            self.valores.append(valor)
+        return c
+
+
+class HistorialZapatos:
+    """
+    Cambios de estado de los zapatos en formato largo: una entrada por
+    cambio con (nro_evento, reloj, zapato, estado).
+
+    Un zapato "Retirado" se muestra en la fila de su evento y desaparece
+    de la siguiente. La hora de inicio de reparación no se guarda aparte:
+    es la hora del primer cambio a "Reparando".
+    """
+
+    def __init__(self, capacidad: int = CAPACIDAD_INICIAL):
+        self._n = 0
+        self._evento = np.empty(capacidad, dtype=np.int64)
+        self._reloj = np.empty(capacidad)
+        self._zapato = np.empty(capacidad, dtype=np.int64)
+        self._estado = np.empty(capacidad, dtype=np.int8)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _crecer(self):
+        n = self._n
+        for nombre in ("_evento", "_reloj", "_zapato", "_estado"):
+            viejo = getattr(self, nombre)
+            nuevo = np.empty(2 * len(viejo), dtype=viejo.dtype)
+            nuevo[:n] = viejo[:n]
+            setattr(self, nombre, nuevo)
+
+    def agregar(self, nro_evento: int, reloj: float, zapato: int, estado: int):
+        """estado: código de ESTADOS_ZAPATO."""
+        if self._n == len(self._evento):
+            self._crecer()
+        n = self._n
+        self._evento[n] = nro_evento
+        self._reloj[n] = reloj
+        self._zapato[n] = zapato
+        self._estado[n] = estado
+        self._n = n + 1
+
+    def a_dataframe(self):
+        """El historial en formato largo (sin copiar los arrays numéricos)."""
+        import pandas as pd
+
+        n = self._n
+        return pd.DataFrame({
+            "nro_evento": self._evento[:n],
+            "reloj": self._reloj[:n],
+            "zapato": self._zapato[:n],
+            "estado": pd.Categorical.from_codes(self._estado[:n], categories=ESTADOS_ZAPATO),
+        }, copy=False)
+
+    def _estado_inicial(self, corte: int):
+        """Estado de los zapatos después de aplicar los primeros `corte` cambios."""
+        zapato = self._zapato[:corte]
+        estado = self._estado[:corte]
+        # Último cambio de cada zapato (np.unique sobre el orden inverso)
+        ids, pos = np.unique(zapato[::-1], return_index=True)
+        ultimo = estado[::-1][pos]
+        vivos = ultimo != RETIRADO
+        estados = dict(zip(ids[vivos].tolist(), ultimo[vivos].tolist()))
+        # Primer cambio a "Reparando" de cada zapato
+        rep = estado == REPARANDO
+        ids, pos = np.unique(zapato[rep], return_index=True)
+        horas = dict(zip(ids.tolist(), self._reloj[:corte][rep][pos].tolist()))
+        return estados, horas
+
+    def instantaneas(self, desde: int, hasta: int, zapatos=None):
+        """
+        Genera, para cada fila desde..hasta-1, el par de dicts
+        ({id: estado}, {id: hora inicio reparación}) de los zapatos
+        presentes en esa fila, en orden de id. `zapatos` limita los ids.
+        """
+        n = self._n
+        eventos = self._evento[:n]
+        corte = int(np.searchsorted(eventos, desde, side="left"))
+        estados, horas = self._estado_inicial(corte)
+        filtro = None if zapatos is None else set(zapatos)
+
+        eventos = eventos[corte:].tolist()
+        cambios = zip(eventos, self._zapato[corte:n].tolist(),
+                      self._estado[corte:n].tolist(), self._reloj[corte:n].tolist())
+        siguiente = next(cambios, None)
+        retirados = []
+        for fila in range(desde, hasta):
+            for z in retirados:
+                estados.pop(z, None)
+            retirados.clear()
+            while siguiente is not None and siguiente[0] == fila:
+                _, z, codigo, reloj = siguiente
+                estados[z] = codigo
+                if codigo == REPARANDO and z not in horas:
+                    horas[z] = reloj
+                elif codigo == RETIRADO:
+                    retirados.append(z)
+                siguiente = next(cambios, None)
+            ids = sorted(estados if filtro is None else filtro.intersection(estados))
+            yield ({z: ESTADOS_ZAPATO[estados[z]] for z in ids},
+                   {z: horas.get(z) for z in ids})
+
+
+class RegistroTraza:
+    """
+    Traza columnar. Cada evento se agrega con agregar(); las columnas
+    numéricas van en el orden de COLUMNAS_FLOAT / COLUMNAS_INT.
+
+    Con con_zapatos=True también se lleva el historial de los zapatos
+    (necesario para las columnas "Zapato" de la vista multi-índice): el
+    motor avisa cada cambio con cambio_zapato().
+    """
+
+    def __init__(self, con_zapatos: bool = True, capacidad: int = CAPACIDAD_INICIAL):
+        self.con_zapatos = con_zapatos
+        self._n = 0
+        self._capacidad = capacidad
+        self._f = np.empty((capacidad, len(COLUMNAS_FLOAT)), order="F")
+        self._i = np.empty((capacidad, len(COLUMNAS_INT)), dtype=np.int64, order="F")
+        self._c = np.empty((capacidad, len(COLUMNAS_CATEGORICAS)), dtype=np.int16, order="F")
+        self._categorias = {c: _Categorias(CATEGORIAS_INICIALES[c]) for c in COLUMNAS_CATEGORICAS}
+        self.zapatos = HistorialZapatos() if con_zapatos else None
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _crecer(self):
+        capacidad = self._capacidad * 2
+        for nombre in ("_f", "_i", "_c"):
+            viejo = getattr(self, nombre)
+            nuevo = np.empty((capacidad, viejo.shape[1]), dtype=viejo.dtype, order="F")
+            nuevo[:self._n] = viejo[:self._n]
+            setattr(self, nombre, nuevo)
+        self._capacidad = capacidad
+
+    def agregar(self, evento: str, tipo_peticion, estado_zapatero: str,
+                floats: tuple, ints: tuple):
+        """floats: None se guarda como NaN."""
+        if self._n == self._capacidad:
+            self._crecer()
+        n = self._n
+        self._f[n] = [math.nan if v is None else v for v in floats]
+        self._i[n] = ints
+        cat = self._categorias
+        self._c[n] = (cat["evento"].codigo(evento),
+                      cat["tipo_peticion"].codigo(tipo_peticion),
+                      cat["estado_zapatero"].codigo(estado_zapatero))
+        self._n = n + 1
+
+    def cambio_zapato(self, zapato: int, estado: int, reloj: float):
+        """Registra un cambio de estado (código) de un zapato en el evento que se está armando."""
+        self.zapatos.agregar(self._n, reloj, zapato, estado)
+
+    # ---------------- salidas ----------------
+    def columnas(self) -> dict[str, np.ndarray]:
+        """Vistas (sin copia) de las columnas numéricas."""
+        n = self._n
+        cols = {c: self._f[:n, j] for j, c in enumerate(COLUMNAS_FLOAT)}
+        cols.update({c: self._i[:n, j] for j, c in enumerate(COLUMNAS_INT)})
+        return cols
+
+    def a_dataframe(self):
+        """DataFrame plano con las columnas fijas, armado sin copiar los arrays."""
+        import pandas as pd
+
+        n = self._n
+        datos = {}
+        for j, c in enumerate(COLUMNAS_CATEGORICAS):
+            datos[c] = pd.Categorical.from_codes(
+                self._c[:n, j], categories=self._categorias[c].valores
+            )
+        datos.update(self.columnas())
+        return pd.DataFrame({c: datos[c] for c in ORDEN_COLUMNAS}, copy=False)
+
+    def _ventana(self, desde: int, hasta: int | None) -> tuple[int, int]:
+        hasta = self._n if hasta is None else min(hasta, self._n)
+        return max(desde, 0), hasta
+
+    def estados(self, desde: int = 0, hasta: int | None = None, zapatos=None):
+        """
+        Genera, por evento de la ventana desde..hasta-1, el dict
+        estado_actual que usa generar_nueva_fila_multiindex.
+        """
+        desde, hasta = self._ventana(desde, hasta)
+        valores = {c: self._categorias[c].valores for c in COLUMNAS_CATEGORICAS}
+        f = self._f[desde:hasta].tolist()
+        i = self._i[desde:hasta].tolist()
+        c = self._c[desde:hasta].tolist()
+        instantaneas = (self.zapatos.instantaneas(desde, hasta, zapatos)
+                        if self.con_zapatos else None)
+        for k in range(hasta - desde):
+            estado = {nombre: (None if math.isnan(v) else v)
+                      for nombre, v in zip(COLUMNAS_FLOAT, f[k])}
+            estado.update(zip(COLUMNAS_INT, i[k]))
+            for nombre, codigo in zip(COLUMNAS_CATEGORICAS, c[k]):
+                estado[nombre] = None if codigo < 0 else valores[nombre][codigo]
+            if instantaneas is not None:
+                estado["objetos_temporales"], estado["horas_inicio_reparacion"] = next(instantaneas)
+            yield estado
+
+    def a_multiindex(self, con_zapatos: bool | None = None,
+                     desde: int = 0, hasta: int | None = None, zapatos=None):
+        """
+        La vista de siempre: columnas con multi-índice. Los valores van sin
+        redondear (vacíos como NaN y estados internos de los zapatos); el
+        formato para mostrar lo pone presentacion.formatear().
+
+        desde/hasta eligen la ventana de filas (por número de evento) y
+        `zapatos` los ids cuyas columnas se muestran (todos si es None).
+        """
+        if con_zapatos is None:
+            con_zapatos = self.con_zapatos
+        con_zapatos = con_zapatos and self.con_zapatos
+        filas = [generar_nueva_fila_multiindex(e, con_objetos_temporales=con_zapatos)
+                 for e in self.estados(desde, hasta, zapatos if con_zapatos else ())]
+        df = construir_dataframe(filas)
+        if desde > 0:
+            df.index = df.index + desde
+        return df
@@ -1,32 +1,33 @@
 # utils.py
-import random
 import math
-import pandas as pd
+import random
+
+from aleatorios import gen_exponencial, gen_uniforme
 
 # ------------------------------------------------------------
 # 1) Generación de variables aleatorias
 # ------------------------------------------------------------
-def generar_numeros_aleatorios(tipo: str, params):
+def generar_numeros_aleatorios(tipo: str, params, rng=random):
     """
     Devuelve (valor, rnd) según la distribución solicitada.
 
     • tipo = "Uniforme": params = (a, b)
     • tipo = "Exponencial": params = (lambda_,)   [media = 1/lambda_]
-    """
-    rnd = random.random()
 
-    if tipo.lower() == "uniforme":
+    Se mantiene por compatibilidad: sortea de a un valor con rng (por
+    defecto el módulo random, reproducible con random.seed). Para sortear
+    muchos valores conviene un aleatorios.Flujo con su propia semilla.
+    """
+    tipo = tipo.lower()
+    if tipo == "uniforme":
         a, b = params
-        valor = a + rnd * (b - a)
-        return valor, rnd
-
-    elif tipo.lower() == "exponencial":
+        rnd, valor = gen_uniforme(a, b, rng)
+    elif tipo == "exponencial":
         (lam,) = params if isinstance(params, tuple) else (params,)
-        valor = -math.log(1 - rnd) / lam
-        return valor, rnd
-
+        rnd, valor = gen_exponencial(1 / lam, rng)
     else:
         raise ValueError(f"Distribución no soportada: {tipo}")
+    return valor, rnd
 
 # ------------------------------------------------------------
 # 2) Función para mapear estados internos a estados mostrados
@@ -50,6 +51,11 @@ def generar_nueva_fila_multiindex(estado_actual, con_objetos_temporales=True):
     Genera una fila con multi-índice para el DataFrame de simulación.
     Similar al patrón usado en el TP de canchas deportivas pero adaptado 
     para la zapatería.
+
+    Los valores quedan tal cual salen del motor: números sin redondear,
+    vacíos como NaN (así las columnas numéricas siguen siendo numéricas) y
+    los estados internos de los zapatos. Redondear y abreviar los estados
+    es cosa de presentacion.py, sólo para las filas que se muestran.
     
     Args:
         estado_actual: dict con el estado actual de la simulación
@@ -59,40 +65,33 @@ def generar_nueva_fila_multiindex(estado_actual, con_objetos_temporales=True):
         dict con estructura de multi-índice (categoria, campo): valor
     """
     
-    # Función auxiliar para formatear valores
-    def format_value(v, es_id=False):
-        if v is None:
-            return ""
-        elif es_id and isinstance(v, (int, float)):
-            return int(v)  # IDs como enteros
-        elif isinstance(v, (int, float)):
-            return round(float(v), 2)  # Números con 2 decimales
-        else:
-            return v
+    # Función auxiliar: None -> NaN en las columnas numéricas
+    def numero(v):
+        return math.nan if v is None else v
     
     nueva_fila = {
-        ("", "Evento"): estado_actual.get("evento", ""),
-        ("", "Reloj"): format_value(estado_actual.get("reloj")),
-        ("", "RND de llegada"): format_value(estado_actual.get("rnd_llegada")),
-        ("", "Tiempo entre llegadas"): format_value(estado_actual.get("tiempo_entre_llegadas")),
-        ("", "Proxima llegada"): format_value(estado_actual.get("proxima_llegada")),
-        ("", "RND de peticion"): format_value(estado_actual.get("rnd_peticion")),
-        ("", "Tipo de peticion"): estado_actual.get("tipo_peticion", ""),
-        ("", "RND de atencion"): format_value(estado_actual.get("rnd_atencion")),
-        ("", "Tiempo de atencion"): format_value(estado_actual.get("tiempo_atencion")),
-        ("", "Fin de atencion"): format_value(estado_actual.get("fin_atencion")),
-        ("", "RND de reparacion"): format_value(estado_actual.get("rnd_reparacion")),
-        ("", "Tiempo de reparacion"): format_value(estado_actual.get("tiempo_reparacion")),
-        ("", "Fin de reparacion"): format_value(estado_actual.get("fin_reparacion")),
-        ("", "Estado de zapatero"): estado_actual.get("estado_zapatero", ""),
-        ("", "Cant de pares reparados"): format_value(estado_actual.get("cant_pares_reparados"), es_id=True),
-        ("", "Zapatos para retirar"): format_value(estado_actual.get("zapatos_para_retirar"), es_id=True),
+        ("", "Evento"): estado_actual.get("evento"),
+        ("", "Reloj"): numero(estado_actual.get("reloj")),
+        ("", "RND de llegada"): numero(estado_actual.get("rnd_llegada")),
+        ("", "Tiempo entre llegadas"): numero(estado_actual.get("tiempo_entre_llegadas")),
+        ("", "Proxima llegada"): numero(estado_actual.get("proxima_llegada")),
+        ("", "RND de peticion"): numero(estado_actual.get("rnd_peticion")),
+        ("", "Tipo de peticion"): estado_actual.get("tipo_peticion"),
+        ("", "RND de atencion"): numero(estado_actual.get("rnd_atencion")),
+        ("", "Tiempo de atencion"): numero(estado_actual.get("tiempo_atencion")),
+        ("", "Fin de atencion"): numero(estado_actual.get("fin_atencion")),
+        ("", "RND de reparacion"): numero(estado_actual.get("rnd_reparacion")),
+        ("", "Tiempo de reparacion"): numero(estado_actual.get("tiempo_reparacion")),
+        ("", "Fin de reparacion"): numero(estado_actual.get("fin_reparacion")),
+        ("", "Estado de zapatero"): estado_actual.get("estado_zapatero"),
+        ("", "Cant de pares reparados"): estado_actual.get("cant_pares_reparados"),
+        ("", "Zapatos para retirar"): estado_actual.get("zapatos_para_retirar"),
 
         # Columnas de estadísticas - exactamente las 4 solicitadas
-        ("Estadísticas", "Cantidad de clientes en cola"): format_value(estado_actual.get("cola_pedidos"), es_id=True),
-        ("Estadísticas", "Maxima cantidad de clientes en cola"): format_value(estado_actual.get("max_cola"), es_id=True),
-        ("Estadísticas", "Cantidad de zapatos reparados"): format_value(estado_actual.get("cant_pares_reparados"), es_id=True),
-        ("Estadísticas", "Acum tiempo reparacion"): format_value(estado_actual.get("acum_tiempo_reparacion")),
+        ("Estadísticas", "Cantidad de clientes en cola"): estado_actual.get("cola_pedidos"),
+        ("Estadísticas", "Maxima cantidad de clientes en cola"): estado_actual.get("max_cola"),
+        ("Estadísticas", "Cantidad de zapatos reparados"): estado_actual.get("cant_pares_reparados"),
+        ("Estadísticas", "Acum tiempo reparacion"): numero(estado_actual.get("acum_tiempo_reparacion")),
     }
     
     if con_objetos_temporales:
@@ -100,14 +99,11 @@ def generar_nueva_fila_multiindex(estado_actual, con_objetos_temporales=True):
         horas_inicio_reparacion = estado_actual.get("horas_inicio_reparacion", {})
         
         for zapato_id, estado_zapato in objetos_temporales.items():
-            # Mapear el estado interno a la abreviatura para mostrar
-            estado_mostrado = mapear_estado_zapato(estado_zapato)
-            
             # Solo mostrar Estado y Hora_inicio_reparacion para cada zapato
             obj_nombre = "Zapato"
-            nueva_fila[(obj_nombre, f"Estado {zapato_id}")] = estado_mostrado
+            nueva_fila[(obj_nombre, f"Estado {zapato_id}")] = estado_zapato
             hora_inicio = horas_inicio_reparacion.get(zapato_id)
-            nueva_fila[(obj_nombre, f"Hora inicio reparacion {zapato_id}")] = format_value(hora_inicio)
+            nueva_fila[(obj_nombre, f"Hora inicio reparacion {zapato_id}")] = numero(hora_inicio)
 
     return nueva_fila
 
@@ -163,4 +159,33 @@ def limpiar_zapatos_retirados(zapatos_estado: dict):
         dict sin los zapatos ya retirados
     """
     return {id_zapato: estado for id_zapato, estado in zapatos_estado.items() 
-            if estado != "Retirado"}
\ No newline at end of file
+            if estado != "Retirado"}
+
+# ------------------------------------------------------------
+# 6) Construcción del DataFrame de la traza
+# ------------------------------------------------------------
+def construir_dataframe(filas: list):
+    """
+    Arma el DataFrame con multi-índice a partir de las filas generadas por
+    generar_nueva_fila_multiindex.
+
+    pandas se importa acá adentro para que el motor de simulación pueda
+    usarse sin cargarlo.
+
+    Args:
+        filas: lista de dicts {(categoria, campo): valor}
+
+    Returns:
+        pd.DataFrame con columnas MultiIndex
+    """
+    import pandas as pd
+
+    df = pd.DataFrame(filas)
+
+    # El DataFrame ya viene con estructura multi-índice desde generar_nueva_fila_multiindex
+    if not df.empty:
+        # Convertir las tuplas de columnas a MultiIndex
+        columnas_tuples = [col if isinstance(col, tuple) else ("", col) for col in df.columns]
+        df.columns = pd.MultiIndex.from_tuples(columnas_tuples)
+
+    return df